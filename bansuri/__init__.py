@@ -8,7 +8,16 @@ restart policies, timeouts, and logging.
 __version__ = "0.1.0"
 __author__ = "Blackburn (Ahmed.ZZ)"
 
-from bansuri.task_runner import TaskRunner
-from bansuri.base.config_manager import BansuriConfig, ScriptConfig
+from bansuri.base.misc.lazy import lazy_exports
+
+# Resolved on first access so `import bansuri.<module>` stays cheap
+__getattr__ = lazy_exports(
+    __name__,
+    {
+        "TaskRunner": "bansuri.task_runner",
+        "BansuriConfig": "bansuri.base.config_manager",
+        "ScriptConfig": "bansuri.base.config_manager",
+    },
+)
 
 __all__ = ["TaskRunner", "BansuriConfig", "ScriptConfig"]
@@ -1,7 +1,9 @@
 import subprocess
+from typing import List
 
 from bansuri.alerts.notifier import FailureInfo, Notifier
 from bansuri.alerts.command_safety import build_safe_command_array
+from bansuri.base.logger import default_logger
 
 
 class CommandNotifier(Notifier):
@@ -11,12 +13,23 @@ class CommandNotifier(Notifier):
         self.notify_command = notify_command
         self.timeout = timeout
 
+    @property
+    def destination(self) -> str:
+        return f"command:{self.notify_command}"
+
     def notify(self, failure_info: FailureInfo) -> bool:
-        message = self._build_message(failure_info)
+        return self._run(self._build_message(failure_info))
+
+    def notify_batch(self, failures: List[FailureInfo]) -> List[FailureInfo]:
+        if len(failures) == 1:
+            return [] if self.notify(failures[0]) else list(failures)
+        return [] if self._run(self._build_digest_message(failures)) else list(failures)
 
+    def _run(self, message: str) -> bool:
+        logger = default_logger()
         try:
             command = build_safe_command_array(self.notify_command)
-            print(f"Running: {self.notify_command}")
+            logger.debug("NOTIFY", "Running: %s", self.notify_command)
             result = subprocess.run(
                 command,
                 capture_output=True,
@@ -26,44 +39,21 @@ class CommandNotifier(Notifier):
                 timeout=self.timeout,
             )
 
-            print(f"returncode: {result.returncode}")
             if result.returncode == 0:
-                print(f"stdout: {result.stdout}")
-                print(f"stderr: {result.stderr}")
+                logger.debug(
+                    "NOTIFY", "returncode: 0\nstdout: %s\nstderr: %s", result.stdout, result.stderr
+                )
                 return True
             else:
-                print(f"stdout: {result.stdout}")
-                print(f"stderr: {result.stderr}")
+                logger.warning(
+                    "NOTIFY",
+                    "Notify command %s returned %s\nstdout: %s\nstderr: %s",
+                    self.notify_command,
+                    result.returncode,
+                    result.stdout,
+                    result.stderr,
+                )
                 return False
         except (subprocess.TimeoutExpired, Exception) as e:
-            print(f"Exception: {e}")
+            logger.warning("NOTIFY", "Exception: %s", e)
             return False
-
-    def _build_message(self, info: FailureInfo) -> str:
-        """Build the notification message sent to the notify command."""
-        lines = [
-            f"=== Task Failure ===",
-            "",
-            f"Task {info.task_name} has failed.",
-            "",
-            "--- Task Details ---",
-            f"Name:              {info.task_name}",
-            f"Command:           {info.command}",
-            f"Working Directory: {info.working_directory or 'N/A'}",
-            f"Return Code:       {info.return_code}",
-            f"Attempt:           {info.attempt}/{info.max_attempts}",
-            f"Timestamp:         {info.timestamp.strftime('%Y-%m-%d %H:%M:%S')}",
-        ]
-
-        if info.description:
-            lines.append(f"Description:       {info.description}")
-
-        if info.stdout:
-            lines.extend(["", "--- Output ---", info.stdout.strip()])
-
-        if info.stderr:
-            lines.extend(["", "--- Error ---", info.stderr.strip()])
-
-        lines.extend(["", "---", "This is an automated message from Orchestrator."])
-
-        return "\n".join(lines)
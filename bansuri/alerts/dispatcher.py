@@ -0,0 +1,429 @@
+import dataclasses
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from bansuri.alerts.notifier import FailureInfo, Notifier
+from bansuri.alerts.timer import Timer, TimerHeap
+from bansuri.base.config_manager import NotificationsConfig
+from bansuri.base.logger import default_logger
+
+ResultCallback = Optional[Callable[[bool], None]]
+
+
+class _Delivery:
+    __slots__ = ("notifier", "failures", "callbacks", "submitted", "attempt")
+
+    def __init__(
+        self,
+        notifier: Notifier,
+        failures: List[FailureInfo],
+        callbacks: List[List[ResultCallback]],
+        submitted: float,
+    ):
+        self.notifier = notifier
+        self.failures = failures
+        # The callbacks of each failure, coalesced submissions share a failure
+        self.callbacks = callbacks
+        self.submitted = submitted
+        self.attempt = 0
+
+    @property
+    def submissions(self) -> int:
+        return sum(len(callbacks) for callbacks in self.callbacks)
+
+    def split(self, undelivered: List[FailureInfo]) -> "_Delivery":
+        """Keep the ``undelivered`` failures, the others are returned as a new delivery"""
+        failed = {id(failure) for failure in undelivered}
+        sent = _Delivery(self.notifier, [], [], self.submitted)
+        kept: List[int] = []
+        for index, failure in enumerate(self.failures):
+            if id(failure) in failed:
+                kept.append(index)
+            else:
+                sent.failures.append(failure)
+                sent.callbacks.append(self.callbacks[index])
+        self.failures = [self.failures[index] for index in kept]
+        self.callbacks = [self.callbacks[index] for index in kept]
+        return sent
+
+
+class _Destination:
+    """Coalescing window and rate limit state of one destination"""
+
+    __slots__ = ("notifier", "held", "timer", "tokens", "refilled")
+
+    def __init__(self, notifier: Notifier, tokens: float):
+        self.notifier = notifier
+        # (task, return code) -> [failure, callbacks, first submission]
+        self.held: "OrderedDict[Tuple[str, int], list]" = OrderedDict()
+        self.timer: Optional[Timer] = None
+        self.tokens = tokens
+        self.refilled = time.monotonic()
+
+
+class NotificationDispatcher:
+    """
+    Delivers notifications from a bounded queue with a pool of workers.
+
+    Submitting never blocks: when the queue is full the notification is
+    dropped and counted, so a runner thread never waits for a slow
+    notifier. Failed deliveries are retried ``notifier.retries`` times
+    with an exponential backoff from ``notifier.retry_backoff``, scheduled
+    on a timer heap instead of holding a worker while waiting.
+
+    Before being queued, notifications are coalesced per destination: the
+    first one goes out at once and opens a ``window``, the ones submitted
+    during the window are held, the same task failing with the same return
+    code only increasing ``FailureInfo.occurrences``, and are sent as one
+    digest when it closes. Each destination also has a token bucket of
+    ``rate_limit`` messages per ``rate_period``, held failures waiting for
+    the next token, so an incident produces a few messages and never one
+    process per failing task.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 256,
+        max_backoff: float = 300.0,
+        delay_threshold: float = 60.0,
+        settings: Optional[NotificationsConfig] = None,
+        timers: Optional[TimerHeap] = None,
+    ):
+        """
+        NotificationDispatcher init
+
+        :param workers: Notifications delivered at once
+        :param max_queue: Notifications waiting for a worker before new ones are dropped
+        :param max_backoff: Upper bound of the delay before a retry
+        :param delay_threshold: Seconds after which a delivered notification counts as delayed
+        :param settings: Coalescing and rate limits, see ``NotificationsConfig``
+        :param timers: Timer heap scheduling retries and windows, a private one by default
+        """
+        self.workers = workers
+        self.max_backoff = max_backoff
+        self.delay_threshold = delay_threshold
+        self.settings = settings or NotificationsConfig()
+        self.timers = timers or TimerHeap("Notifications")
+        self._queue: "queue.Queue[Optional[_Delivery]]" = queue.Queue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._cond = threading.Condition()
+        self._destinations: Dict[Hashable, _Destination] = {}
+        self._pending = 0
+        self._closed = False
+        self._metrics = {
+            "submitted": 0,
+            "delivered": 0,
+            "failed": 0,
+            "retried": 0,
+            "dropped": 0,
+            "delayed": 0,
+            "coalesced": 0,
+            "digests": 0,
+        }
+        self._max_latency = 0.0
+
+    def configure(self, settings: NotificationsConfig):
+        """Apply new coalescing settings, held notifications included"""
+        with self._cond:
+            self.settings = settings
+            for destination in self._destinations.values():
+                destination.tokens = min(destination.tokens, settings.rate_limit)
+
+    def submit(
+        self,
+        notifier: Notifier,
+        failure_info: FailureInfo,
+        on_result: ResultCallback = None,
+    ) -> bool:
+        """
+        Queue a notification.
+
+        :param on_result: Called from a worker with True once delivered, or
+            False once every attempt failed
+        :return: False when the notification was dropped
+        """
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                self._metrics["dropped"] += 1
+                return False
+            self._metrics["submitted"] += 1
+            self._pending += 1
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work, name=f"Notify-{len(self._threads) + 1}", daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+
+            settings = self.settings
+            if settings.window > 0 or settings.rate_limit > 0:
+                destination = self._destinations.get(notifier.destination)
+                if destination is None:
+                    destination = _Destination(notifier, settings.rate_limit)
+                    self._destinations[notifier.destination] = destination
+                destination.notifier = notifier
+                if destination.timer is not None or not self._take_token(destination, now):
+                    self._hold(destination, failure_info, on_result, now)
+                    return True
+                if settings.window > 0:
+                    destination.timer = self.timers.schedule(
+                        settings.window, self._flush, notifier.destination
+                    )
+
+        delivery = _Delivery(notifier, [failure_info], [[on_result]], now)
+        if self._enqueue(delivery):
+            return True
+        with self._cond:
+            self._pending -= 1
+            self._cond.notify_all()
+        return False
+
+    def metrics(self) -> Dict[str, float]:
+        """Delivery counters, the queue depth and the highest delivery latency"""
+        with self._cond:
+            return {
+                **self._metrics,
+                "queued": self._queue.qsize(),
+                "held": sum(len(d.held) for d in self._destinations.values()),
+                "pending": self._pending,
+                "max_latency": round(self._max_latency, 3),
+            }
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every notification, held and retried ones included, is done.
+
+        :return: False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """
+        Deliver what is queued or held within ``timeout`` seconds, then stop the workers.
+
+        Retries and delayed notifications still waiting on the timer heap are
+        counted as dropped.
+
+        :return: False when notifications were still pending
+        """
+        with self._cond:
+            destinations = list(self._destinations)
+        for key in destinations:
+            # Held notifications go out now, whatever the window and rate limit
+            self._flush(key, force=True)
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            threads = list(self._threads)
+        lost = 0
+        for timer in self.timers.close():
+            if timer.callback == self._retry:
+                lost += timer.args[0].submissions
+            elif timer.callback != self._flush:
+                # A notification delayed by a runner (notify-after) that was not stopped
+                lost += 1
+        if lost:
+            with self._cond:
+                self._metrics["dropped"] += lost
+            self._log(f"WARNING: {lost} pending notification(s) dropped on close")
+        for _ in threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in threads:
+            thread.join(timeout=1)
+        return flushed
+
+    def _take_token(self, destination: _Destination, now: float) -> bool:
+        """Consume a message of the destination rate limit, caller holds the lock"""
+        settings = self.settings
+        if settings.rate_limit <= 0:
+            return True
+        elapsed = now - destination.refilled
+        destination.refilled = now
+        destination.tokens = min(
+            settings.rate_limit,
+            destination.tokens + elapsed * settings.rate_limit / settings.rate_period,
+        )
+        if destination.tokens < 1:
+            return False
+        destination.tokens -= 1
+        return True
+
+    def _token_delay(self, destination: _Destination) -> float:
+        """Seconds until the destination gets a token, caller holds the lock"""
+        settings = self.settings
+        if settings.rate_limit <= 0 or destination.tokens >= 1:
+            return 0.0
+        return (1 - destination.tokens) * settings.rate_period / settings.rate_limit
+
+    def _hold(
+        self,
+        destination: _Destination,
+        failure_info: FailureInfo,
+        on_result: ResultCallback,
+        now: float,
+    ):
+        """Keep a notification for the next digest, caller holds the lock"""
+        key = (failure_info.task_name, failure_info.return_code)
+        held = destination.held.get(key)
+        if held is None:
+            destination.held[key] = [failure_info, [on_result], now]
+        else:
+            # The latest output is the relevant one
+            held[0] = dataclasses.replace(
+                failure_info, occurrences=held[0].occurrences + failure_info.occurrences
+            )
+            held[1].append(on_result)
+            self._metrics["coalesced"] += 1
+        if destination.timer is None:
+            destination.timer = self.timers.schedule(
+                max(self.settings.window, self._token_delay(destination)),
+                self._flush,
+                destination.notifier.destination,
+            )
+
+    def _flush(self, key: Hashable, force: bool = False):
+        """Send what a destination held, once its window closed or when closing"""
+        deliveries = []
+        with self._cond:
+            destination = self._destinations.get(key)
+            if destination is None:
+                return
+            if destination.timer is not None:
+                destination.timer.cancel()
+                destination.timer = None
+            if not destination.held:
+                # Quiet window, the next notification goes out at once
+                if destination.tokens >= self.settings.rate_limit:
+                    del self._destinations[key]
+                return
+
+            now = time.monotonic()
+            while destination.held and (force or self._take_token(destination, now)):
+                if self.settings.digest:
+                    entries = list(destination.held.values())
+                    destination.held.clear()
+                else:
+                    entries = [destination.held.popitem(last=False)[1]]
+                deliveries.append(
+                    _Delivery(
+                        destination.notifier,
+                        [entry[0] for entry in entries],
+                        [entry[1] for entry in entries],
+                        min(entry[2] for entry in entries),
+                    )
+                )
+            if not force:
+                # Held failures wait for a token, sent ones open a new window
+                delay = self.settings.window
+                if destination.held:
+                    delay = max(delay, self._token_delay(destination))
+                destination.timer = self.timers.schedule(delay, self._flush, key)
+
+        for delivery in deliveries:
+            if not self._enqueue(delivery):
+                self._finish(delivery, False)
+
+    def _enqueue(self, delivery: _Delivery) -> bool:
+        try:
+            self._queue.put_nowait(delivery)
+        except queue.Full:
+            with self._cond:
+                self._metrics["dropped"] += delivery.submissions
+            return False
+        return True
+
+    def _retry(self, delivery: _Delivery):
+        if not self._enqueue(delivery):
+            self._finish(delivery, False)
+
+    def _work(self):
+        while True:
+            delivery = self._queue.get()
+            if delivery is None:
+                return
+            self._deliver(delivery)
+
+    def _deliver(self, delivery: _Delivery):
+        notifier = delivery.notifier
+        try:
+            if len(delivery.failures) == 1:
+                undelivered = [] if notifier.notify(delivery.failures[0]) else delivery.failures
+            else:
+                undelivered = list(notifier.notify_batch(delivery.failures))
+        except Exception as e:
+            self._log(f"WARNING: Notifier {type(notifier).__name__} failed: {e}")
+            undelivered = delivery.failures
+
+        delivered = not undelivered
+        if undelivered and len(undelivered) < len(delivery.failures):
+            # Partly delivered, the retries only carry the failures that were not
+            sent = delivery.split(undelivered)
+            with self._cond:
+                self._metrics["delivered"] += 1
+            self._finish(sent, True)
+
+        if not delivered and delivery.attempt < notifier.retries:
+            delay = min(self.max_backoff, notifier.retry_backoff * (2**delivery.attempt))
+            delivery.attempt += 1
+            try:
+                self.timers.schedule(delay, self._retry, delivery)
+            except RuntimeError:
+                # Closed meanwhile
+                pass
+            else:
+                with self._cond:
+                    self._metrics["retried"] += 1
+                return
+
+        with self._cond:
+            latency = time.monotonic() - delivery.submitted
+            if delivered:
+                self._metrics["delivered"] += 1
+                if len(delivery.failures) > 1:
+                    self._metrics["digests"] += 1
+                self._max_latency = max(self._max_latency, latency)
+                if latency > self.delay_threshold:
+                    self._metrics["delayed"] += 1
+            else:
+                self._metrics["failed"] += 1
+        self._finish(delivery, delivered)
+
+    def _finish(self, delivery: _Delivery, delivered: bool):
+        for callbacks in delivery.callbacks:
+            for callback in callbacks:
+                if callback is None:
+                    continue
+                try:
+                    callback(delivered)
+                except Exception as e:
+                    self._log(f"WARNING: Notification callback failed: {e}")
+
+        with self._cond:
+            self._pending -= delivery.submissions
+            self._cond.notify_all()
+
+    @staticmethod
+    def _log(message: str):
+        default_logger().warning("MASTER", message)
+
+
+_default: Optional[NotificationDispatcher] = None
+_default_lock = threading.Lock()
+
+
+def default_dispatcher() -> NotificationDispatcher:
+    """The dispatcher shared by the task runners of this process"""
+    global _default
+    with _default_lock:
+        if _default is None or _default._closed:
+            _default = NotificationDispatcher()
+        return _default
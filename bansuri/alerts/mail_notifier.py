@@ -0,0 +1,257 @@
+import smtplib
+import socket
+import ssl
+import threading
+import time
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from typing import Any, Dict, List, Optional, Tuple
+
+from bansuri.alerts.notifier import FailureInfo, Notifier
+from bansuri.base.logger import default_logger
+
+
+class SMTPRelay:
+    """
+    One SMTP session to a relay, shared by every notifier sending through it.
+
+    The session is opened on the first message and reused for the next
+    ones, which saves a connection, a TLS handshake and a login per
+    message. A session idle for more than ``keepalive`` seconds, or closed
+    by the server meanwhile, is replaced on the next message. Messages are
+    sent one at a time.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_ssl: bool = False,
+        starttls: bool = False,
+        timeout: float = 10,
+        keepalive: float = 60,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._session: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def send(self, message: EmailMessage):
+        """
+        Send a message, reconnecting once when the kept session was closed.
+
+        :raises smtplib.SMTPException: When the relay rejects the message
+        :raises OSError: When the relay cannot be reached
+        """
+        with self._lock:
+            if self._session is not None and time.monotonic() - self._last_used > self.keepalive:
+                self._quit()
+            reused = self._session is not None
+            try:
+                self._send(message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self._quit()
+                if not reused:
+                    raise
+                self._send(message)
+            except Exception:
+                self._quit()
+                raise
+            self._last_used = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self._quit()
+
+    def _send(self, message: EmailMessage):
+        if self._session is None:
+            self._session = self._connect()
+        self._session.send_message(message)
+
+    def _connect(self) -> smtplib.SMTP:
+        context = ssl.create_default_context()
+        if self.use_ssl:
+            session = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=context)
+        else:
+            session = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                session.starttls(context=context)
+            if self.username:
+                session.login(self.username, self.password or "")
+        except Exception:
+            session.close()
+            raise
+        self.connections += 1
+        return session
+
+    def _quit(self):
+        session, self._session = self._session, None
+        if session is None:
+            return
+        try:
+            session.quit()
+        except (smtplib.SMTPException, OSError):
+            session.close()
+
+
+_relays: Dict[Tuple[Any, ...], SMTPRelay] = {}
+_relays_lock = threading.Lock()
+
+
+def get_relay(**settings: Any) -> SMTPRelay:
+    """The relay session shared by the notifiers with the same SMTP settings"""
+    key = tuple(sorted(settings.items()))
+    with _relays_lock:
+        relay = _relays.get(key)
+        if relay is None:
+            relay = _relays[key] = SMTPRelay(**settings)
+        return relay
+
+
+_default_sender: Optional[str] = None
+
+
+def default_sender() -> str:
+    """``bansuri@<hostname>``, the hostname is looked up once per process"""
+    global _default_sender
+    if _default_sender is None:
+        _default_sender = f"bansuri@{socket.getfqdn()}"
+    return _default_sender
+
+
+class MailNotifier(Notifier):
+    """Notify by mail, through an SMTP relay session kept open between messages."""
+
+    def __init__(
+        self,
+        host: str,
+        to: Any,
+        sender: Optional[str] = None,
+        port: Optional[int] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_ssl: bool = False,
+        starttls: bool = False,
+        timeout: float = 10,
+        retries: int = 2,
+        keepalive: float = 60,
+        subject_prefix: str = "[Bansuri]",
+    ):
+        """
+        MailNotifier init
+
+        :param host: SMTP relay host
+        :param to: Recipient address, or list of addresses
+        :param sender: From address, ``bansuri@<hostname>`` by default
+        :param port: Relay port, 465 with ``use_ssl`` and 25 otherwise
+        :param username: Login, no authentication without it
+        :param password: Password of ``username``
+        :param use_ssl: Connect with implicit TLS
+        :param starttls: Upgrade a plain connection with STARTTLS
+        :param timeout: Seconds for the connection and each SMTP command
+        :param retries: Delivery attempts after a failed one
+        :param keepalive: Seconds an idle session is reused for
+        :param subject_prefix: Prepended to the subjects
+        :raises ValueError: On a missing relay or recipient, or an invalid option
+        """
+        if not isinstance(host, str) or not host.strip():
+            raise ValueError("Mail notifications require an SMTP host")
+        recipients = [to] if isinstance(to, str) else to
+        if (
+            not isinstance(recipients, list)
+            or not recipients
+            or not all(isinstance(r, str) and "@" in r for r in recipients)
+        ):
+            raise ValueError("Mail notifications require one or more 'to' addresses")
+        if use_ssl and starttls:
+            raise ValueError("Use either ssl or starttls, not both")
+
+        self.to = recipients
+        # Resolved on the first mail, the hostname lookup may be slow
+        self.sender = sender
+        self.timeout = float(timeout)
+        self.retries = int(retries)
+        self.subject_prefix = subject_prefix
+        if self.timeout <= 0 or self.retries < 0 or float(keepalive) < 0:
+            raise ValueError("Mail timeout must be positive, retries and keepalive not negative")
+        self.relay = get_relay(
+            host=host.strip(),
+            port=int(port or (465 if use_ssl else 25)),
+            username=username,
+            password=password,
+            use_ssl=bool(use_ssl),
+            starttls=bool(starttls),
+            timeout=self.timeout,
+            keepalive=float(keepalive),
+        )
+
+    @classmethod
+    def from_options(cls, options: Dict[str, Any]) -> "MailNotifier":
+        """Build the notifier from the ``notify-options`` of a task"""
+        names = {
+            "host": "host",
+            "port": "port",
+            "to": "to",
+            "from": "sender",
+            "username": "username",
+            "password": "password",
+            "ssl": "use_ssl",
+            "starttls": "starttls",
+            "timeout": "timeout",
+            "retries": "retries",
+            "keepalive": "keepalive",
+            "subject-prefix": "subject_prefix",
+        }
+        unknown = set(options) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown mail option(s): {', '.join(sorted(unknown))}")
+        if "host" not in options or "to" not in options:
+            raise ValueError("Mail notifications require a host and 'to' addresses")
+        return cls(**{names[key]: value for key, value in options.items()})
+
+    @property
+    def destination(self) -> str:
+        relay = self.relay
+        return f"mail:{relay.host}:{relay.port}:{','.join(sorted(self.to))}"
+
+    def notify(self, failure_info: FailureInfo) -> bool:
+        return self._send(
+            f"Task {failure_info.task_name} failed", self._build_message(failure_info)
+        )
+
+    def notify_batch(self, failures: List[FailureInfo]) -> List[FailureInfo]:
+        # One mail for the whole digest
+        if len(failures) == 1:
+            return [] if self.notify(failures[0]) else list(failures)
+        tasks = sorted({info.task_name for info in failures})
+        sent = self._send(f"{len(tasks)} tasks failed", self._build_digest_message(failures))
+        return [] if sent else list(failures)
+
+    def _send(self, subject: str, body: str) -> bool:
+        message = EmailMessage()
+        message["Subject"] = f"{self.subject_prefix} {subject}".strip()
+        sender = self.sender or default_sender()
+        message["From"] = sender
+        message["To"] = ", ".join(self.to)
+        message["Date"] = formatdate(localtime=True)
+        message["Message-ID"] = make_msgid(domain=sender.rpartition("@")[2] or None)
+        message.set_content(body)
+        try:
+            self.relay.send(message)
+        except (smtplib.SMTPException, OSError) as e:
+            default_logger().warning(
+                "NOTIFY", "Mail to %s via %s failed: %s", ", ".join(self.to), self.relay.host, e
+            )
+            return False
+        return True
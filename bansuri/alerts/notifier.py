@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 @dataclass
@@ -16,13 +16,95 @@ class FailureInfo:
     description: str
     stdout: str
     stderr: str
+    occurrences: int = 1  # identical failures merged into this one
 
 
 class Notifier(ABC):
     """Base class for notification handlers."""
 
+    # Seconds a single delivery may take, enforced by the notifier itself
+    timeout: float = 30
+    # Delivery attempts after the first one, and the delay before the first retry,
+    # doubled on each attempt. Applied by the NotificationDispatcher.
+    retries: int = 2
+    retry_backoff: float = 5.0
+
+    @property
+    def destination(self) -> str:
+        """Where the notifications go, notifiers sharing it share coalescing and rate limits"""
+        return f"{type(self).__name__}:{id(self):x}"
+
     @abstractmethod
     def notify(self, failure_info: FailureInfo) -> bool:
         """Abstract method that handles on failure notifications"""
         pass
 
+    def notify_batch(self, failures: List[FailureInfo]) -> List[FailureInfo]:
+        """
+        Send several failures, as one digest when the notifier supports it.
+
+        :return: The failures that were not delivered, only those are retried
+        """
+        return [failure_info for failure_info in failures if not self.notify(failure_info)]
+
+    def _build_message(self, info: FailureInfo) -> str:
+        """Build the plain text message of one failure."""
+        lines = [
+            f"=== Task Failure ===",
+            "",
+            f"Task {info.task_name} has failed.",
+            "",
+            "--- Task Details ---",
+            f"Name:              {info.task_name}",
+            f"Command:           {info.command}",
+            f"Working Directory: {info.working_directory or 'N/A'}",
+            f"Return Code:       {info.return_code}",
+            f"Attempt:           {info.attempt}/{info.max_attempts}",
+            f"Timestamp:         {info.timestamp.strftime('%Y-%m-%d %H:%M:%S')}",
+        ]
+
+        if info.occurrences > 1:
+            lines.append(f"Occurrences:       {info.occurrences}")
+
+        if info.description:
+            lines.append(f"Description:       {info.description}")
+
+        if info.stdout:
+            lines.extend(["", "--- Output ---", info.stdout.strip()])
+
+        if info.stderr:
+            lines.extend(["", "--- Error ---", info.stderr.strip()])
+
+        lines.extend(["", "---", "This is an automated message from Orchestrator."])
+
+        return "\n".join(lines)
+
+    def _build_digest_message(self, failures: List[FailureInfo]) -> str:
+        """Build one message summarizing the failures of several tasks."""
+        tasks = sorted({info.task_name for info in failures})
+        lines = [
+            f"=== {len(tasks)} Task Failures ===",
+            "",
+            f"Tasks {', '.join(tasks)} have failed.",
+        ]
+
+        for info in failures:
+            lines.extend(
+                [
+                    "",
+                    f"--- {info.task_name} ---",
+                    f"Command:           {info.command}",
+                    f"Return Code:       {info.return_code}",
+                    f"Attempt:           {info.attempt}/{info.max_attempts}",
+                    f"Occurrences:       {info.occurrences}",
+                    f"Timestamp:         {info.timestamp.strftime('%Y-%m-%d %H:%M:%S')}",
+                ]
+            )
+            # Only the end of the error output, the full one is in the task logs
+            error = (info.stderr or info.stdout or "").strip().splitlines()[-5:]
+            if error:
+                lines.extend(["Last output:"] + [f"  {line}" for line in error])
+
+        lines.extend(["", "---", "This is an automated message from Orchestrator."])
+
+        return "\n".join(lines)
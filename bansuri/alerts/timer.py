@@ -0,0 +1,108 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from bansuri.base.logger import default_logger
+
+
+class Timer:
+    """A callback scheduled on a ``TimerHeap``"""
+
+    __slots__ = ("due", "callback", "args", "cancelled")
+
+    def __init__(self, due: float, callback: Callable[..., Any], args: Tuple[Any, ...]):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Keep the callback from running, it is a no-op once it ran"""
+        self.cancelled = True
+
+
+class TimerHeap:
+    """
+    Callbacks run at their due time by a single thread.
+
+    Pending callbacks are kept in a heap ordered by due time, so any number
+    of them costs one thread, which only runs while something is scheduled.
+    Callbacks run on that thread one after the other and must return
+    quickly, handing any slow work to another thread.
+    """
+
+    def __init__(self, name: str = "TimerHeap"):
+        self.name = name
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int, Timer]] = []
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Cancelled timers stay in the heap until due, it is swept when it doubled
+        self._sweep_at = 64
+
+    def __len__(self):
+        with self._cond:
+            return sum(1 for _, _, timer in self._heap if not timer.cancelled)
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args: Any) -> Timer:
+        """
+        Run ``callback(*args)`` in ``delay`` seconds.
+
+        :return: The timer, to cancel it
+        :raises RuntimeError: Once the heap is closed
+        """
+        timer = Timer(time.monotonic() + max(0.0, delay), callback, args)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("TimerHeap is closed")
+            if len(self._heap) >= self._sweep_at:
+                self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+                heapq.heapify(self._heap)
+                self._sweep_at = max(64, 2 * len(self._heap))
+            heapq.heappush(self._heap, (timer.due, next(self._seq), timer))
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is timer:
+                # Due before what the thread is waiting for
+                self._cond.notify()
+        return timer
+
+    def close(self) -> List[Timer]:
+        """
+        Drop every pending callback and stop the thread.
+
+        :return: The timers dropped before running, cancelled ones excluded
+        """
+        with self._cond:
+            self._closed = True
+            dropped = [timer for _, _, timer in sorted(self._heap) if not timer.cancelled]
+            self._heap = []
+            self._cond.notify()
+            thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        return dropped
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if self._closed or not self._heap:
+                        self._thread = None
+                        return
+                    remaining = self._heap[0][0] - time.monotonic()
+                    if remaining <= 0:
+                        timer = heapq.heappop(self._heap)[2]
+                        break
+                    self._cond.wait(remaining)
+
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                default_logger().warning("MASTER", f"WARNING: Timer callback failed: {e}")
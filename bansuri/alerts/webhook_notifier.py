@@ -0,0 +1,205 @@
+import dataclasses
+import http.client
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from bansuri.alerts.notifier import FailureInfo, Notifier
+from bansuri.base.logger import default_logger
+
+# A kept-alive connection closed by the server only fails once it is reused
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+def parse_webhook_url(url: Any) -> Tuple[str, str, int, str]:
+    """
+    Split a webhook URL into scheme, host, port and request target.
+
+    :raises ValueError: Unless it is an absolute http or https URL
+    """
+    if not isinstance(url, str):
+        raise ValueError("Webhook url must be a string")
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Webhook url must be an http or https URL, got {url!r}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    return parts.scheme, parts.hostname, port, target
+
+
+class HTTPConnectionPool:
+    """
+    Kept-alive connections to one HTTP server, shared by every notifier posting to it.
+
+    At most ``size`` idle connections are kept, a request without an idle
+    connection opens a new one instead of waiting.
+    """
+
+    def __init__(self, scheme: str, host: str, port: int, timeout: float, size: int = 4):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.size = size
+        self._lock = threading.Lock()
+        self._idle: List[http.client.HTTPConnection] = []
+
+    def request(
+        self, method: str, target: str, body: bytes, headers: Dict[str, str]
+    ) -> Tuple[int, bytes]:
+        """
+        Send a request on an idle connection, or a new one.
+
+        A reused connection the server closed meanwhile is replaced once.
+
+        :return: The status code and the response body
+        """
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            reused = conn is not None
+            if conn is None:
+                conn = self._connect()
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, data
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+_pools: Dict[Tuple[str, str, int, float], HTTPConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(scheme: str, host: str, port: int, timeout: float) -> HTTPConnectionPool:
+    """The connection pool shared by the webhooks of one server"""
+    key = (scheme, host, port, timeout)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = HTTPConnectionPool(scheme, host, port, timeout)
+        return pool
+
+
+class WebhookNotifier(Notifier):
+    """Notify by posting the failures as JSON to an HTTP endpoint."""
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10,
+        retries: int = 2,
+        headers: Optional[Dict[str, str]] = None,
+        batch_size: int = 50,
+    ):
+        """
+        WebhookNotifier init
+
+        :param url: http or https URL the failures are posted to
+        :param timeout: Seconds to connect and to wait for the response
+        :param retries: Delivery attempts after a failed one
+        :param headers: Extra request headers, for instance ``Authorization``
+        :param batch_size: Failures posted per request by ``notify_batch``
+        :raises ValueError: On an invalid URL or option
+        """
+        self.url = url
+        self.scheme, self.host, self.port, self.target = parse_webhook_url(url)
+        self.timeout = float(timeout)
+        self.retries = int(retries)
+        self.headers = dict(headers or {})
+        self.batch_size = int(batch_size)
+        if self.timeout <= 0 or self.retries < 0 or self.batch_size < 1:
+            raise ValueError("Webhook timeout and batch-size must be positive, retries not negative")
+        self.pool = get_pool(self.scheme, self.host, self.port, self.timeout)
+
+    @classmethod
+    def from_options(cls, options: Dict[str, Any]) -> "WebhookNotifier":
+        """Build the notifier from the ``notify-options`` of a task"""
+        known = {"url", "timeout", "retries", "headers", "batch-size"}
+        unknown = set(options) - known
+        if unknown:
+            raise ValueError(f"Unknown webhook option(s): {', '.join(sorted(unknown))}")
+        kwargs = {key.replace("-", "_"): value for key, value in options.items()}
+        if "url" not in kwargs:
+            raise ValueError("Webhook notifications require a url")
+        return cls(**kwargs)
+
+    @property
+    def destination(self) -> str:
+        return f"webhook:{self.url}"
+
+    def notify(self, failure_info: FailureInfo) -> bool:
+        return self._post([failure_info])
+
+    def notify_batch(self, failures: List[FailureInfo]) -> List[FailureInfo]:
+        for start in range(0, len(failures), self.batch_size):
+            if not self._post(failures[start:start + self.batch_size]):
+                # The endpoint is failing, the chunks already posted are not sent again
+                return failures[start:]
+        return []
+
+    def _post(self, failures: List[FailureInfo]) -> bool:
+        body = json.dumps({"event": "task_failure", "failures": [self._payload(f) for f in failures]})
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "bansuri",
+            **self.headers,
+        }
+        try:
+            status, response = self.pool.request("POST", self.target, body.encode("utf-8"), headers)
+        except (OSError, http.client.HTTPException) as e:
+            default_logger().warning("NOTIFY", "Webhook %s failed: %s", self.url, e)
+            return False
+
+        if 200 <= status < 300:
+            return True
+        default_logger().warning(
+            "NOTIFY", "Webhook %s returned %s: %r", self.url, status, response[:200]
+        )
+        return False
+
+    @staticmethod
+    def _payload(info: FailureInfo) -> Dict[str, Any]:
+        payload = dataclasses.asdict(info)
+        payload["timestamp"] = info.timestamp.isoformat()
+        return payload
@@ -1,6 +1,14 @@
 """Base module for Bansuri task management."""
 
-from bansuri.base.task_base import AbstractTask
-from bansuri.base.config_manager import BansuriConfig, ScriptConfig
+from bansuri.base.misc.lazy import lazy_exports
 
-__all__ = ["AbstractTask", "BansuriConfig", "ScriptConfig"]
\ No newline at end of file
+__getattr__ = lazy_exports(
+    __name__,
+    {
+        "AbstractTask": "bansuri.base.task_base",
+        "BansuriConfig": "bansuri.base.config_manager",
+        "ScriptConfig": "bansuri.base.config_manager",
+    },
+)
+
+__all__ = ["AbstractTask", "BansuriConfig", "ScriptConfig"]
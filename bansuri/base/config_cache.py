@@ -0,0 +1,158 @@
+import gc
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, List, Optional
+
+import bansuri
+from bansuri.base.config_manager import (
+    BansuriConfig,
+    NotificationsConfig,
+    ScriptConfig,
+    StartupConfig,
+)
+
+_MAGIC = b"BANSURI-COMPILED-CONFIG 2\n"
+# Settings blocks of BansuriConfig, stored as field names and values like the scripts
+_BLOCKS = {"startup": StartupConfig, "notifications": NotificationsConfig}
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Only builds builtin values, a snapshot never refers to a class"""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Unexpected {module}.{name} in a config snapshot")
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file content, the digest ``ConfigLoader`` keeps for each fragment"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(files: List[str], digests: Optional[Dict[str, str]] = None) -> str:
+    """
+    Hash the content of every source file together with the bansuri and
+    Python versions, so snapshots are never reused across upgrades.
+
+    :param digests: ``file_digest`` of files already hashed, the others are read
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{bansuri.__version__}|{sys.version_info[:2]}".encode("utf-8"))
+    for path in files:
+        content = (digests or {}).get(path) or file_digest(path)
+        digest.update(b"\0" + os.fsencode(path) + b"\0" + content.encode("ascii"))
+    return digest.hexdigest()
+
+
+class CompiledConfigCache:
+    """
+    Binary snapshot of an already validated configuration.
+
+    Scripts are stored as plain tuples in field order with equal strings
+    shared, which unpickles several times faster than the dataclasses
+    themselves. They are rebuilt with the generated ``ScriptConfig``
+    constructor, which only assigns the fields: the normalization, default
+    merging and ``ScriptConfig.validate`` calls of ``BansuriConfig.from_dict``
+    are what a hit saves, the stored values already went through them when
+    the snapshot was written. The ``startup`` and ``notifications``
+    settings are stored the same way, so the snapshot holds builtin values
+    only and a dataclass gaining or losing a field makes it stale instead
+    of failing to load.
+
+    The snapshot is a pickle, so the cache file must live somewhere only the
+    operator can write to, like the configuration itself.
+    """
+
+    def __init__(self, cache_path: str):
+        """
+        CompiledConfigCache init
+
+        :param cache_path: File where the snapshot is stored
+        """
+        self.cache_path = cache_path
+
+    def load(self, key: str) -> Optional[BansuriConfig]:
+        """Return the snapshot stored for ``key``, or None when missing or stale."""
+        try:
+            with open(self.cache_path, "rb") as f:
+                if f.readline() != _MAGIC:
+                    return None
+                if f.readline().strip().decode("ascii", "replace") != key:
+                    return None
+                gc_was_enabled = gc.isenabled()
+                # Tens of thousands of small allocations would trigger pointless collections
+                gc.disable()
+                try:
+                    return self._decode(_PlainUnpickler(f).load())
+                finally:
+                    if gc_was_enabled:
+                        gc.enable()
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+        except (KeyError, TypeError, ValueError):
+            # Snapshot written by an incompatible layout
+            return None
+
+    @staticmethod
+    def _encode(config: BansuriConfig) -> Dict[str, Any]:
+        names = [f.name for f in fields(ScriptConfig)]
+        shared: Dict[str, str] = {}
+
+        def _share(value):
+            if isinstance(value, str):
+                return shared.setdefault(value, value)
+            return value
+
+        return {
+            "fields": names,
+            "rows": [tuple(_share(getattr(s, name)) for name in names) for s in config.scripts],
+            "meta": {
+                f.name: CompiledConfigCache._plain(getattr(config, f.name))
+                for f in fields(BansuriConfig)
+                if f.name != "scripts"
+            },
+        }
+
+    @staticmethod
+    def _plain(value: Any) -> Any:
+        if is_dataclass(value):
+            names = [f.name for f in fields(value)]
+            return names, tuple(getattr(value, name) for name in names)
+        return value
+
+    @staticmethod
+    def _decode(payload: Dict[str, Any]) -> Optional[BansuriConfig]:
+        if payload["fields"] != [f.name for f in fields(ScriptConfig)]:
+            return None
+        meta = dict(payload["meta"])
+        for name, block in _BLOCKS.items():
+            names, values = meta[name]
+            if names != [f.name for f in fields(block)]:
+                return None
+            meta[name] = block(*values)
+        scripts = [ScriptConfig(*row) for row in payload["rows"]]
+        return BansuriConfig(scripts=scripts, **meta)
+
+    def store(self, key: str, config: BansuriConfig):
+        """Atomically replace the snapshot."""
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".bansuri-cache-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_MAGIC)
+                f.write(key.encode("ascii") + b"\n")
+                pickle.dump(self._encode(config), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
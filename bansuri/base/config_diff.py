@@ -0,0 +1,103 @@
+from dataclasses import dataclass, field, fields
+from typing import Dict, List
+
+from bansuri.base.config_manager import ScriptConfig
+
+# Fields that change how the process is spawned, a running task must be restarted
+RESTART_FIELDS = frozenset(
+    {
+        "command",
+        "working_directory",
+        "user",
+        "environment_file",
+        "no_interface",
+        "schedule_cron",
+    }
+)
+
+# Fields read by the notifier, the runner rebuilds it when any of them changes
+NOTIFY_FIELDS = frozenset(
+    {"notify", "notify_command", "notify_mode", "notify_threshold", "notify_options"}
+)
+
+
+def _execution_mode(config: ScriptConfig) -> str:
+    if config.schedule_cron:
+        return "cron"
+    if config.timer and str(config.timer).lower() not in {"none", "0"}:
+        return "timer"
+    return "simple"
+
+
+@dataclass
+class ConfigChange:
+    """Per-field classification of the differences between two task configs."""
+
+    name: str
+    hot_fields: List[str] = field(default_factory=list)
+    restart_fields: List[str] = field(default_factory=list)
+
+    @property
+    def requires_restart(self) -> bool:
+        return bool(self.restart_fields)
+
+    @property
+    def changed_fields(self) -> List[str]:
+        return self.restart_fields + self.hot_fields
+
+    def __bool__(self) -> bool:
+        return bool(self.hot_fields or self.restart_fields)
+
+
+def diff_script_configs(old: ScriptConfig, new: ScriptConfig) -> ConfigChange:
+    """
+    Compare two configs of the same task field by field.
+
+    Changing the timer period is hot-applicable, switching between execution
+    modes (simple, timer, cron) is not.
+    """
+    change = ConfigChange(name=new.name)
+
+    for config_field in fields(ScriptConfig):
+        key = config_field.name
+        if getattr(old, key) == getattr(new, key):
+            continue
+        if key in RESTART_FIELDS:
+            change.restart_fields.append(key)
+        elif key == "timer" and _execution_mode(old) != _execution_mode(new):
+            change.restart_fields.append(key)
+        else:
+            change.hot_fields.append(key)
+
+    return change
+
+
+@dataclass
+class ReloadReport:
+    """What a configuration sync did to each task."""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    restarted: Dict[str, List[str]] = field(default_factory=dict)
+    hot_applied: Dict[str, List[str]] = field(default_factory=dict)
+    deferred: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.added or self.removed or self.restarted or self.hot_applied or self.deferred
+        )
+
+    def summary_lines(self) -> List[str]:
+        lines = [
+            f"Reload summary: {len(self.added)} added, {len(self.removed)} removed, "
+            f"{len(self.restarted)} restarted, {len(self.hot_applied)} hot-applied, "
+            f"{len(self.deferred)} deferred"
+        ]
+        for name, changed in self.restarted.items():
+            lines.append(f"  restarted '{name}': {', '.join(changed)}")
+        for name, changed in self.hot_applied.items():
+            lines.append(f"  hot-applied to '{name}': {', '.join(changed)}")
+        for name, changed in self.deferred.items():
+            lines.append(f"  deferred restart of '{name}': {', '.join(changed)}")
+        return lines
@@ -0,0 +1,277 @@
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bansuri.base.config_manager import BansuriConfig, ScriptConfig
+
+# Files picked up when --config points to a directory
+FRAGMENT_PATTERNS = ("*.json", "*.jsonc")
+
+StatKey = Tuple[int, int, int]
+
+
+def is_multi_file_source(config_path: str) -> bool:
+    """Return True when the path is a conf.d directory or a glob of fragments."""
+    return os.path.isdir(config_path) or glob.has_magic(config_path)
+
+
+def _is_fragment_name(name: str) -> bool:
+    return not name.startswith(".") and any(
+        fnmatch.fnmatch(name, pattern) for pattern in FRAGMENT_PATTERNS
+    )
+
+
+def resolve_config_files(config_path: str) -> List[str]:
+    """
+    Expand a config path into the list of files it refers to, in merge order.
+
+    A directory yields its ``*.json`` and ``*.jsonc`` fragments, a glob its
+    matches, and a plain path itself. Fragments are sorted by name so
+    ``00-defaults.json`` style prefixes control precedence.
+    """
+    if os.path.isdir(config_path):
+        return sorted(
+            os.path.join(config_path, name)
+            for name in os.listdir(config_path)
+            if _is_fragment_name(name) and os.path.isfile(os.path.join(config_path, name))
+        )
+    if glob.has_magic(config_path):
+        return sorted(path for path in glob.glob(config_path) if os.path.isfile(path))
+    return [config_path]
+
+
+def watch_target(config_path: str) -> Tuple[Optional[str], Callable[[str], bool]]:
+    """
+    Return the directory to watch for a config path and a filter for file names in it.
+
+    The directory is None when the glob has wildcards outside its last
+    component, which a single directory watch cannot cover.
+    """
+    config_path = os.path.abspath(config_path)
+    if os.path.isdir(config_path):
+        return config_path, _is_fragment_name
+
+    directory, pattern = os.path.split(config_path)
+    if glob.has_magic(directory):
+        return None, lambda name: True
+    if glob.has_magic(pattern):
+        return directory, lambda name: fnmatch.fnmatch(name, pattern)
+    return directory, lambda name: name == pattern
+
+
+def _stat_key(path: str) -> Optional[StatKey]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+@dataclass
+class _Fragment:
+    """Cached state of a single fragment file."""
+
+    stat_key: Optional[StatKey]
+    digest: str
+    data: Dict[str, Any]
+    scripts: Optional[List[ScriptConfig]] = None
+    defaults_digest: Optional[str] = None
+
+
+class ConfigLoader:
+    """
+    Loads the Bansuri configuration from a file, a conf.d directory or a glob.
+
+    Fragments are merged in name order: their ``defaults`` and ``startup``
+    blocks are merged into one shared block each and their ``scripts`` lists
+    are concatenated. Each fragment is cached by mtime and content hash, so after a change only
+    the modified fragments are parsed and validated again (all of them when
+    the shared defaults change). A task name defined in two fragments is an
+    error.
+
+    With a ``cache_path``, the first load is served from a compiled snapshot
+    when the sources did not change. A full parse refreshes the snapshot
+    when the sources differ from the ones it was stored for, files whose
+    stat did not change since the previous load are not hashed again.
+    """
+
+    def __init__(self, config_path: str, max_workers: int = 8, cache_path: Optional[str] = None):
+        """
+        ConfigLoader init
+
+        :param config_path: Config file, conf.d directory or glob of fragment files
+        :param max_workers: Upper bound of threads used to parse fragments
+        :param cache_path: Optional file for the compiled config snapshot
+        """
+        self.config_path = config_path
+        self.max_workers = max_workers
+        self.cache = None
+        if cache_path:
+            from bansuri.base.config_cache import CompiledConfigCache
+
+            self.cache = CompiledConfigCache(cache_path)
+        self.cache_hit = False
+        self._fragments: Dict[str, _Fragment] = {}
+        self._loaded_once = False
+        # Key of the snapshot on disk, and the content digest of each source by stat
+        self._snapshot_key: Optional[str] = None
+        self._digests: Dict[str, Tuple[StatKey, str]] = {}
+
+    @property
+    def is_multi_file(self) -> bool:
+        return is_multi_file_source(self.config_path)
+
+    def load(self) -> BansuriConfig:
+        self.cache_hit = False
+        if not self.cache:
+            return self._parse()
+
+        files = resolve_config_files(self.config_path)
+        try:
+            key = self._source_key(files)
+        except OSError:
+            # Let the regular parse report the missing source
+            return self._parse()
+
+        if not self._loaded_once:
+            self._loaded_once = True
+            config = self.cache.load(key)
+            if config is not None:
+                self.cache_hit = True
+                self._snapshot_key = key
+                return config
+
+        config = self._parse()
+        if key != self._snapshot_key:
+            try:
+                self.cache.store(key, config)
+                self._snapshot_key = key
+            except OSError:
+                pass
+        return config
+
+    def _source_key(self, files: List[str]) -> str:
+        """Snapshot key of the sources, only files whose stat changed are hashed again"""
+        from bansuri.base.config_cache import file_digest, source_key
+
+        digests = {}
+        for path in files:
+            stat_key = _stat_key(path)
+            known = self._digests.get(path)
+            if stat_key is None or known is None or known[0] != stat_key:
+                known = (stat_key, file_digest(path))
+                if stat_key is not None:
+                    self._digests[path] = known
+            digests[path] = known[1]
+        self._digests = {path: self._digests[path] for path in files if path in self._digests}
+        return source_key(files, digests)
+
+    def _parse(self) -> BansuriConfig:
+        if not self.is_multi_file:
+            return BansuriConfig.load_from_file(self.config_path)
+
+        files = resolve_config_files(self.config_path)
+        if not files:
+            raise FileNotFoundError(f"No configuration fragments found in: {self.config_path}")
+
+        # Drop fragments that disappeared since the previous load
+        self._fragments = {path: self._fragments[path] for path in files if path in self._fragments}
+
+        self._run_parallel(self._refresh_fragment, files)
+
+        version = "UNKNOWN"
+        notify_command = None
+        defaults: Dict[str, Any] = {}
+        startup: Dict[str, Any] = {}
+        notifications: Dict[str, Any] = {}
+        for path in files:
+            data = self._fragments[path].data
+            version = data.get("version", version)
+            notify_command = data.get("notify_command", notify_command)
+            defaults = BansuriConfig._merge_dicts(defaults, data.get("defaults", {}))
+            startup = BansuriConfig._merge_dicts(startup, data.get("startup", {}))
+            notifications = BansuriConfig._merge_dicts(
+                notifications, data.get("notifications", {})
+            )
+
+        defaults_digest = hashlib.sha256(
+            json.dumps(defaults, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+        stale = [
+            path for path in files if self._fragments[path].defaults_digest != defaults_digest
+        ]
+        self._run_parallel(lambda path: self._build_scripts(path, defaults, defaults_digest), stale)
+
+        scripts: List[ScriptConfig] = []
+        owners: Dict[str, str] = {}
+        for path in files:
+            for script in self._fragments[path].scripts or []:
+                if script.name in owners:
+                    raise ValueError(
+                        f"Duplicate task name '{script.name}' defined in "
+                        f"{owners[script.name]} and {path}"
+                    )
+                owners[script.name] = path
+                scripts.append(script)
+
+        return BansuriConfig(
+            version=version,
+            scripts=scripts,
+            notify_command=notify_command,
+            startup=BansuriConfig.parse_startup(startup),
+            notifications=BansuriConfig.parse_notifications(notifications),
+        )
+
+    def _run_parallel(self, func, paths: List[str]):
+        if len(paths) <= 1 or self.max_workers <= 1:
+            for path in paths:
+                func(path)
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(paths))) as executor:
+            # list() re-raises the first worker exception
+            list(executor.map(func, paths))
+
+    def _refresh_fragment(self, path: str):
+        """Re-read a fragment only when its stat or content hash changed."""
+        cached = self._fragments.get(path)
+        stat_key = _stat_key(path)
+        if cached and stat_key is not None and cached.stat_key == stat_key:
+            return
+
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            raise FileNotFoundError(f"Configuration file not found: {path} ({e})")
+
+        digest = hashlib.sha256(raw).hexdigest()
+        if cached and cached.digest == digest:
+            cached.stat_key = stat_key
+            return
+
+        try:
+            data = BansuriConfig._loads_jsonc(raw.decode("utf-8"))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Error decoding JSON in {path}: {e}")
+        if not isinstance(data, dict):
+            raise ValueError(f"Configuration fragment {path} must contain a JSON object")
+
+        self._fragments[path] = _Fragment(stat_key=stat_key, digest=digest, data=data)
+
+    def _build_scripts(self, path: str, defaults: Dict[str, Any], defaults_digest: str):
+        fragment = self._fragments[path]
+        try:
+            fragment.scripts = BansuriConfig.parse_scripts(
+                fragment.data.get("scripts", []), defaults
+            )
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}")
+        fragment.defaults_digest = defaults_digest
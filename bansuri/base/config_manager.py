@@ -1,9 +1,29 @@
 from datetime import datetime
 import json
 import os
+import re
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Union, Any
 
+from bansuri.base.logger import default_logger
+
+
+_JSONC_BLOCK_COMMENT = r"/\*[^*]*\*+(?:[^*/][^*]*\*+)*/"
+
+# Kept runs (plain text, string literals, lone slashes, non-trailing commas) are
+# matched in bulk, so the replacement callback only fires around comments and
+# trailing commas.
+_JSONC_TOKEN = re.compile(
+    r'((?:[^"/,]+|"[^"\\]*(?:\\[\s\S][^"\\]*)*"|/(?![/*])'
+    r"|,(?!(?:\s|//[^\n]*|" + _JSONC_BLOCK_COMMENT + r")*[\]}]))+)"
+    r"|//[^\n]*"
+    r"|" + _JSONC_BLOCK_COMMENT + r"|,"
+)
+
+
+# How the restart delay grows with consecutive failures
+RESTART_SCHEDULINGS = ("none", "dynamic-linear", "dynamic")
+
 
 @dataclass
 class ScriptConfig:
@@ -31,10 +51,19 @@ class ScriptConfig:
     notify: str = "none"
     notify_after: Optional[str] = "300s"
     description: str = ""
-    restart_delay: Optional[str] = "5s"
+    restart_delay: Optional[str] = "5s"  # delay before the first restart
+    restart_scheduling: str = "none"  # growth of the delay: none, dynamic-linear or dynamic
+    restart_step: Optional[float] = None  # seconds added (dynamic-linear) or multiplier (dynamic)
+    restart_max_delay: Optional[str] = "5m"  # cap of a growing delay, a run lasting longer resets it
+    restart_jitter: float = 0  # random share added to or removed from each delay
+    restart_flap_limit: int = 0  # more restarts than this within restart_flap_window trip a cooldown, 0 disables it
+    restart_flap_window: Optional[str] = "60s"
+    restart_cooldown: Optional[str] = "5m"
     notify_mode: str = "after-fail"
     notify_threshold: int = 1
     notify_command: Optional[str] = None
+    notify_options: Dict[str, Any] = field(default_factory=dict)  # settings of the webhook and mail handlers
+    tags: List[str] = field(default_factory=list)
 
     @property
     def is_smart_script(self) -> bool:
@@ -49,6 +78,38 @@ class ScriptConfig:
             self.name = f"{self.command}-{str(datetime.now()):x}"
             pass
 
+        if isinstance(self.tags, str):
+            self.tags = [tag.strip() for tag in self.tags.split(",") if tag.strip()]
+        if not isinstance(self.tags, list) or not all(isinstance(tag, str) for tag in self.tags):
+            raise ValueError(f"'tags' of '{self.name}' must be a list of strings")
+
+        try:
+            self.priority = int(self.priority)
+        except (TypeError, ValueError):
+            raise ValueError(f"'priority' of '{self.name}' must be an integer")
+
+        if not isinstance(self.notify_options, dict):
+            raise ValueError(f"'notify-options' of '{self.name}' must be an object")
+
+        if self.restart_scheduling not in RESTART_SCHEDULINGS:
+            raise ValueError(
+                f"'restart-scheduling' of '{self.name}' must be one of {', '.join(RESTART_SCHEDULINGS)}"
+            )
+        if self.restart_step is not None:
+            try:
+                self.restart_step = float(self.restart_step)
+            except (TypeError, ValueError):
+                raise ValueError(f"'restart-step' of '{self.name}' must be a number")
+            minimum = 1 if self.restart_scheduling == "dynamic" else 0
+            if self.restart_step <= 0 or self.restart_step < minimum:
+                raise ValueError(
+                    f"'restart-step' of '{self.name}' must be positive, and at least 1 with 'dynamic'"
+                )
+        if not isinstance(self.restart_jitter, (int, float)) or not 0 <= self.restart_jitter <= 1:
+            raise ValueError(f"'restart-jitter' of '{self.name}' must be between 0 and 1")
+        if not isinstance(self.restart_flap_limit, int) or self.restart_flap_limit < 0:
+            raise ValueError(f"'restart-flap-limit' of '{self.name}' must be a non-negative integer")
+
         if not self.is_smart_script:
             # The execution method MUST be defined (cron, timer, ...)
             has_schedule = self.schedule_cron or (
@@ -62,6 +123,28 @@ class ScriptConfig:
                 )
 
 
+@dataclass
+class StartupConfig:
+    """
+    Startup ramp applied when tasks are launched
+    """
+
+    rate: float = 0  # launches per second, 0 starts everything at once
+    services_first: bool = False  # start restartable simple tasks before one-shot jobs
+
+
+@dataclass
+class NotificationsConfig:
+    """
+    Coalescing and rate limiting of failure notifications
+    """
+
+    window: float = 10  # seconds during which repeated failures are merged, 0 disables it
+    digest: bool = True  # send the failures merged in a window as one message
+    rate_limit: int = 6  # messages per destination and rate_period, 0 disables it
+    rate_period: float = 60
+
+
 @dataclass
 class BansuriConfig:
     "Represents the current loaded definitions for Bansuri"
@@ -69,9 +152,16 @@ class BansuriConfig:
     version: str
     scripts: List[ScriptConfig]
     notify_command: Optional[str] = None  # command <text> TODO: make <text> replaceable
+    startup: StartupConfig = field(default_factory=StartupConfig)
+    notifications: NotificationsConfig = field(default_factory=NotificationsConfig)
 
     @classmethod
     def load_from_file(cls, file_path: str) -> "BansuriConfig":
+        return cls.from_dict(cls.read_json_file(file_path))
+
+    @classmethod
+    def read_json_file(cls, file_path: str) -> Dict[str, Any]:
+        """Read and decode a JSON (or JSONC) configuration file."""
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Configuration file not found: {file_path}")
 
@@ -79,33 +169,85 @@ class BansuriConfig:
             raw_text = f.read()
 
         try:
-            data = json.loads(raw_text)
-        except json.JSONDecodeError:
+            return cls._loads_jsonc(raw_text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Error decoding JSON in {file_path}: {e}")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BansuriConfig":
+        """Build the configuration from an already decoded document."""
+        scripts = cls.parse_scripts(data.get("scripts", []), data.get("defaults", {}))
+        return cls(
+            version=data.get("version", "UNKNOWN"),
+            scripts=scripts,
+            notify_command=data.get("notify_command"),
+            startup=cls.parse_startup(data.get("startup", {})),
+            notifications=cls.parse_notifications(data.get("notifications", {})),
+        )
+
+    @classmethod
+    def parse_startup(cls, startup_data: Any) -> StartupConfig:
+        """Build the startup ramp settings from the ``startup`` block."""
+        if not isinstance(startup_data, dict):
+            raise ValueError("'startup' must be an object")
+
+        try:
+            rate = float(startup_data.get("rate", 0) or 0)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid startup rate: {startup_data.get('rate')!r}")
+        if rate < 0:
+            raise ValueError(f"Startup rate must be positive, got {rate}")
+
+        return StartupConfig(
+            rate=rate,
+            services_first=cls._coerce_bool(startup_data.get("services-first", False)),
+        )
+
+    @classmethod
+    def parse_notifications(cls, notifications_data: Any) -> NotificationsConfig:
+        """Build the notification coalescing settings from the ``notifications`` block."""
+        if not isinstance(notifications_data, dict):
+            raise ValueError("'notifications' must be an object")
+
+        defaults = NotificationsConfig()
+        values = {}
+        for key, attr, cast in (
+            ("window", "window", float),
+            ("rate-limit", "rate_limit", int),
+            ("rate-period", "rate_period", float),
+        ):
+            raw = notifications_data.get(key)
             try:
-                data = json.loads(cls._strip_json_comments(raw_text))
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Error decoding JSON in {file_path}: {e}")
-
-        version = data.get("version", "UNKNOWN")
-        notify_command = data.get("notify_command")
-        defaults = data.get("defaults", {})
-        scripts_data = data.get("scripts", [])
+                value = cast(raw) if raw not in (None, "") else getattr(defaults, attr)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid notifications {key}: {raw!r}")
+            if value < 0 or (attr == "rate_period" and value == 0):
+                raise ValueError(f"Notifications {key} must be positive, got {value}")
+            values[attr] = value
+
+        return NotificationsConfig(
+            digest=cls._coerce_bool(notifications_data.get("digest", defaults.digest)),
+            **values,
+        )
+
+    @classmethod
+    def parse_scripts(
+        cls, scripts_data: List[Dict[str, Any]], defaults: Dict[str, Any]
+    ) -> List[ScriptConfig]:
+        """Normalize, filter and validate a list of raw script entries."""
         parsed_scripts = []
+        valid_keys = set(ScriptConfig.__annotations__)
 
         for item in scripts_data:
             normalized_item = cls._normalize_script_item(item, defaults)
 
-            valid_keys = ScriptConfig.__annotations__.keys()
             filtered_item = {k: v for k, v in normalized_item.items() if k in valid_keys}
 
-            not_found_keys = set(normalized_item) - set(valid_keys)
+            not_found_keys = normalized_item.keys() - valid_keys
 
             for k in not_found_keys:
                 message = f"Config: Found key {k} but not recognized as a bansuri valid field"
-                print(
-                    f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [MASTER] {message}",
-                    flush=True,
-                )
+                default_logger().warning("MASTER", message)
 
             try:
                 script = ScriptConfig(**filtered_item)
@@ -118,7 +260,7 @@ class BansuriConfig:
             except ValueError as e:
                 raise ValueError(f"Validation error in '{cls._script_name(item)}': {e}")
 
-        return cls(version=version, scripts=parsed_scripts, notify_command=notify_command)
+        return parsed_scripts
 
     @staticmethod
     def _script_name(item: Dict[str, Any]) -> str:
@@ -163,30 +305,45 @@ class BansuriConfig:
 
         notify_handler = "none"
         notify_command = None
+        notify_options: Dict[str, Any] = {}
         if cls._coerce_bool(notify_config.get("enabled", False)):
             handler = str(notify_config.get("handler", "command")).lower()
-            if handler == "command":
+            if handler == "webhook":
+                handler_config = notify_config.get("handler-config")
+                if isinstance(handler_config, str):
+                    handler_config = {"url": handler_config}
+                if isinstance(handler_config, dict):
+                    notify_handler = "webhook"
+                    notify_options = handler_config
+                else:
+                    message = "Config: webhook notify handler requires a URL or an object handler-config. Notifications disabled."
+                    default_logger().warning("MASTER", message)
+            elif handler == "mail":
+                handler_config = notify_config.get("handler-config")
+                if isinstance(handler_config, dict):
+                    notify_handler = "mail"
+                    notify_options = handler_config
+                else:
+                    message = "Config: mail notify handler requires an object handler-config. Notifications disabled."
+                    default_logger().warning("MASTER", message)
+            elif handler == "command":
                 handler_config = notify_config.get("handler-config")
                 if isinstance(handler_config, str):
                     notify_handler = "command"
                     notify_command = handler_config
                 elif handler_config is not None:
                     message = "Config: command notify handler requires string handler-config. Notifications disabled."
-                    print(
-                        f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [MASTER] {message}",
-                        flush=True,
-                    )
+                    default_logger().warning("MASTER", message)
             else:
                 message = f"Config: notify handler '{handler}' is not supported yet. Notifications disabled."
-                print(
-                    f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [MASTER] {message}",
-                    flush=True,
-                )
+                default_logger().warning("MASTER", message)
 
         return {
             "name": general.get("name"),
             "command": general.get("command"),
             "description": general.get("description", ""),
+            "tags": general.get("tags", []),
+            "priority": cls._coerce_int(general.get("priority"), 0),
             "working_directory": general.get("working-directory"),
             "schedule_cron": schedule_cron,
             "timer": timer,
@@ -199,8 +356,17 @@ class BansuriConfig:
             "notify": notify_handler,
             "notify_mode": str(notify_config.get("mode", "after-fail")).lower(),
             "notify_threshold": cls._coerce_int(notify_config.get("after-threshold"), 1),
+            "notify_after": notify_config.get("after", "300s"),
             "notify_command": notify_command,
+            "notify_options": notify_options,
             "restart_delay": restart_params.get("after", "5s"),
+            "restart_scheduling": str(restart_params.get("after-scheduling", "none")).lower(),
+            "restart_step": restart_params.get("after-step"),
+            "restart_max_delay": restart_params.get("max-delay", "5m"),
+            "restart_jitter": restart_params.get("jitter", 0),
+            "restart_flap_limit": cls._coerce_int(restart_params.get("flap-limit"), 0),
+            "restart_flap_window": restart_params.get("flap-window", "60s"),
+            "restart_cooldown": restart_params.get("cooldown", "5m"),
         }
 
     @staticmethod
@@ -237,64 +403,39 @@ class BansuriConfig:
             return default
         return int(value)
 
+    @classmethod
+    def _loads_jsonc(cls, text: str) -> Any:
+        """Parse JSON that may contain comments and trailing commas.
+
+        Plain JSON goes straight through the C parser. A strict parse stops at
+        the first JSONC token, and everything before that position is known
+        to be plain JSON, so only the remainder is preprocessed.
+        """
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            split = e.pos
+            head = text[:split].rstrip()
+            if head.endswith(","):
+                # The comma may be a trailing one, let the preprocessor decide
+                split = len(head) - 1
+            return json.loads(text[:split] + cls._strip_json_comments(text[split:]))
+
     @staticmethod
     def _strip_json_comments(text: str) -> str:
-        result = []
-        in_string = False
-        escaped = False
-        in_line_comment = False
-        in_block_comment = False
-        index = 0
-
-        while index < len(text):
-            char = text[index]
-            next_char = text[index + 1] if index + 1 < len(text) else ""
-
-            if in_line_comment:
-                if char == "\n":
-                    in_line_comment = False
-                    result.append(char)
-                index += 1
-                continue
-
-            if in_block_comment:
-                if char == "*" and next_char == "/":
-                    in_block_comment = False
-                    index += 2
-                    continue
-                if char == "\n":
-                    result.append(char)
-                index += 1
-                continue
-
-            if in_string:
-                result.append(char)
-                if escaped:
-                    escaped = False
-                elif char == "\\":
-                    escaped = True
-                elif char == "\"":
-                    in_string = False
-                index += 1
-                continue
-
-            if char == "\"":
-                in_string = True
-                result.append(char)
-                index += 1
-                continue
-
-            if char == "/" and next_char == "/":
-                in_line_comment = True
-                index += 2
-                continue
-
-            if char == "/" and next_char == "*":
-                in_block_comment = True
-                index += 2
-                continue
-
-            result.append(char)
-            index += 1
-
-        return "".join(result)
+        """Strip ``//`` and ``/* */`` comments and trailing commas in a single regex pass.
+
+        Newlines inside block comments are kept so JSON error positions still
+        point at the right line.
+        """
+
+        def _replace(match):
+            kept = match.group(1)
+            if kept is not None:
+                return kept
+            token = match.group(0)
+            if token.startswith("/*"):
+                return "\n" * token.count("\n")
+            return ""
+
+        return _JSONC_TOKEN.sub(_replace, text)
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import select
+import time
+from typing import Optional, Tuple
+
+from bansuri.base.config_loader import resolve_config_files, watch_target
+from bansuri.base.misc import inotify
+
+_WATCH_MASK = (
+    inotify.IN_CLOSE_WRITE
+    | inotify.IN_MODIFY
+    | inotify.IN_ATTRIB
+    | inotify.IN_CREATE
+    | inotify.IN_DELETE
+    | inotify.IN_MOVED_FROM
+    | inotify.IN_MOVED_TO
+    | inotify.IN_DELETE_SELF
+    | inotify.IN_MOVE_SELF
+)
+
+StatKey = Tuple[Tuple[str, int, int, int], ...]
+
+
+class ConfigWatcher:
+    """
+    Blocks until the configuration changes.
+
+    The configuration may be a single file, a conf.d directory or a glob of
+    fragments. Uses inotify on the containing directory when available, so
+    editors that replace files through a rename are also detected. Otherwise
+    the files are polled with a cheap ``stat`` and only hashed when mtime or
+    size moved. Bursts of events are debounced, and a reload is only
+    reported when the content hash actually changed.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        poll_interval: float = 5,
+        debounce: float = 0.25,
+        use_inotify: bool = True,
+    ):
+        """
+        ConfigWatcher init
+
+        :param config_path: Configuration file, conf.d directory or glob to watch
+        :param poll_interval: Seconds between stat checks when inotify is unavailable
+        :param debounce: Quiet period required after the last event before reporting a change
+        :param use_inotify: Set to False to force the polling backend
+        """
+        self.config_path = os.path.abspath(config_path)
+        self._watch_dir, self._name_matches = watch_target(self.config_path)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._reload_requested = False
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+
+        self._stat_key: Optional[StatKey] = None
+        self._fingerprint: Optional[str] = self._compute_fingerprint()
+
+        self._inotify: Optional[inotify.Inotify] = None
+        if use_inotify and self._watch_dir and inotify.inotify_available():
+            self._setup_inotify()
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify else "polling"
+
+    def _setup_inotify(self):
+        try:
+            watcher = inotify.Inotify()
+        except OSError:
+            return
+        try:
+            watcher.add_watch(self._watch_dir, _WATCH_MASK)
+        except OSError:
+            watcher.close()
+            return
+        self._inotify = watcher
+
+    def _drop_inotify(self):
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    def _stat(self) -> Optional[StatKey]:
+        stat_key = []
+        for path in resolve_config_files(self.config_path):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stat_key.append((path, st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(stat_key) or None
+
+    def _compute_fingerprint(self) -> Optional[str]:
+        stat_key = self._stat()
+        self._stat_key = stat_key
+        if stat_key is None:
+            return None
+
+        digest = hashlib.sha256()
+        for path, *_ in stat_key:
+            digest.update(path.encode("utf-8", "surrogateescape") + b"\0")
+            try:
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(chunk)
+            except OSError:
+                continue
+        return digest.hexdigest()
+
+    def _content_changed(self, force_hash: bool = False) -> bool:
+        """Return True when the content differs from the last seen version."""
+        if not force_hash and self._stat() == self._stat_key:
+            return False
+
+        fingerprint = self._compute_fingerprint()
+        changed = fingerprint != self._fingerprint
+        self._fingerprint = fingerprint
+        return changed
+
+    def request_reload(self):
+        """Force the next ``wait_for_change`` to return True. Safe to call from signal handlers."""
+        self._reload_requested = True
+        self.wake()
+
+    def wake(self):
+        """Interrupt a blocking ``wait_for_change``."""
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _drain_wake_pipe(self):
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _consume_reload_request(self) -> bool:
+        if not self._reload_requested:
+            return False
+        self._reload_requested = False
+        self._fingerprint = self._compute_fingerprint()
+        return True
+
+    def _relevant_events(self) -> bool:
+        """Drain pending inotify events and report whether any concern the config files."""
+        relevant = False
+        for event in self._inotify.read_events():
+            if event.mask & (inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF | inotify.IN_IGNORED):
+                # The directory itself went away, inotify cannot follow it anymore
+                self._drop_inotify()
+                return True
+            if event.mask & inotify.IN_Q_OVERFLOW or self._name_matches(event.name):
+                relevant = True
+        return relevant
+
+    def _debounce_events(self) -> bool:
+        """Wait until the event stream stays quiet for ``debounce`` seconds."""
+        relevant = self._relevant_events()
+        while self._inotify:
+            readable, _, _ = select.select([self._inotify], [], [], self.debounce)
+            if not readable:
+                break
+            relevant = self._relevant_events() or relevant
+        return relevant
+
+    def wait_for_change(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the config changes, a reload is requested or timeout expires.
+
+        :param timeout: Maximum seconds to wait, None to wait indefinitely
+        :return: True when the configuration must be synchronized again
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if self._consume_reload_request():
+                return True
+
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            if self._inotify:
+                readable, _, _ = select.select([self._inotify, self._wake_r], [], [], remaining)
+                if self._wake_r in readable:
+                    self._drain_wake_pipe()
+                if self._inotify in readable and self._debounce_events():
+                    if self._content_changed(force_hash=True):
+                        return True
+            else:
+                wait = self.poll_interval if remaining is None else min(self.poll_interval, remaining)
+                readable, _, _ = select.select([self._wake_r], [], [], wait)
+                if readable:
+                    self._drain_wake_pipe()
+                if self._content_changed():
+                    return True
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return self._consume_reload_request()
+
+    def close(self):
+        self._drop_inotify()
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
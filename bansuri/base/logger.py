@@ -0,0 +1,270 @@
+"""Asynchronous log output shared by the master, the runners and the dashboard."""
+
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from time import time as _now
+from typing import Any, List, Optional, TextIO, Tuple
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+_LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+# created, level, source, message, lazy % arguments
+_Record = Tuple[float, int, str, str, Tuple[Any, ...]]
+
+
+def parse_level(value: Any) -> int:
+    """
+    Resolve a level name (``"debug"``, ``"warning"``...) or number.
+
+    :raises ValueError: On an unknown level
+    """
+    if isinstance(value, int):
+        return value
+    level = _LEVELS.get(str(value).strip().lower())
+    if level is None:
+        raise ValueError(f"Unknown log level {value!r}, expected one of {', '.join(_LEVELS)}")
+    return level
+
+
+class Logger:
+    """
+    Log lines written by a single background thread.
+
+    ``log`` only appends the record to a queue, so callers on any thread
+    never wait for the output stream. The writer thread formats the
+    queued records, writes them in one call and flushes once per batch.
+    Records below ``level`` are dropped before being queued, and their
+    ``%`` arguments are never formatted.
+
+    Lines are ``[%Y-%m-%d %H:%M:%S] [SOURCE] message``, or JSON objects
+    with ``json_lines``.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        level: int = INFO,
+        json_lines: bool = False,
+        batch_size: int = 512,
+    ):
+        """
+        Logger init
+
+        :param stream: Output stream, the current ``sys.stdout`` when None
+        :param level: Lowest level written
+        :param json_lines: Write one JSON object per line instead of text
+        :param batch_size: Records written per flush at most
+        """
+        self.stream = stream
+        self.level = level
+        self.json_lines = json_lines
+        self.batch_size = batch_size
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # strftime runs once per second of log output, not once per line
+        self._stamp_second = -1
+        self._stamp = ""
+
+    def enabled_for(self, level: int) -> bool:
+        """True when records of ``level`` are written, to skip building costly messages"""
+        return level >= self.level
+
+    def log(self, level: int, source: str, message: str, *args: Any):
+        """
+        Queue a record.
+
+        :param level: One of ``DEBUG``, ``INFO``, ``WARNING`` and ``ERROR``
+        :param source: Shown between brackets, ``MASTER`` or a task name
+        :param message: The message, ``%``-formatted with ``args`` by the writer
+        """
+        if level < self.level:
+            return
+        record = (_now(), level, source, message, args)
+        if self._closed:
+            self._write([record])
+            return
+        self._queue.put(record)
+        if self._thread is None:
+            self._start()
+
+    def debug(self, source: str, message: str, *args: Any):
+        self.log(DEBUG, source, message, *args)
+
+    def info(self, source: str, message: str, *args: Any):
+        self.log(INFO, source, message, *args)
+
+    def warning(self, source: str, message: str, *args: Any):
+        self.log(WARNING, source, message, *args)
+
+    def error(self, source: str, message: str, *args: Any):
+        self.log(ERROR, source, message, *args)
+
+    def flush(self, timeout: float = 5) -> bool:
+        """
+        Wait until the records queued so far are written.
+
+        :return: False when they were not written within ``timeout`` seconds
+        """
+        if self._thread is None or self._closed:
+            # Nothing queued, or already written by close
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5):
+        """Write the queued records and stop the writer, later records are written directly"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None or self._closed:
+                return
+            self._thread = threading.Thread(target=self._run, name="Logger", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch: List[_Record] = []
+            waiters: List[threading.Event] = []
+            item = self._queue.get()
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                # Records queued while closing
+                self._drain()
+                return
+
+    def _drain(self):
+        batch: List[_Record] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not None:
+                batch.append(item)
+        self._write(batch)
+
+    def _write(self, batch: List[_Record]):
+        if not batch:
+            return
+        text = "".join(self._format(record) for record in batch)
+        stream = self.stream or sys.stdout
+        try:
+            stream.write(text)
+            stream.flush()
+        except (OSError, ValueError):
+            # Closed or broken output, the records are lost
+            pass
+
+    def _format(self, record: _Record) -> str:
+        created, level, source, message, args = record
+        if args:
+            try:
+                message = message % args
+            except (TypeError, ValueError) as e:
+                message = f"{message} {args!r} (formatting failed: {e})"
+
+        if self.json_lines:
+            return (
+                json.dumps(
+                    {
+                        "time": datetime.fromtimestamp(created).isoformat(timespec="milliseconds"),
+                        "level": LEVEL_NAMES.get(level, str(level)),
+                        "source": source,
+                        "message": message,
+                    },
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
+
+        second = int(created)
+        if second != self._stamp_second:
+            self._stamp_second = second
+            self._stamp = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{self._stamp}] [{source}] {message}\n"
+
+
+_default: Optional[Logger] = None
+_default_lock = threading.Lock()
+
+
+def default_logger() -> Logger:
+    """
+    The logger shared by this process.
+
+    ``BANSURI_LOG_LEVEL`` sets its level (``info`` by default) and
+    ``BANSURI_LOG_FORMAT=json`` switches it to JSON lines.
+    """
+    global _default
+    if _default is not None:
+        return _default
+    with _default_lock:
+        if _default is None:
+            try:
+                level = parse_level(os.getenv("BANSURI_LOG_LEVEL", "info"))
+            except ValueError:
+                level = INFO
+            json_lines = os.getenv("BANSURI_LOG_FORMAT", "text").strip().lower() == "json"
+            _default = Logger(level=level, json_lines=json_lines)
+        return _default
+
+
+def set_default_logger(logger: Logger) -> Optional[Logger]:
+    """
+    Replace the shared logger, for instance with one writing to a file.
+
+    :return: The previous logger, flushed
+    """
+    global _default
+    with _default_lock:
+        previous, _default = _default, logger
+    if previous is not None:
+        previous.flush()
+    return previous
+
+
+@atexit.register
+def _close_default():
+    # The writer is a daemon thread, write what is left before exiting
+    if _default is not None:
+        _default.close()
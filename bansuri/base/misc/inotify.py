@@ -0,0 +1,123 @@
+"""Minimal ctypes binding for the Linux inotify API.
+
+Only the pieces Bansuri needs are exposed: creating an instance, adding
+watches and decoding the event stream. On platforms without inotify,
+``inotify_available()`` returns False and callers are expected to fall
+back to polling.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+from typing import List, NamedTuple, Optional
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+_libc = None
+_checked = False
+
+
+class InotifyEvent(NamedTuple):
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+
+def _load_libc():
+    global _libc, _checked
+    if _checked:
+        return _libc
+    _checked = True
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_init1.restype = ctypes.c_int
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_add_watch.restype = ctypes.c_int
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        libc.inotify_rm_watch.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        libc = None
+    _libc = libc
+    return _libc
+
+
+def inotify_available() -> bool:
+    """Return True when the running platform exposes inotify."""
+    return _load_libc() is not None
+
+
+class Inotify:
+    """A non-blocking inotify instance.
+
+    The file descriptor can be passed to ``select``; ``read_events`` drains
+    whatever is currently queued.
+    """
+
+    def __init__(self):
+        libc = _load_libc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._libc = libc
+        self.fd = fd
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch({path}): {os.strerror(err)}")
+        return wd
+
+    def rm_watch(self, wd: int):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[InotifyEvent]:
+        """Read and decode all pending events without blocking."""
+        events: List[InotifyEvent] = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            if not data:
+                return events
+
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                raw_name = data[offset : offset + length]
+                offset += length
+                name = os.fsdecode(raw_name.rstrip(b"\0"))
+                events.append(InotifyEvent(wd, mask, cookie, name))
+
+    def close(self):
+        fd: Optional[int] = self.fd
+        self.fd = -1
+        if fd is not None and fd >= 0:
+            os.close(fd)
@@ -0,0 +1,43 @@
+"""Deferred imports for optional or heavy dependencies."""
+
+import importlib
+from typing import Any, Dict
+
+_MISSING = object()
+_modules: Dict[str, Any] = {}
+
+
+def optional_import(name: str):
+    """
+    Import ``name`` on first use and cache the result.
+
+    :param name: Dotted module name
+    :return: The module, or None when it is not installed
+    """
+    module = _modules.get(name, _MISSING)
+    if module is _MISSING:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            module = None
+        _modules[name] = module
+    return module
+
+
+def lazy_exports(package: str, exports: Dict[str, str]):
+    """
+    Build a module-level ``__getattr__`` (PEP 562) resolving ``exports`` on first access.
+
+    :param package: Name of the package the attributes belong to
+    :param exports: Attribute name to defining module name
+    """
+
+    def __getattr__(name: str):
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(module_name), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    return __getattr__
@@ -1,62 +1,124 @@
 #!/usr/bin/env python3
 import argparse
+import importlib.util
 import os
 import time
 import signal
 import sys
-from datetime import datetime
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 
 
+from bansuri.alerts.dispatcher import default_dispatcher
+from bansuri.base.logger import ERROR, INFO, WARNING, Logger, default_logger
 from bansuri.base.misc.header import HEADER
 from bansuri.base.misc.help import print_help
 from bansuri.base.config_manager import BansuriConfig
+from bansuri.base.config_diff import ReloadReport, diff_script_configs
+from bansuri.base.config_loader import ConfigLoader
+from bansuri.base.config_watcher import ConfigWatcher
 from bansuri.task_runner import TaskRunner
-from bansuri.server.dashboard import Dashboard
+from bansuri.startup_ramp import StartupRamp
 
 
 class Orchestrator:
 
-    def __init__(self, config_file="scripts.json", check_interval=30):
+    def __init__(self, config_file="scripts.json", check_interval=30, config_cache=None):
         """Orchestrator init
 
         Args:
-            config_file (str, optional): Path to config file. Defaults to "scripts.json".
-            check_interval (int, optional): Check interval in seconds. Defaults to 30.
+            config_file (str, optional): Path to config file, conf.d directory or glob of
+                fragment files. Defaults to "scripts.json".
+            check_interval (int, optional): Polling interval in seconds, only used when
+                inotify is not available. Defaults to 30.
+            config_cache (str, optional): Path of the compiled config snapshot used to speed
+                up cold starts. Defaults to None (disabled).
         """
+        self.logger: Logger = default_logger()
         self.config_file = config_file
         self.check_interval = check_interval
         self.runners: Dict[str, TaskRunner] = {}
+        self.state_listeners: List[Callable[[str, Optional[TaskRunner]], None]] = []
         self.should_stop = False
+        self.config_loader = ConfigLoader(config_file, cache_path=config_cache)
+        self.watcher = ConfigWatcher(config_file, poll_interval=check_interval)
+        self.ramp = StartupRamp(log=self._log)
+        self.notifications = default_dispatcher()
 
         signal.signal(signal.SIGTERM, self.signal_handler)
         signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGHUP, self.signal_handler)
+
+        self.dashboard = self._create_dashboard()
+
+        self._log("Orchestrator initialized")
+
+    def _create_dashboard(self):
+        """
+        Build the web dashboard unless BANSURI_DASHBOARD disables it.
+
+        The HTTP stack is only imported here, so short-lived runs with the
+        dashboard disabled never pay for it.
+        """
+        if os.getenv("BANSURI_DASHBOARD", "1").strip().lower() in ("0", "false", "no", "off"):
+            return None
 
         try:
-            self.dashboard = Dashboard(
+            from bansuri.server.dashboard import Dashboard
+
+            dashboard = Dashboard(
                 self,
                 username=os.getenv("BANSURI_USER", "admin"),
                 password=os.getenv("BANSURI_PASS", "admin"),
                 port=int(os.getenv("BANSURI_PORT", "8080")),
+                backend=os.getenv("BANSURI_DASHBOARD_BACKEND", "threading").strip().lower(),
             )
         except Exception as e:
-            self._log(f"WARNING: Failed to initialize Dashboard: {e}")
-            self.dashboard = None
+            self._log(f"WARNING: Failed to initialize Dashboard: {e}", WARNING)
+            return None
 
-        self._log("Orchestrator initialized")
+        # find_spec checks availability without paying for the import itself
+        if importlib.util.find_spec("psutil") is None:
+            self._log("WARNING: 'psutil' not found. CPU/RAM stats will be 0.", WARNING)
+            self._log("         Install it with: pip install psutil", WARNING)
+        return dashboard
 
-        try:
-            import psutil
-        except ImportError:
-            self._log("WARNING: 'psutil' not found. CPU/RAM stats will be 0.")
-            self._log("         Install it with: pip install psutil")
-
-    def _log(self, message):
-        # TODO add pluggable logger
-        print(
-            f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [MASTER] {message}",
-            flush=True,
-        )
+    def add_state_listener(self, listener: Callable[[str, Optional[TaskRunner]], None]):
+        """
+        Subscribe to task changes.
+
+        The listener is called with the task name and its runner whenever the
+        task status or configuration changes, and with None once the task is
+        removed. It is first called for every current task.
+        """
+        self.state_listeners.append(listener)
+        for name, runner in list(self.runners.items()):
+            listener(name, runner)
+
+    def _notify_state(self, name: str, runner: Optional[TaskRunner]):
+        for listener in list(self.state_listeners):
+            try:
+                listener(name, runner)
+            except Exception as e:
+                self._log(f"WARNING: State listener failed for task '{name}': {e}", WARNING)
+
+    def _runner_state_changed(self, runner: TaskRunner):
+        name = runner.config.name
+        # A replaced runner may still report its last transitions
+        if self.runners.get(name) is runner:
+            self._notify_state(name, runner)
+
+    def _add_runner(self, name: str, runner: TaskRunner):
+        self.runners[name] = runner
+        runner.on_state_change = self._runner_state_changed
+        self._notify_state(name, runner)
+
+    def _remove_runner(self, name: str):
+        runner = self.runners.pop(name)
+        runner.on_state_change = None
+        self._notify_state(name, None)
+
+    def _log(self, message: str, level: int = INFO):
+        self.logger.log(level, "MASTER", message)
 
     def signal_handler(self, signum, frame):
         """
@@ -65,21 +127,32 @@ class Orchestrator:
         :param signum: Signal identifier
         :param frame: Unused
         """
+        if signum == signal.SIGHUP:
+            self._log("Received SIGHUP, reloading configuration...")
+            self.watcher.request_reload()
+            return
+
         self._log(f"Received signal {signum}, shutting down...")
-        # TODO shutdown only on SIGTERM
         self.stop_all()
         sys.exit(0)
 
-    def sync_tasks(self):
+    def sync_tasks(self) -> ReloadReport:
         """
         Synchronize tasks from config file.
+
+        Changes that only affect notifications, retries or the next run are
+        hot-applied to the running task, anything else restarts it.
         """
+        report = ReloadReport()
 
         try:
-            config = BansuriConfig.load_from_file(self.config_file)
+            config = self.config_loader.load()
         except Exception as e:
-            self._log(f"Error loading config: {e}")
-            return
+            self._log(f"Error loading config: {e}", ERROR)
+            return report
+
+        self.ramp.configure(config.startup)
+        self.notifications.configure(config.notifications)
 
         # Map config fields by name
         new_configs = {s.name: s for s in config.scripts}
@@ -90,90 +163,200 @@ class Orchestrator:
         # we stop tasks which are no longer in config
         for name in current_names - new_names:
             self._log(f"Task removed from config: {name}")
+            self.ramp.cancel(self.runners[name])
             self.runners[name].stop()
-            del self.runners[name]
+            self._remove_runner(name)
+            report.removed.append(name)
 
         # Check for updates in existing tasks
         for name in current_names.intersection(new_names):
             current_runner = self.runners[name]
             new_config = new_configs[name]
+            change = diff_script_configs(current_runner.config, new_config)
+
+            if not change.requires_restart:
+                current_runner.apply_config(new_config, config, change.hot_fields)
+                if change.hot_fields:
+                    report.hot_applied[name] = change.hot_fields
+                continue
 
-            if current_runner.config != new_config:
-                self._log(f"Configuration changed for task: {name}. Restarting...")
-                if not current_runner.stop():
-                    self._log(f"Task '{name}' is still stopping. Delaying restart until next sync.")
-                    continue
-                del self.runners[name]
-                # It will be re-added in the next loop (actually no, we must add it here or treat it as new)
-                # Better approach: restart it immediately here
-                runner = TaskRunner(new_config, config)
-                self.runners[name] = runner
+            self._log(
+                f"Configuration changed for task: {name} "
+                f"({', '.join(change.restart_fields)}). Restarting..."
+            )
+            was_queued = self.ramp.cancel(current_runner)
+            if not current_runner.stop():
+                self._log(f"Task '{name}' is still stopping. Delaying restart until next sync.")
+                report.deferred[name] = change.changed_fields
+                continue
+            self._remove_runner(name)
+            runner = TaskRunner(new_config, config)
+            self._add_runner(name, runner)
+            if was_queued:
+                # Not started yet, keep its place behind the ramp
+                self.ramp.submit([runner])
+            else:
                 runner.start()
+            report.restarted[name] = change.changed_fields
 
         # Start added tasks
         # The set 'new_names - current_names' is strictly for NEW task names.
-        # The updated ones are handled above.
-        for name in new_names - current_names:
+        # The updated ones are handled above. They are launched through the
+        # startup ramp, in priority order and at the configured rate.
+        added = []
+        for name in [n for n in new_configs if n not in current_names]:
             self._log(f"New task found: {name}")
 
             # Check for NOT IMPLEMENTED features
             cfg = new_configs[name]
             if cfg.depends_on:
-                self._log(f"WARNING [{name}]: depends-on NOT IMPLEMENTED")
+                self._log(f"WARNING [{name}]: depends-on NOT IMPLEMENTED", WARNING)
             if cfg.user:
-                self._log(f"WARNING [{name}]: user switching NOT IMPLEMENTED")
-            if cfg.priority:
-                self._log(f"WARNING [{name}]: priority NOT IMPLEMENTED")
+                self._log(f"WARNING [{name}]: user switching NOT IMPLEMENTED", WARNING)
             if cfg.environment_file:
                 # TODO implement
-                self._log(f"WARNING [{name}]: environment-file NOT IMPLEMENTED")
+                self._log(f"WARNING [{name}]: environment-file NOT IMPLEMENTED", WARNING)
 
             runner = TaskRunner(new_configs[name], config)
-            self.runners[name] = runner
+            self._add_runner(name, runner)
+            added.append(runner)
+            report.added.append(name)
+
+        self.ramp.submit(added)
+
+        if not report.is_empty:
+            for line in report.summary_lines():
+                self._log(line)
+
+        return report
+
+    def control_task(self, name: str, action: str) -> Optional[str]:
+        """
+        Start, stop or restart a task on request, e.g. from the dashboard.
+
+        A task still waiting in the startup ramp is taken out of it first, so
+        a stop sticks and a start or restart does not launch it twice. A
+        restarted task that was waiting keeps its place behind the ramp.
+
+        :param name: Task name
+        :param action: ``start``, ``stop`` or ``restart``
+        :return: None on success, otherwise the reason of the failure
+        :raises ValueError: On an unknown action
+        """
+        if action not in ("start", "stop", "restart"):
+            raise ValueError(f"Unknown action '{action}', expected one of start, stop, restart")
+        runner = self.runners.get(name)
+        if runner is None:
+            return "Task not found"
+
+        was_queued = self.ramp.cancel(runner)
+        if action == "start":
             runner.start()
+            return None
+        if runner.stop() is False:
+            return "Task is still stopping"
+        if action == "restart":
+            if was_queued:
+                self.ramp.submit([runner])
+            else:
+                runner.start()
+        return None
 
     def stop_all(self):
         self._log("Stopping all tasks...")
+        self.ramp.stop()
         if self.dashboard:
             try:
                 self.dashboard.stop()
             except Exception as e:
-                self._log(f"WARNING: Failed to stop Dashboard: {e}")
+                self._log(f"WARNING: Failed to stop Dashboard: {e}", WARNING)
         for runner in self.runners.values():
             runner.stop()
+        # Failures reported while stopping still get delivered
+        if not self.notifications.close(timeout=10):
+            self._log("WARNING: Pending notifications were not delivered", WARNING)
+        metrics = self.notifications.metrics()
+        if metrics["dropped"] or metrics["failed"]:
+            self._log(
+                f"Notifications: {metrics['delivered']} delivered, {metrics['failed']} failed, "
+                f"{metrics['dropped']} dropped"
+            )
+        self.logger.flush()
 
     def run(self):
         # print(HEADER)
         self._log("=" * 40)
         self._log("BANSURI ORCHESTRATOR STARTED")
         self._log("=" * 40)
-        self._log(f"Monitoring config file: {self.config_file}")
+        self._log(f"Monitoring config file: {self.config_file} ({self.watcher.backend})")
 
         if self.dashboard:
             try:
                 self.dashboard.start()
             except Exception as e:
-                self._log(f"WARNING: Failed to start Dashboard: {e}")
+                self._log(f"WARNING: Failed to start Dashboard: {e}", WARNING)
+
+        try:
+            self.sync_tasks()
+        except Exception as e:
+            self._log(f"ERROR in main loop: {e}", ERROR)
 
         while not self.should_stop:
             try:
-                self.sync_tasks()
-                time.sleep(self.check_interval)
+                if self.watcher.wait_for_change():
+                    self._log("Configuration change detected, reloading...")
+                    self.sync_tasks()
             except Exception as e:
-                self._log(f"ERROR in main loop: {e}")
+                self._log(f"ERROR in main loop: {e}", ERROR)
                 time.sleep(self.check_interval)
 
+
+def validate_config(config_file, config_cache=None) -> int:
+    """
+    Load the configuration once and report the result.
+
+    :param config_file: Config file, conf.d directory or glob of fragment files
+    :param config_cache: Optional compiled config snapshot
+    :return: Process exit code, 0 when the configuration is valid
+    """
+    try:
+        config = ConfigLoader(config_file, cache_path=config_cache).load()
+    except Exception as e:
+        default_logger().flush()
+        print(f"Invalid configuration: {e}", file=sys.stderr)
+        return 1
+    # The loader warnings come first
+    default_logger().flush()
+    print(f"Configuration OK: {len(config.scripts)} task(s) (version {config.version})")
+    return 0
+
+
 def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "-c",
         "--config",
         default="scripts.json",
-        help="Path to the configuration file.",
+        help="Path to the configuration file, a conf.d directory or a glob of fragment files.",
+    )
+    parser.add_argument(
+        "--config-cache",
+        default=os.getenv("BANSURI_CONFIG_CACHE"),
+        help="Path of a compiled config snapshot used to speed up cold starts.",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Load and validate the configuration, then exit without starting any task.",
     )
     args = parser.parse_args(argv)
 
-    orchestrator = Orchestrator(config_file=args.config, check_interval=5)
+    if args.validate:
+        sys.exit(validate_config(args.config, args.config_cache))
+
+    orchestrator = Orchestrator(
+        config_file=args.config, check_interval=5, config_cache=args.config_cache
+    )
     orchestrator.run()
 
 
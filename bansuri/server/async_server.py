@@ -0,0 +1,365 @@
+import asyncio
+import io
+import os
+import queue
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Optional, Tuple
+
+from bansuri.base.logger import default_logger
+from bansuri.server.events import EventQueue
+
+# Request line and headers together, larger requests get a 431
+MAX_HEADER_SIZE = 65536
+MAX_BODY_SIZE = 1 << 20
+# Bytes handed to sendfile at once, each slice must go out within the write timeout
+SENDFILE_SLICE = 1 << 20
+SSE_KEEPALIVE = 15.0
+
+
+class _DeferredSendfile:
+    """
+    Stands for the client socket of a buffered handler.
+
+    ``sendfile`` keeps a duplicate of the file descriptor, so the event loop
+    sends the file once the handler is done, even though the handler closed
+    its own file object in the meantime.
+    """
+
+    def __init__(self):
+        self.pending: Optional[Tuple[io.BufferedReader, int, Optional[int]]] = None
+
+    def sendfile(self, file, offset=0, count=None):
+        self.pending = (os.fdopen(os.dup(file.fileno()), "rb"), offset, count)
+
+
+class _BufferedHandler:
+    """
+    Runs a ``BaseHTTPRequestHandler`` subclass against a request already read
+    in memory, collecting its response in memory as well.
+
+    Server-Sent Events streams are not written by the handler: it only sends
+    the response headers and leaves the subscriber queue to the event loop.
+    """
+
+    def __init__(self, raw_request: bytes, client_address, server):
+        self.rfile = io.BytesIO(raw_request)
+        self.wfile = io.BytesIO()
+        self.client_address = client_address
+        self.server = server
+        self.request = None
+        self.connection = _DeferredSendfile()
+        self.stream = None
+        self.close_connection = True
+
+    def _stream_sse(self, subscriber, unsubscribe):
+        self._send_sse_headers()
+        self.stream = (subscriber, unsubscribe)
+
+
+def _error_response(status: HTTPStatus, headers=None) -> bytes:
+    body = f"{status.value} {status.phrase}\n".encode("ascii")
+    lines = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: text/plain",
+        f"Content-Length: {len(body)}",
+        "Connection: close",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("ascii") + body
+
+
+def _content_length(head: bytes) -> int:
+    """Content-Length of a raw request head, 0 when absent"""
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value.strip())
+            if length < 0:
+                raise ValueError(length)
+            return length
+    return 0
+
+
+class AsyncHTTPServer:
+    """
+    HTTP/1.1 server on asyncio streams, a drop-in for ``ThreadingHTTPServer``.
+
+    Connections are served by a single event loop thread instead of one
+    thread each. At most ``max_connections`` are open at once, extra ones are
+    answered with a 503 and closed. Clients must send their request head
+    within ``request_timeout``, read every response slice within
+    ``write_timeout``, and idle keep-alive connections are closed after
+    ``keepalive_timeout``, so slow clients cannot hold a connection forever.
+
+    Requests are answered by the regular ``BaseHTTPRequestHandler`` subclass,
+    run on a pool of ``workers`` threads since its routes read files and
+    sample processes. At most ``max_concurrent`` requests are handled or
+    waiting for a worker, a request that gets no slot within
+    ``queue_timeout`` is answered with a 503. Server-Sent Events streams and
+    file downloads started by the handler continue on the event loop
+    without holding a worker or a slot.
+    """
+
+    def __init__(
+        self,
+        server_address,
+        RequestHandlerClass,
+        max_connections: int = 64,
+        max_concurrent: int = 8,
+        workers: int = 4,
+        keepalive_timeout: float = 15.0,
+        request_timeout: float = 10.0,
+        write_timeout: float = 30.0,
+        queue_timeout: float = 5.0,
+    ):
+        """
+        AsyncHTTPServer init, the socket is bound right away
+
+        :param server_address: ``(host, port)``, port 0 picks a free one
+        :param RequestHandlerClass: ``BaseHTTPRequestHandler`` subclass answering requests
+        :param max_connections: Open connections, streams included
+        :param max_concurrent: Requests handled or queued for a worker at once
+        :param workers: Threads running the handler
+        :param keepalive_timeout: Seconds an idle connection waits for its next request
+        :param request_timeout: Seconds to receive a request head and body
+        :param write_timeout: Seconds for the client to accept each part of a response
+        :param queue_timeout: Seconds a request may wait for a free slot
+        """
+        self.RequestHandlerClass = RequestHandlerClass
+        self.max_connections = max_connections
+        self.max_concurrent = max_concurrent
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self.write_timeout = write_timeout
+        self.queue_timeout = queue_timeout
+        self._handler_class = type(
+            f"Buffered{RequestHandlerClass.__name__}",
+            (_BufferedHandler, RequestHandlerClass),
+            {},
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="DashboardWorker"
+        )
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(server_address)
+        self.socket.listen(128)
+        self.server_address = self.socket.getsockname()[:2]
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._started = threading.Event()
+        self._stopped = threading.Event()
+        self._shutdown_requested = False
+        self._connections = set()
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._connections)
+
+    def serve_forever(self):
+        """Run the event loop in the calling thread until ``shutdown``"""
+        self._loop = asyncio.new_event_loop()
+        self._stopped.clear()
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+            self._stopped.set()
+
+    def shutdown(self):
+        """Stop ``serve_forever`` from another thread and wait for it"""
+        self._shutdown_requested = True
+        if not self._started.is_set():
+            # Not serving yet, _serve returns as soon as it sees the request
+            return
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._stopped.wait()
+
+    def server_close(self):
+        self.socket.close()
+        self._executor.shutdown(wait=False)
+
+    async def _serve(self):
+        self._stopping = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        server = await asyncio.start_server(
+            self._handle_connection, sock=self.socket, limit=MAX_HEADER_SIZE
+        )
+        self._started.set()
+        if self._shutdown_requested:
+            self._stopping.set()
+        try:
+            await self._stopping.wait()
+        finally:
+            server.close()
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            self._started.clear()
+
+    async def _handle_connection(self, reader, writer):
+        if len(self._connections) >= self.max_connections:
+            writer.write(_error_response(HTTPStatus.SERVICE_UNAVAILABLE, {"Retry-After": "1"}))
+            await self._close(writer)
+            return
+
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            peer = writer.get_extra_info("peername") or ("", 0)
+            while await self._serve_request(reader, writer, peer[:2]):
+                pass
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            # Slow or gone client, nothing more can be sent
+            pass
+        except asyncio.CancelledError:
+            # Server shutdown, the connection task ends quietly
+            pass
+        finally:
+            self._connections.discard(task)
+            await self._close(writer)
+
+    async def _serve_request(self, reader, writer, peer) -> bool:
+        """Answer one request, returns True when the connection stays open"""
+        try:
+            first = await asyncio.wait_for(reader.readexactly(1), self.keepalive_timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return False
+        try:
+            head = first + await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), self.request_timeout
+            )
+        except asyncio.LimitOverrunError:
+            await self._write(writer, _error_response(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE))
+            return False
+        try:
+            length = _content_length(head)
+        except ValueError:
+            await self._write(writer, _error_response(HTTPStatus.BAD_REQUEST))
+            return False
+        if length > MAX_BODY_SIZE:
+            await self._write(writer, _error_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE))
+            return False
+        body = await asyncio.wait_for(reader.readexactly(length), self.request_timeout)
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            await self._write(
+                writer, _error_response(HTTPStatus.SERVICE_UNAVAILABLE, {"Retry-After": "1"})
+            )
+            return False
+        try:
+            handler = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._run_handler, head + body, peer
+            )
+        finally:
+            self._slots.release()
+
+        if handler is None:
+            await self._write(writer, _error_response(HTTPStatus.INTERNAL_SERVER_ERROR))
+            return False
+        await self._write(writer, handler.wfile.getvalue())
+        if handler.connection.pending:
+            await self._sendfile(writer, *handler.connection.pending)
+        if handler.stream:
+            await self._pump_stream(writer, *handler.stream)
+            return False
+        return not handler.close_connection
+
+    def _run_handler(self, raw_request: bytes, peer):
+        """Executor side, returns the handler holding the response, None on failure"""
+        handler = self._handler_class(raw_request, peer, self)
+        try:
+            handler.handle_one_request()
+        except Exception:
+            default_logger().error(
+                "DASHBOARD", "Request handler failed:\n%s", traceback.format_exc().rstrip()
+            )
+            pending = handler.connection.pending
+            if pending:
+                pending[0].close()
+            if handler.stream:
+                handler.stream[1]()
+            return None
+        return handler
+
+    async def _write(self, writer, data: bytes):
+        writer.write(data)
+        await asyncio.wait_for(writer.drain(), self.write_timeout)
+
+    async def _sendfile(self, writer, file, offset: int, count: Optional[int]):
+        loop = asyncio.get_running_loop()
+        try:
+            end = offset + count if count is not None else os.fstat(file.fileno()).st_size
+            while offset < end:
+                size = min(SENDFILE_SLICE, end - offset)
+                await asyncio.wait_for(
+                    loop.sendfile(writer.transport, file, offset, size), self.write_timeout
+                )
+                offset += size
+        finally:
+            file.close()
+
+    async def _pump_stream(self, writer, subscriber: EventQueue, unsubscribe):
+        """
+        Forward queued events until the stream ends or the client goes away.
+
+        The producers wake the loop through the queue waker, so an idle
+        stream holds no thread and costs no wake-ups until its keepalive is
+        due.
+        """
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The loop is closed, the stream is over anyway
+                pass
+
+        subscriber.set_waker(wake)
+        try:
+            while not writer.transport.is_closing():
+                # Cleared before draining, so a put racing with it sets it again
+                wakeup.clear()
+                chunks = []
+                try:
+                    while not chunks or chunks[-1] is not None:
+                        chunks.append(subscriber.get_nowait())
+                except queue.Empty:
+                    pass
+                if not chunks:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), SSE_KEEPALIVE)
+                        continue
+                    except asyncio.TimeoutError:
+                        # Comment line, keeps proxies from closing an idle stream
+                        chunks = [b": keepalive\n\n"]
+
+                ended = None in chunks
+                if ended:
+                    chunks = chunks[: chunks.index(None)]
+                await self._write(writer, b"".join(chunks))
+                if ended:
+                    return
+        finally:
+            subscriber.set_waker(None)
+            # Closing the last follower of a log joins its reader thread
+            try:
+                await asyncio.get_running_loop().run_in_executor(self._executor, unsubscribe)
+            except (RuntimeError, asyncio.CancelledError):
+                unsubscribe()
+
+    @staticmethod
+    async def _close(writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
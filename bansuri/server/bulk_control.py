@@ -0,0 +1,279 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from bansuri.server.events import EventQueue, end_stream, format_event
+
+ACTIONS = ("start", "stop", "restart")
+
+
+class BulkJob:
+    """
+    Progress of one action applied to a set of tasks.
+
+    Tasks are processed in rolling batches of ``batch_size``, with at most
+    ``parallelism`` actions running at once; a batch only starts once the
+    previous one is over. When more than ``max_failures`` tasks failed, the
+    remaining batches are skipped.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        action: str,
+        names: List[str],
+        parallelism: int,
+        batch_size: int,
+        max_failures: Optional[int],
+    ):
+        self.id = job_id
+        self.action = action
+        self.names = names
+        self.parallelism = parallelism
+        self.batch_size = batch_size
+        self.max_failures = max_failures
+        self.state = "pending"
+        self.batch = 0
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.results: Dict[str, Dict[str, Any]] = {name: {"state": "pending"} for name in names}
+        self.counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+        self._lock = threading.Lock()
+        self._subscribers: List[queue.Queue] = []
+        self._cancelled = threading.Event()
+        # Scheduling state, advanced by BulkControl as actions complete
+        self._schedule_lock = threading.Lock()
+        self._next = 0  # index in names of the next task to start
+        self._in_flight = 0
+        self._aborted = False
+
+    @property
+    def batches(self) -> int:
+        return (len(self.names) + self.batch_size - 1) // self.batch_size
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "action": self.action,
+            "state": self.state,
+            "total": len(self.names),
+            "completed": sum(self.counts.values()),
+            **self.counts,
+            "batch": self.batch,
+            "batches": self.batches,
+            "parallelism": self.parallelism,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            data = self.summary()
+            data["results"] = {name: dict(result) for name, result in self.results.items()}
+        return data
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def subscribe(self) -> queue.Queue:
+        """Queue of encoded progress events, starting with a snapshot, ``None`` once the job is over"""
+        subscriber = EventQueue(maxsize=1024)
+        with self._lock:
+            subscriber.put_nowait(format_event("snapshot", self.summary()))
+            if self.done:
+                end_stream(subscriber)
+            else:
+                self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def _record(self, name: str, state: str, error: Optional[str] = None):
+        with self._lock:
+            result = {"state": state}
+            if error:
+                result["error"] = error
+            self.results[name] = result
+            if state in self.counts:
+                self.counts[state] += 1
+                event = {"task": name, **result, **self.summary()}
+                self._broadcast(format_event("progress", event))
+
+    def _finish(self, state: str):
+        with self._lock:
+            self.state = state
+            self.finished = time.time()
+            self._broadcast(format_event("done", self.summary()))
+            for subscriber in self._subscribers:
+                end_stream(subscriber)
+            self._subscribers = []
+
+    def _broadcast(self, event: bytes):
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                self._subscribers.remove(subscriber)
+                end_stream(subscriber)
+
+
+class BulkControl:
+    """
+    Runs control actions over many tasks in the background.
+
+    Every job shares one pool of ``max_workers`` threads, so the actions in
+    flight across all jobs stay bounded whatever the number of jobs, and no
+    HTTP handler waits for a task to stop. A job has no thread of its own:
+    it is advanced when it is submitted and each time one of its actions
+    completes, on the pool thread that ran it. Finished jobs are kept for
+    polling until ``keep_jobs`` newer ones exist.
+    """
+
+    def __init__(
+        self,
+        control: Callable[[str, str], Optional[str]],
+        max_workers: int = 32,
+        keep_jobs: int = 100,
+    ):
+        """
+        BulkControl init
+
+        :param control: Applies an action to a task name, returns None on success,
+            otherwise the reason of the failure
+        :param max_workers: Actions running at once across every job
+        :param keep_jobs: Jobs kept for polling
+        """
+        self.control = control
+        self.max_workers = max_workers
+        self.keep_jobs = keep_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="BulkControl")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, BulkJob]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._prefix = f"{os.getpid():x}"
+
+    def submit(
+        self,
+        names: List[str],
+        action: str,
+        parallelism: int = 4,
+        batch_size: Optional[int] = None,
+        max_failures: Optional[int] = None,
+    ) -> BulkJob:
+        """
+        Start applying an action to tasks.
+
+        :param names: Tasks, in processing order
+        :param action: One of ``ACTIONS``
+        :param parallelism: Actions of this job running at once, capped at ``max_workers``
+        :param batch_size: Tasks per rolling batch, every task at once by default
+        :param max_failures: Failures tolerated before the remaining batches are skipped
+        :raises ValueError: On an unknown action or invalid limits
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}', expected one of {', '.join(ACTIONS)}")
+        if parallelism < 1 or (batch_size is not None and batch_size < 1):
+            raise ValueError("parallelism and batch_size must be positive")
+        if max_failures is not None and max_failures < 0:
+            raise ValueError("max_failures must not be negative")
+
+        names = list(dict.fromkeys(names))
+        job = BulkJob(
+            f"{self._prefix}-{next(self._ids)}",
+            action,
+            names,
+            min(parallelism, self.max_workers),
+            batch_size or max(len(names), 1),
+            max_failures,
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.state = "running"
+        self._advance(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[BulkJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [job.summary() for job in self._jobs.values()]
+
+    def close(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond ``keep_jobs``, caller holds the lock"""
+        excess = len(self._jobs) - self.keep_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def _advance(self, job: BulkJob):
+        """Start the actions the job may run now, or finish it once nothing is left"""
+        with job._schedule_lock:
+            while not job.done:
+                if job._next >= len(job.names):
+                    if job._in_flight == 0:
+                        if job._cancelled.is_set():
+                            job._finish("cancelled")
+                        else:
+                            job._finish("aborted" if job._aborted else "completed")
+                    return
+
+                name = job.names[job._next]
+                if job._aborted or job._cancelled.is_set():
+                    job._next += 1
+                    job._record(name, "skipped")
+                    continue
+
+                batch = job._next // job.batch_size + 1
+                if batch != job.batch:
+                    # A batch only starts once the previous one is over
+                    if job._in_flight:
+                        return
+                    if job.max_failures is not None and job.counts["failed"] > job.max_failures:
+                        job._aborted = True
+                        continue
+                    job.batch = batch
+                if job._in_flight >= job.parallelism:
+                    return
+
+                job._next += 1
+                job._in_flight += 1
+                try:
+                    self._executor.submit(self._run_one, job, name)
+                except RuntimeError:
+                    # The pool was shut down with the dashboard
+                    job._in_flight -= 1
+                    job._record(name, "skipped")
+                    job._cancelled.set()
+
+    def _run_one(self, job: BulkJob, name: str):
+        try:
+            job._record(name, "running")
+            error = self.control(name, job.action)
+            job._record(name, "failed" if error else "succeeded", error)
+        except Exception as e:
+            job._record(name, "failed", str(e))
+        finally:
+            with job._schedule_lock:
+                job._in_flight -= 1
+            self._advance(job)
@@ -1,16 +1,47 @@
 from datetime import datetime
 import json
+import queue
 import threading
+import time
 import os
 import base64
+import gzip
+import hashlib
+from email.utils import formatdate
 from urllib.parse import urlparse, parse_qs
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from socketserver import ThreadingMixIn
 
-try:
-    import psutil
-except ImportError:
-    psutil = None
+from bansuri.base.logger import default_logger
+from bansuri.base.misc.lazy import optional_import
+from bansuri.server.bulk_control import ACTIONS, BulkControl
+from bansuri.server.events import StatusEventHub
+from bansuri.server.history import ResourceHistory
+from bansuri.server.http_range import RangeNotSatisfiable, parse_range
+from bansuri.server.log_follow import LogFollowRegistry
+from bansuri.server.log_index import LogIndexRegistry
+from bansuri.server.log_search import LogSearcher, SearchBusyError
+from bansuri.server.status_index import StatusIndex
+
+
+def parse_since(value):
+    """Epoch seconds, or an ISO 8601 date and time in local time"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+# Smaller bodies are not worth the gzip header and CPU
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+
+DASHBOARD_BACKENDS = ("threading", "asyncio")
+# Upper bound of the tasks returned by one filtered status page
+STATUS_PAGE_MAX = 1000
+# Seconds the master usage sample is shared, like TaskRunner.usage_interval
+USAGE_INTERVAL = 1.0
 
 
 class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
@@ -18,6 +49,11 @@ class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
 
 
 class DashboardHandler(BaseHTTPRequestHandler):
+    # Persistent connections, every response must carry a Content-Length or close the connection
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections give their thread back after this many seconds
+    timeout = 60
+
     def check_auth(self):
         """Verifies Basic Auth credentials"""
         if not self.server.username or not self.server.password:
@@ -44,31 +80,46 @@ class DashboardHandler(BaseHTTPRequestHandler):
         return False
 
     def send_auth_request(self):
-        self.send_response(401)
-        self.send_header("WWW-Authenticate", 'Basic realm="Bansuri Dashboard"')
-        self.send_header("Content-type", "text/html")
-        self.end_headers()
-        self.wfile.write(b"Unauthorized")
+        if int(self.headers.get("Content-Length") or 0):
+            # The unread request body would be parsed as the next request
+            self.close_connection = True
+        self._send_body(
+            401,
+            b"Unauthorized",
+            "text/html",
+            {"WWW-Authenticate": 'Basic realm="Bansuri Dashboard"'},
+        )
 
     def do_GET(self):
         if not self.check_auth():
             return
 
         if self.path == "/":
-            self.send_response(200)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
             try:
-                with open(os.path.join(os.path.dirname(__file__), "index.html"), "rb") as f:
-                    self.wfile.write(f.read())
-            except Exception as e:
-                self.wfile.write(f"Error loading template: {e}".encode("utf-8"))
+                etag, body = self.server.get_index_page(gzip_encoded=self._accepts_gzip())
+            except OSError as e:
+                self._send_body(
+                    500, f"Error loading template: {e}".encode("utf-8"), "text/plain; charset=utf-8"
+                )
+                return
+            self._send_cached(etag, body, "text/html; charset=utf-8")
         elif self.path == "/api/status":
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.end_headers()
-            data = self.server.get_status_data()
-            self.wfile.write(json.dumps(data, default=str).encode("utf-8"))
+            etag, body = self.server.get_status_snapshot(gzip_encoded=self._accepts_gzip())
+            self._send_cached(etag, body, "application/json")
+        elif self.path.startswith("/api/status?"):
+            self._query_status(parse_qs(urlparse(self.path).query))
+        elif self.path == "/api/events":
+            self._stream_events()
+        elif self.path.startswith("/api/control/jobs"):
+            self._send_control_job(urlparse(self.path).path)
+        elif self.path.startswith("/api/tasks/history"):
+            self._send_task_history(parse_qs(urlparse(self.path).query))
+        elif self.path.startswith("/api/logs/raw"):
+            self._send_raw_log(parse_qs(urlparse(self.path).query))
+        elif self.path.startswith("/api/logs/search"):
+            self._search_logs(parse_qs(urlparse(self.path).query))
+        elif self.path.startswith("/api/logs/follow"):
+            self._follow_logs(parse_qs(urlparse(self.path).query))
         elif self.path.startswith("/api/logs"):
             query = parse_qs(urlparse(self.path).query)
             task_name = query.get("task", [None])[0]
@@ -84,98 +135,610 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 self.send_error(400, "Missing task name")
                 return
 
+            if "line" in query or "since" in query:
+                self._send_log_lines(task_name, log_type, query, limit)
+                return
+
             content = self.server.get_task_logs(task_name, log_type, offset, limit)
-            self.send_response(200)
-            self.send_header("Content-type", "text/plain; charset=utf-8")
-            self.end_headers()
-            self.wfile.write(content.encode("utf-8"))
+            self._send_body(
+                200, content.encode("utf-8"), "text/plain; charset=utf-8", compress=True
+            )
         else:
             self.send_error(404)
 
+    def _send_log_lines(self, task_name, log_type, query, limit):
+        """Whole lines from a line number or a time, located through the line index"""
+        try:
+            line = int(query["line"][0]) if "line" in query else None
+            since = parse_since(query["since"][0]) if "since" in query else None
+        except ValueError as e:
+            self.send_error(400, f"Invalid line or since parameter: {e}")
+            return
+
+        result = self.server.get_task_log_lines(task_name, log_type, line, since, limit)
+        if isinstance(result, str):
+            self.send_error(404, result)
+            return
+
+        text, first_line, next_line = result
+        self._send_body(
+            200,
+            text.encode("utf-8"),
+            "text/plain; charset=utf-8",
+            {"X-Log-Line": str(first_line), "X-Log-Next-Line": str(next_line)},
+            compress=True,
+        )
+
+    def _search_logs(self, query):
+        """Paginated search through a task log and its rotated files"""
+        task_name = query.get("task", [None])[0]
+        if not task_name:
+            self.send_error(400, "Missing task name")
+            return
+
+        try:
+            result = self.server.search_task_logs(
+                task_name,
+                query.get("type", ["stdout"])[0],
+                query.get("q", [""])[0],
+                regex=query.get("regex", ["0"])[0].lower() in ("1", "true"),
+                limit=int(query.get("limit", ["100"])[0]),
+                cursor=query.get("cursor", [None])[0],
+                ignore_case=query.get("icase", ["0"])[0].lower() in ("1", "true"),
+            )
+        except SearchBusyError as e:
+            self._send_body(
+                429,
+                json.dumps({"error": str(e)}).encode("utf-8"),
+                "application/json",
+                {"Retry-After": "1"},
+            )
+            return
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+
+        if isinstance(result, str):
+            self.send_error(404, result)
+            return
+        self._send_body(200, json.dumps(result).encode("utf-8"), "application/json", compress=True)
+
+    def _query_status(self, query):
+        """Filtered, sorted and paginated task list, limited to the requested fields"""
+
+        def values(key):
+            return [v.strip() for raw in query.get(key, []) for v in raw.split(",") if v.strip()]
+
+        sort = query.get("sort", ["name"])[0]
+        try:
+            result = self.server.query_status(
+                statuses=[status.upper() for status in values("status")],
+                name=query.get("name", [None])[0],
+                tag=query.get("tag", [None])[0],
+                fields=values("fields"),
+                sort=sort.lstrip("-"),
+                descending=sort.startswith("-"),
+                limit=min(max(int(query.get("limit", ["100"])[0]), 1), STATUS_PAGE_MAX),
+                cursor=query.get("cursor", [None])[0],
+            )
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        self._send_body(
+            200,
+            json.dumps(result, default=str).encode("utf-8"),
+            "application/json",
+            {"Cache-Control": "no-cache"},
+            compress=True,
+        )
+
+    def _send_task_history(self, query):
+        """Resource timeline of the task shown in the stats view"""
+        task_name = query.get("task", [None])[0]
+        if not task_name:
+            self.send_error(400, "Missing task name")
+            return
+
+        history = self.server.task_history.get(task_name)
+        if history is None:
+            self.send_error(404, "Task not found")
+            return
+        self._send_body(
+            200,
+            json.dumps(history).encode("utf-8"),
+            "application/json",
+            {"Cache-Control": "no-store"},
+            compress=True,
+        )
+
+    def _stream_events(self):
+        """Server-Sent Events stream of status deltas"""
+        subscriber = self.server.events.subscribe()
+        self._stream_sse(subscriber, lambda: self.server.events.unsubscribe(subscriber))
+
+    def _follow_logs(self, query):
+        """Server-Sent Events stream of what gets appended to a task log"""
+        task_name = query.get("task", [None])[0]
+        log_type = query.get("type", ["stdout"])[0]
+        if not task_name:
+            self.send_error(400, "Missing task name")
+            return
+
+        file_path, error = self.server.resolve_log_path(task_name, log_type)
+        if error:
+            self.send_error(404, error)
+            return
+
+        followers = self.server.log_followers
+        subscriber = followers.subscribe(file_path)
+        self._stream_sse(subscriber, lambda: followers.unsubscribe(file_path, subscriber))
+
+    def _send_sse_headers(self):
+        # The stream has no length, it ends with the connection
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.send_header("X-Accel-Buffering", "no")
+        self.end_headers()
+
+    def _stream_sse(self, subscriber, unsubscribe):
+        """Write queued events until the stream ends or the client goes away"""
+        try:
+            self._send_sse_headers()
+            while True:
+                try:
+                    chunk = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Comment line, keeps proxies from closing an idle stream
+                    chunk = b": keepalive\n\n"
+                if chunk is None:
+                    break
+                self.wfile.write(chunk)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            unsubscribe()
+
+    def _if_none_match(self):
+        """ETags listed in the If-None-Match request header"""
+        header = self.headers.get("If-None-Match", "")
+        return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+    def _accepts_gzip(self):
+        """True when the client accepts gzip content coding"""
+        for coding in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = coding.strip().partition(";")
+            if name.strip().lower() in ("gzip", "x-gzip"):
+                return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+        return False
+
+    def _send_cached(self, etag, body, content_type):
+        """Send a pre-serialized body, or 304 when the client already has this ETag
+
+        Gzip bodies are recognized by their ``-gz`` ETag suffix.
+        """
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag in self._if_none_match():
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if etag.endswith('-gz"'):
+            headers["Content-Encoding"] = "gzip"
+        self._send_body(200, body, content_type, headers)
+
+    def _send_body(self, status, body, content_type, headers=None, compress=False):
+        """Send a complete response with an explicit Content-Length
+
+        :param compress: Gzip the body when the client accepts it and it is large enough
+        """
+        headers = dict(headers or {})
+        if compress:
+            headers["Vary"] = "Accept-Encoding"
+            if len(body) >= GZIP_MIN_SIZE and self._accepts_gzip():
+                body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+                headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        self.send_header("Content-type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        if not self.check_auth():
+            return
+
+        if self.path.startswith("/api/logs/raw"):
+            self._send_raw_log(parse_qs(urlparse(self.path).query), head_only=True)
+        else:
+            self.send_error(405)
+
+    def _send_raw_log(self, query, head_only=False):
+        """Serve a task log file as-is, with Range support"""
+        task_name = query.get("task", [None])[0]
+        log_type = query.get("type", ["stdout"])[0]
+        if not task_name:
+            self.send_error(400, "Missing task name")
+            return
+
+        file_path, error = self.server.resolve_log_path(task_name, log_type)
+        if error:
+            self.send_error(404, error)
+            return
+        try:
+            f = open(file_path, "rb")
+        except OSError:
+            self.send_error(404, f"Log file not found: {file_path}")
+            return
+
+        with f:
+            st = os.fstat(f.fileno())
+            # Bytes appended while sending are left for the next request
+            size = st.st_size
+            last_modified = formatdate(st.st_mtime, usegmt=True)
+            etag = f'"{st.st_ino:x}-{size:x}-{st.st_mtime_ns:x}"'
+            headers = {
+                "Accept-Ranges": "bytes",
+                "Last-Modified": last_modified,
+                "ETag": etag,
+                "Content-Disposition": (
+                    f'attachment; filename="{os.path.basename(file_path)}"'
+                ),
+            }
+
+            byte_range = None
+            if_range = self.headers.get("If-Range")
+            if not if_range or if_range in (etag, last_modified):
+                try:
+                    byte_range = parse_range(self.headers.get("Range"), size)
+                except RangeNotSatisfiable:
+                    headers["Content-Range"] = f"bytes */{size}"
+                    self._send_body(416, b"", "text/plain", headers)
+                    return
+
+            if byte_range:
+                start, end = byte_range
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                status = 206
+            else:
+                start, end = 0, size - 1
+                status = 200
+
+            count = end - start + 1
+            self.send_response(status)
+            self.send_header("Content-type", "application/octet-stream")
+            self.send_header("Content-Length", str(count))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            if head_only or count <= 0:
+                return
+            try:
+                # os.sendfile under the hood, pages go straight from the cache to the socket
+                self.wfile.flush()
+                self.connection.sendfile(f, start, count)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
     def do_POST(self):
         if not self.check_auth():
             return
 
-        if self.path == "/api/control":
+        path = urlparse(self.path).path
+        if path == "/api/control":
             try:
-                content_length = int(self.headers.get("Content-Length", 0))
-                post_data = self.rfile.read(content_length)
-                data = json.loads(post_data)
+                data = self._read_json()
 
                 task_name = data.get("task")
                 action = data.get("action")
 
-                success = self.server.handle_control(task_name, action)
+                job_id = self.server.handle_control(task_name, action)
+                response = {"success": bool(job_id)}
+                if isinstance(job_id, str):
+                    response["job"] = job_id
 
-                self.send_response(200 if success else 400)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps({"success": success}).encode("utf-8"))
+                self._send_body(
+                    200 if job_id else 400,
+                    json.dumps(response).encode("utf-8"),
+                    "application/json",
+                )
             except Exception as e:
                 self.send_error(500, str(e))
+        elif path == "/api/control/bulk":
+            self._submit_bulk_control()
+        elif path.startswith("/api/control/jobs/") and path.endswith("/cancel"):
+            job = self.server.bulk_control.get(path[len("/api/control/jobs/"):-len("/cancel")])
+            if job is None:
+                self.send_error(404, "Unknown job")
+                return
+            job.cancel()
+            self._send_json(202, job.summary())
         else:
             self.send_error(404)
 
+    def _read_json(self):
+        content_length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(content_length))
+
+    def _send_json(self, status, data):
+        self._send_body(
+            status,
+            json.dumps(data).encode("utf-8"),
+            "application/json",
+            {"Cache-Control": "no-store"},
+            compress=True,
+        )
+
+    def _submit_bulk_control(self):
+        """
+        Start a bulk control job, answered right away with its id.
+
+        The body holds a ``selector`` (``names``, a name ``glob``, a ``tag``
+        and a ``status``, all given filters apply), the ``action``, and the
+        optional ``parallelism``, ``batch_size`` and ``max_failures``.
+        """
+        try:
+            data = self._read_json()
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+            names, unknown = self.server.select_tasks(data.get("selector"))
+            job = self.server.bulk_control.submit(
+                names,
+                data.get("action"),
+                parallelism=int(data.get("parallelism", 4)),
+                batch_size=int(data["batch_size"]) if data.get("batch_size") else None,
+                max_failures=(
+                    int(data["max_failures"]) if data.get("max_failures") is not None else None
+                ),
+            )
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"success": False, "error": str(e)})
+            return
+
+        self._send_json(202, {"success": True, "job": job.id, "tasks": names, "unknown": unknown})
+
+    def _send_control_job(self, path):
+        """Bulk control jobs, one job with its per-task results, or its progress events"""
+        rest = path[len("/api/control/jobs"):].strip("/")
+        if not rest:
+            self._send_json(200, {"jobs": self.server.bulk_control.jobs()})
+            return
+
+        job_id, _, view = rest.partition("/")
+        job = self.server.bulk_control.get(job_id)
+        if job is None or view not in ("", "events"):
+            self.send_error(404, "Unknown job")
+        elif view == "events":
+            subscriber = job.subscribe()
+            self._stream_sse(subscriber, lambda: job.unsubscribe(subscriber))
+        else:
+            self._send_json(200, job.to_dict())
+
     def log_message(self, format, *args):
         pass  # TODO: add debug logs
 
 
 class Dashboard:
-    def __init__(self, orchestrator, port=80, username=None, password=None):
+    def __init__(
+        self,
+        orchestrator,
+        port=80,
+        username=None,
+        password=None,
+        status_interval=1.0,
+        backend="threading",
+    ):
+        """
+        Dashboard init
+
+        :param orchestrator: The orchestrator whose runners are displayed
+        :param port: HTTP port
+        :param username: Basic auth user, None disables authentication
+        :param password: Basic auth password
+        :param status_interval: Minimum seconds between two status samples, shared by all clients
+        :param backend: ``threading`` for a thread per connection, or ``asyncio``
+            for a single event loop with bounded concurrency
+        :raises ValueError: On an unknown backend
+        """
+        if backend not in DASHBOARD_BACKENDS:
+            raise ValueError(
+                f"Unknown dashboard backend '{backend}', expected one of {', '.join(DASHBOARD_BACKENDS)}"
+            )
         self.orchestrator = orchestrator
         self.port = port
         self.username = username
         self.password = password
+        self.status_interval = status_interval
+        self.backend = backend
         self.server = None
         self.thread = None
         self._master_proc = None
+        self._master_usage_lock = threading.Lock()
+        self._master_sample = None
+        self._master_sampled_at = 0.0
+        self._status_lock = threading.Lock()
+        self._status_data = None
+        self._status_body = b""
+        self._status_version = 0
+        self._status_sampled_at = None
+        self._status_gzip = None
+        self._index_page = None
+        # Keeps ETags from a previous master process from matching
+        self._etag_prefix = f"{os.getpid():x}-{int(time.time()):x}"
+        self.events = StatusEventHub(self.collect_task_states, self.collect_resources)
+        self.log_followers = LogFollowRegistry()
+        self.log_indexes = LogIndexRegistry()
+        self.log_searcher = LogSearcher()
+        self.task_history = ResourceHistory(self.task_usage)
+        self.status_index = StatusIndex(self._task_fields, self.task_usage)
+        self._status_index_live = False
+        self.bulk_control = BulkControl(
+            lambda name, action: self.orchestrator.control_task(name, action)
+        )
 
-    def get_status_data(self):
-        tasks = []
-        global_cpu = 0.0
-        global_mem = 0
-
-        # Master process (that is bansuri)
+    def get_status_snapshot(self, gzip_encoded=False):
+        """
+        Return the ETag and the serialized status document.
+
+        The status is sampled at most once per ``status_interval`` whatever
+        the number of clients, and only serialized again (with a new
+        version) when the sampled data actually changed.
+
+        :param gzip_encoded: Return the gzip body, compressed once per version
+            and tagged with a distinct ``-gz`` ETag
+        """
+        with self._status_lock:
+            now = time.monotonic()
+            if (
+                self._status_sampled_at is None
+                or now - self._status_sampled_at >= self.status_interval
+            ):
+                data = self.get_status_data()
+                self._status_sampled_at = now
+                if data != self._status_data:
+                    self._status_data = data
+                    self._status_body = json.dumps(data, default=str).encode("utf-8")
+                    self._status_version += 1
+                    self._status_gzip = None
+            if gzip_encoded:
+                if self._status_gzip is None:
+                    self._status_gzip = gzip.compress(self._status_body, compresslevel=GZIP_LEVEL)
+                return f'"{self._etag_prefix}-{self._status_version}-gz"', self._status_gzip
+            return f'"{self._etag_prefix}-{self._status_version}"', self._status_body
+
+    def get_index_page(self, gzip_encoded=False):
+        """
+        Return the ETag and body of the dashboard page.
+
+        The page is read and compressed once, then served from memory.
+
+        :param gzip_encoded: Return the pre-compressed copy
+        :raises OSError: When the template cannot be read
+        """
+        if self._index_page is None:
+            with open(os.path.join(os.path.dirname(__file__), "index.html"), "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw).hexdigest()[:16]
+            self._index_page = (
+                (f'"{digest}"', raw),
+                (f'"{digest}-gz"', gzip.compress(raw, compresslevel=9)),
+            )
+        return self._index_page[1 if gzip_encoded else 0]
+
+    def _master_usage(self):
+        """Resource usage of the master process (that is bansuri), shared like the task usage"""
+        with self._master_usage_lock:
+            now = time.monotonic()
+            if self._master_sample is None or now - self._master_sampled_at >= USAGE_INTERVAL:
+                self._master_sample = self._sample_master_usage()
+                self._master_sampled_at = now
+            return self._master_sample
+
+    def _sample_master_usage(self):
+        psutil = optional_import("psutil")
         try:
             if psutil:
                 if not self._master_proc:
                     self._master_proc = psutil.Process(os.getpid())
-                global_cpu += self._master_proc.cpu_percent(interval=None)
-                global_mem += self._master_proc.memory_info().rss
+                return self._master_proc.cpu_percent(interval=None), self._master_proc.memory_info().rss
         except Exception:
             pass
+        return 0.0, 0
 
-        # Retrieve task runners resources
+    def _runners(self):
         try:
-            runners = list(self.orchestrator.runners.values())
+            return list(self.orchestrator.runners.values())
         except RuntimeError:
-            runners = []
+            return []
+
+    @staticmethod
+    def _task_fields(runner):
+        """Runner fields displayed in the task table, resources excepted"""
+        return {
+            "name": runner.config.name,
+            "status": runner.status,
+            "last_run": runner.last_run,
+            "next_run": runner.next_run,
+            "attempts": runner.attempts,
+            "failed_attempts": runner.failed_attempts,
+            "command": runner.config.command,
+            "tags": list(getattr(runner.config, "tags", None) or []),
+        }
+
+    def _startup_progress(self, data):
+        ramp = getattr(self.orchestrator, "ramp", None)
+        if ramp is not None:
+            data["startup"] = ramp.progress()
+        return data
+
+    def get_status_data(self):
+        tasks = []
+        global_cpu, global_mem = self._master_usage()
 
-        for runner in runners:
+        for runner in self._runners():
             stats = runner.get_resource_usage()
             global_cpu += stats["cpu"]
             global_mem += stats["memory"]
 
-            tasks.append(
-                {
-                    "name": runner.config.name,
-                    "status": runner.status,
-                    "last_run": runner.last_run,
-                    "next_run": runner.next_run,
-                    "attempts": runner.attempts,
-                    "failed_attempts": runner.failed_attempts,
-                    "command": runner.config.command,
-                    "resources": stats,
-                }
-            )
+            task = self._task_fields(runner)
+            task["resources"] = stats
+            tasks.append(task)
 
-        return {"tasks": tasks, "global": {"cpu": global_cpu, "memory": global_mem}}
+        data = {"tasks": tasks, "global": {"cpu": global_cpu, "memory": global_mem}}
+        return self._startup_progress(data)
 
-    def get_task_logs(self, task_name, log_type="stdout", offset=0, limit=51200):
-        """Tracks tasks logs"""
+    def task_usage(self, task_name):
+        """Resource usage of one task, None when there is no such task"""
+        runner = self.orchestrator.runners.get(task_name)
+        return runner.get_resource_usage() if runner else None
+
+    def query_status(self, **options):
+        """
+        Query the status index, see ``StatusIndex.query``.
+
+        The index follows the orchestrator state changes once the dashboard
+        is started; orchestrators without change notifications are indexed
+        again on each query.
+        """
+        self._refresh_status_index()
+        return self.status_index.query(**options)
+
+    def _refresh_status_index(self):
+        if not self._status_index_live:
+            self.status_index.rebuild(dict(self.orchestrator.runners))
+
+    def collect_task_states(self):
+        """Task fields keyed by name, sampled by the event stream"""
+        return {runner.config.name: self._task_fields(runner) for runner in self._runners()}
+
+    def collect_resources(self):
+        """Resource usage keyed by task name, plus the global totals"""
+        global_cpu, global_mem = self._master_usage()
+        tasks = {}
+        for runner in self._runners():
+            stats = runner.get_resource_usage()
+            global_cpu += stats["cpu"]
+            global_mem += stats["memory"]
+            tasks[runner.config.name] = stats
+
+        data = {"tasks": tasks, "global": {"cpu": global_cpu, "memory": global_mem}}
+        return self._startup_progress(data)
+
+    def resolve_log_path(self, task_name, log_type="stdout"):
+        """
+        Locate a task log file.
+
+        :return: ``(path, None)``, or ``(None, message)`` when there is no such log
+        """
         runner = self.orchestrator.runners.get(task_name)
         if not runner:
-            return "Task not found"
+            return None, "Task not found"
 
         config = runner.config
         file_path = None
@@ -187,10 +750,65 @@ class Dashboard:
             file_path = config.stderr
 
         if not file_path:
-            return f"No {log_type} log file configured."
+            return None, f"No {log_type} log file configured."
 
         if cwd and not os.path.isabs(file_path):
             file_path = os.path.join(cwd, file_path)
+        return file_path, None
+
+    def task_log_paths(self):
+        """Every configured task log file"""
+        paths = []
+        for runner in self._runners():
+            for log_type in ("stdout", "stderr"):
+                path, error = self.resolve_log_path(runner.config.name, log_type)
+                if not error:
+                    paths.append(path)
+        return paths
+
+    def get_task_log_lines(self, task_name, log_type="stdout", line=None, since=None, limit=51200):
+        """
+        Read whole lines starting at a line number or at a time.
+
+        :param line: 0-based line number, used when ``since`` is None
+        :param since: Epoch seconds, the first line logged at or after it is returned
+        :param limit: Maximum bytes returned, whole lines only
+        :return: ``(text, first_line, next_line)``, or an error message
+        """
+        file_path, error = self.resolve_log_path(task_name, log_type)
+        if error:
+            return error
+        if not os.path.isfile(file_path):
+            return f"Log file not found: {file_path}"
+
+        index = self.log_indexes.get(file_path)
+        try:
+            index.update()
+            if since is not None:
+                first_line, offset = index.locate_time(since)
+            else:
+                first_line, offset = index.locate_line(line or 0)
+            text, count = index.read_lines(offset, limit)
+        except OSError as e:
+            return f"Error reading log: {e}"
+        return text, first_line, first_line + count
+
+    def search_task_logs(self, task_name, log_type, query, **options):
+        """
+        Search a task log and its rotated files, see ``LogSearcher.search``.
+
+        :return: The result page, or an error message
+        """
+        file_path, error = self.resolve_log_path(task_name, log_type)
+        if error:
+            return error
+        return self.log_searcher.search(file_path, query, **options)
+
+    def get_task_logs(self, task_name, log_type="stdout", offset=0, limit=51200):
+        """Tracks tasks logs"""
+        file_path, error = self.resolve_log_path(task_name, log_type)
+        if error:
+            return error
 
         if not os.path.exists(file_path):
             return f"Log file not found: {file_path}"
@@ -213,42 +831,91 @@ class Dashboard:
             return f"Error reading log: {e}"
 
     def handle_control(self, task_name, action):
-        """A handler for task controls from Dashboard"""
-        runner = self.orchestrator.runners.get(task_name)
-        if not runner:
+        """
+        A handler for task controls from Dashboard
+
+        Actions go through the orchestrator, which keeps the startup ramp in
+        step. A start returns at once, a stop or restart waits for the task
+        to exit so it runs as a one-task bulk control job.
+
+        :return: The id of the job, True for a start, False for an unknown task or action
+        """
+        if task_name not in self.orchestrator.runners or action not in ACTIONS:
             return False
 
-        print(
-            f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DASHBOARD] Action '{action}' requested for '{task_name}'"
-        )
+        default_logger().info("DASHBOARD", "Action '%s' requested for '%s'", action, task_name)
 
         if action == "start":
-            runner.start()
-        elif action == "stop":
-            runner.stop()
-        elif action == "restart":
-            # Run in a separate thread to avoid blocking the HTTP response
-            def _restart():
-                runner.stop()
-                runner.start()
-
-            threading.Thread(target=_restart, daemon=True).start()
-        return True
+            return self.orchestrator.control_task(task_name, action) is None
+        return self.bulk_control.submit([task_name], action).id
+
+    def select_tasks(self, selector):
+        """
+        Tasks matched by a bulk control selector.
+
+        :param selector: ``names``, a name ``glob``, a ``tag`` and a ``status``
+            (or a list of statuses); every given filter applies
+        :return: The matched names, and the requested names that do not exist
+        :raises ValueError: On a missing or empty selector
+        """
+        if not isinstance(selector, dict) or not any(
+            selector.get(key) for key in ("names", "glob", "tag", "status")
+        ):
+            raise ValueError("The selector needs names, a glob, a tag or a status")
+        statuses = selector.get("status") or []
+        if isinstance(statuses, str):
+            statuses = [statuses]
+
+        self._refresh_status_index()
+        matched = self.status_index.select(statuses, selector.get("glob"), selector.get("tag"))
+        names = selector.get("names")
+        if not names:
+            return matched, []
+        if not isinstance(names, list):
+            raise ValueError("names must be a list")
+        matched = set(matched)
+        unknown = [name for name in names if name not in self.orchestrator.runners]
+        return [name for name in names if name in matched], unknown
 
     def start(self):
-        self.server = ThreadingHTTPServer(("0.0.0.0", self.port), DashboardHandler)
+        if self.backend == "asyncio":
+            from bansuri.server.async_server import AsyncHTTPServer
+
+            self.server = AsyncHTTPServer(("0.0.0.0", self.port), DashboardHandler)
+        else:
+            self.server = ThreadingHTTPServer(("0.0.0.0", self.port), DashboardHandler)
         self.server.username = self.username
         self.server.password = self.password
         self.server.get_status_data = self.get_status_data
+        self.server.get_status_snapshot = self.get_status_snapshot
+        self.server.get_index_page = self.get_index_page
         self.server.handle_control = self.handle_control
         self.server.get_task_logs = self.get_task_logs
+        self.server.events = self.events
+        self.server.task_history = self.task_history
+        self.server.query_status = self.query_status
+        self.server.log_followers = self.log_followers
+        self.server.resolve_log_path = self.resolve_log_path
+        self.server.get_task_log_lines = self.get_task_log_lines
+        self.server.search_task_logs = self.search_task_logs
+        self.server.bulk_control = self.bulk_control
+        self.server.select_tasks = self.select_tasks
         self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
         self.thread.start()
-        print(
-            f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DASHBOARD] Server started at http://0.0.0.0:80"
-        )
+        self.log_indexes.start(self.task_log_paths)
+        add_state_listener = getattr(self.orchestrator, "add_state_listener", None)
+        if add_state_listener is not None:
+            add_state_listener(self.status_index.update)
+            self._status_index_live = True
+        host, port = self.server.server_address[:2]
+        default_logger().info("DASHBOARD", "Server started at http://%s:%d", host, port)
 
     def stop(self):
+        self.events.close()
+        self.bulk_control.close()
+        self.task_history.close()
+        self.log_followers.close()
+        self.log_indexes.stop()
         if self.server:
             self.server.shutdown()
             self.server.server_close()
@@ -0,0 +1,208 @@
+import json
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+TaskStates = Dict[str, Dict[str, Any]]
+
+
+def format_event(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Events message."""
+    payload = json.dumps(data, default=str, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class EventQueue(queue.Queue):
+    """
+    Subscriber queue able to wake an event loop.
+
+    A waker registered with ``set_waker`` is called after every put, from
+    the producing thread, so an asyncio server can wait for events without
+    a thread blocked in ``get``. It runs with the queue lock held, so it must
+    not use the queue, and must return quickly and never raise.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        super().__init__(maxsize)
+        self._waker: Optional[Callable[[], None]] = None
+
+    def set_waker(self, waker: Optional[Callable[[], None]]):
+        with self.mutex:
+            self._waker = waker
+
+    def _put(self, item):
+        # Called by put with the queue mutex held
+        super()._put(item)
+        if self._waker is not None:
+            self._waker()
+
+
+def end_stream(subscriber: queue.Queue):
+    """Queue the end marker, making room for it if the subscriber fell behind."""
+    while True:
+        try:
+            subscriber.put_nowait(None)
+            return
+        except queue.Full:
+            try:
+                subscriber.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def diff_task_states(old: TaskStates, new: TaskStates) -> Tuple[TaskStates, List[str]]:
+    """
+    Compare two task state maps.
+
+    :return: The changed fields of each task (every field for new tasks),
+        and the names of removed tasks
+    """
+    changed: TaskStates = {}
+    for name, fields in new.items():
+        previous = old.get(name)
+        if previous is None:
+            changed[name] = fields
+            continue
+        delta = {key: value for key, value in fields.items() if previous.get(key) != value}
+        if delta:
+            changed[name] = delta
+    removed = [name for name in old if name not in new]
+    return changed, removed
+
+
+class StatusEventHub:
+    """
+    Fans status deltas out to Server-Sent Events subscribers.
+
+    A single sampler thread, running only while someone is subscribed,
+    compares the runner fields every ``interval`` seconds and broadcasts
+    the changed ones as a ``patch`` event. Resource usage is more expensive
+    to sample and is pushed as a ``resources`` event at most every
+    ``resource_interval`` seconds. Events are serialized once and shared by
+    every subscriber. New subscribers first receive a full ``snapshot``.
+
+    A subscriber that falls ``queue_size`` events behind is disconnected
+    and resynchronizes with a fresh snapshot when its browser reconnects.
+    """
+
+    def __init__(
+        self,
+        collect_states: Callable[[], TaskStates],
+        collect_resources: Callable[[], Dict[str, Any]],
+        interval: float = 0.5,
+        resource_interval: float = 2.0,
+        queue_size: int = 256,
+    ):
+        """
+        StatusEventHub init
+
+        :param collect_states: Returns the current fields of every task, by name
+        :param collect_resources: Returns ``{"tasks": {name: usage}, "global": usage, ...}``
+        :param interval: Seconds between two state comparisons
+        :param resource_interval: Minimum seconds between two resource samples
+        :param queue_size: Events buffered per subscriber before it is dropped
+        """
+        self.collect_states = collect_states
+        self.collect_resources = collect_resources
+        self.interval = interval
+        self.resource_interval = resource_interval
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: List[queue.Queue] = []
+        self._states: Optional[TaskStates] = None
+        self._resources: Optional[Dict[str, Any]] = None
+        self._resources_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self) -> queue.Queue:
+        """
+        Register a subscriber.
+
+        :return: Queue of encoded events, ``None`` means the stream is over
+        """
+        subscriber = EventQueue(maxsize=self.queue_size)
+        with self._lock:
+            if self._states is None:
+                self._states = self.collect_states()
+                self._resources = self.collect_resources()
+                self._resources_at = time.monotonic()
+            subscriber.put_nowait(
+                format_event("snapshot", {"tasks": self._states, "resources": self._resources})
+            )
+            self._subscribers.append(subscriber)
+            if not (self._thread and self._thread.is_alive()):
+                self._closed.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="DashboardEvents", daemon=True
+                )
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def close(self):
+        """End every stream and stop the sampler."""
+        self._closed.set()
+        with self._lock:
+            for subscriber in self._subscribers:
+                end_stream(subscriber)
+            self._subscribers = []
+            thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def _run(self):
+        while not self._closed.wait(self.interval):
+            with self._lock:
+                if not self._subscribers:
+                    # Sampling resumes from a fresh snapshot on the next subscription
+                    self._states = None
+                    self._resources = None
+                    self._thread = None
+                    return
+            self.sample()
+
+    def sample(self):
+        """Compare the current state with the last one and broadcast the differences."""
+        states = self.collect_states()
+        resources = None
+        now = time.monotonic()
+        if now - self._resources_at >= self.resource_interval:
+            resources = self.collect_resources()
+
+        with self._lock:
+            changed, removed = diff_task_states(self._states or {}, states)
+            self._states = states
+            if changed or removed:
+                self._broadcast(format_event("patch", {"tasks": changed, "removed": removed}))
+
+            if resources is not None:
+                self._resources_at = now
+                previous = (self._resources or {}).get("tasks", {})
+                update = dict(resources)
+                update["tasks"] = {
+                    name: usage
+                    for name, usage in resources.get("tasks", {}).items()
+                    if previous.get(name) != usage
+                }
+                self._resources = resources
+                self._broadcast(format_event("resources", update))
+
+    def _broadcast(self, event: bytes):
+        """Queue an event for every subscriber, caller holds the lock."""
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                self._subscribers.remove(subscriber)
+                end_stream(subscriber)
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class ResourceHistory:
+    """
+    Resource usage timelines of the tasks someone is looking at.
+
+    Keeping a timeline for every task costs memory and sampling time that
+    grow with the number of tasks, while the dashboard shows one timeline at
+    a time. A task is only sampled, every ``interval`` seconds, after its
+    timeline was requested and until nobody requested it for ``ttl``
+    seconds; its samples are dropped with it. The sampler thread only runs
+    while at least one timeline is watched.
+    """
+
+    def __init__(
+        self,
+        sample: Callable[[str], Optional[Dict[str, Any]]],
+        size: int = 60,
+        interval: float = 2.0,
+        ttl: float = 30.0,
+    ):
+        """
+        ResourceHistory init
+
+        :param sample: Returns the ``{"cpu", "memory"}`` usage of a task, None when it is unknown
+        :param size: Samples kept per task
+        :param interval: Seconds between two samples
+        :param ttl: Seconds a timeline keeps being sampled after its last request
+        """
+        self.sample = sample
+        self.size = size
+        self.interval = interval
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._watched_until: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def watched(self):
+        with self._lock:
+            return sorted(self._watched_until)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Timeline of a task, which keeps being sampled for ``ttl`` seconds.
+
+        :return: ``{"name", "interval", "samples": [[epoch, cpu, memory], ...]}``,
+            or None for an unknown task
+        """
+        with self._lock:
+            samples = self._samples.get(name)
+        if samples is None:
+            usage = self.sample(name)
+            if usage is None:
+                return None
+            samples = deque([(time.time(), usage["cpu"], usage["memory"])], maxlen=self.size)
+
+        with self._lock:
+            samples = self._samples.setdefault(name, samples)
+            self._watched_until[name] = time.monotonic() + self.ttl
+            if not (self._thread and self._thread.is_alive()):
+                self._closed.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="ResourceHistory", daemon=True
+                )
+                self._thread.start()
+            return {"name": name, "interval": self.interval, "samples": [list(s) for s in samples]}
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            thread = self._thread
+            self._samples = {}
+            self._watched_until = {}
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def _run(self):
+        while not self._closed.wait(self.interval):
+            now = time.monotonic()
+            with self._lock:
+                for name in [n for n, until in self._watched_until.items() if until <= now]:
+                    del self._watched_until[name]
+                    self._samples.pop(name, None)
+                if not self._watched_until:
+                    self._thread = None
+                    return
+                names = list(self._watched_until)
+
+            for name in names:
+                usage = self.sample(name)
+                with self._lock:
+                    if usage is None:
+                        # The task was removed
+                        self._watched_until.pop(name, None)
+                        self._samples.pop(name, None)
+                    elif name in self._samples:
+                        self._samples[name].append((time.time(), usage["cpu"], usage["memory"]))
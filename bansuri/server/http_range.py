@@ -0,0 +1,45 @@
+import re
+from typing import Optional, Tuple
+
+_RANGE = re.compile(r"^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """The requested range lies outside the file."""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header.
+
+    :param header: Header value, e.g. ``bytes=0-499``, ``bytes=500-`` or ``bytes=-500``
+    :param size: Current size of the resource
+    :return: Inclusive ``(first, last)`` byte positions, or None to send the
+        whole resource (no header, another unit or several ranges)
+    :raises RangeNotSatisfiable: When the range does not overlap the resource
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header)
+    if not match:
+        # Multiple ranges or unknown units, a full response is allowed
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range, the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        # Syntactically invalid, ignored
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
@@ -0,0 +1,258 @@
+import codecs
+import os
+import queue
+import select
+import threading
+from typing import Dict, List, Optional
+
+from bansuri.base.misc import inotify
+from bansuri.server.events import EventQueue, end_stream, format_event
+
+_WATCH_MASK = (
+    inotify.IN_MODIFY
+    | inotify.IN_CLOSE_WRITE
+    | inotify.IN_CREATE
+    | inotify.IN_DELETE
+    | inotify.IN_MOVED_FROM
+    | inotify.IN_MOVED_TO
+    | inotify.IN_ATTRIB
+    | inotify.IN_DELETE_SELF
+    | inotify.IN_MOVE_SELF
+)
+
+
+class SharedLogReader:
+    """
+    Follows one log file on behalf of every subscriber.
+
+    The file is kept open at its end and only read when inotify reports
+    activity in its directory, or with an exponential backoff between
+    ``poll_interval`` and ``max_poll_interval`` when inotify is not
+    available. A rotation is detected through an inode change: the rest of
+    the old file is drained and the new one is followed from its start. A
+    truncated file is followed from its start as well.
+
+    Subscribers receive encoded ``append`` and ``rotate`` Server-Sent Events,
+    and ``None`` once the stream is over.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        poll_interval: float = 0.1,
+        max_poll_interval: float = 2.0,
+        chunk_size: int = 65536,
+        queue_size: int = 1024,
+        use_inotify: bool = True,
+    ):
+        """
+        SharedLogReader init
+
+        :param path: Log file to follow, it does not need to exist yet
+        :param poll_interval: Initial polling delay when inotify is unavailable
+        :param max_poll_interval: Upper bound of the polling backoff
+        :param chunk_size: Bytes read, and sent, at once
+        :param queue_size: Events buffered per subscriber before it is dropped
+        :param use_inotify: Set to False to force polling
+        """
+        self.path = os.path.abspath(path)
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: List[queue.Queue] = []
+        self._file = None
+        self._ino: Optional[int] = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._stop = threading.Event()
+        self._wake_r, self._wake_w = os.pipe()
+        self._inotify: Optional[inotify.Inotify] = None
+        if use_inotify and inotify.inotify_available():
+            try:
+                self._inotify = inotify.Inotify()
+                self._inotify.add_watch(os.path.dirname(self.path), _WATCH_MASK)
+            except OSError:
+                self._drop_inotify()
+
+        self._open(at_end=True)
+        self._thread = threading.Thread(target=self._run, name="LogFollow", daemon=True)
+        self._thread.start()
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify else "polling"
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self) -> queue.Queue:
+        """New subscribers receive what is appended from now on."""
+        subscriber = EventQueue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> int:
+        """:return: The number of remaining subscribers"""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            return len(self._subscribers)
+
+    def close(self):
+        self._stop.set()
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        with self._lock:
+            for subscriber in self._subscribers:
+                end_stream(subscriber)
+            self._subscribers = []
+        self._drop_inotify()
+        self._close_file()
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _drop_inotify(self):
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    def _open(self, at_end: bool):
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return
+        if at_end:
+            f.seek(0, os.SEEK_END)
+        self._file = f
+        self._ino = os.fstat(f.fileno()).st_ino
+        self._decoder.reset()
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._ino = None
+
+    def _wait(self, timeout: Optional[float]):
+        """Block until the directory changes, or timeout expires. Returns False when closed."""
+        sources = [self._wake_r] + ([self._inotify] if self._inotify else [])
+        readable, _, _ = select.select(sources, [], [], timeout)
+        if self._inotify and self._inotify in readable:
+            for event in self._inotify.read_events():
+                if event.mask & (inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF | inotify.IN_IGNORED):
+                    # The directory itself went away, keep going by polling
+                    self._drop_inotify()
+                    break
+        return not self._stop.is_set()
+
+    def _run(self):
+        delay = self.poll_interval
+        while True:
+            timeout = None if self._inotify else delay
+            if not self._wait(timeout):
+                return
+            if self._follow():
+                delay = self.poll_interval
+            else:
+                delay = min(delay * 2, self.max_poll_interval)
+
+    def _follow(self) -> bool:
+        """Send what was appended and handle rotation. Returns True when anything happened."""
+        activity = self._drain()
+
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            # Rotated away, the new file is picked up once it is created
+            return activity
+
+        if self._file is None or st.st_ino != self._ino:
+            rotated = self._file is not None
+            self._close_file()
+            self._open(at_end=False)
+            if rotated:
+                self._broadcast(format_event("rotate", {"reason": "rotated"}))
+            return self._drain() or True
+
+        if st.st_size < self._file.tell():
+            self._file.seek(0)
+            self._decoder.reset()
+            self._broadcast(format_event("rotate", {"reason": "truncated"}))
+            return self._drain() or True
+
+        return activity
+
+    def _drain(self) -> bool:
+        if self._file is None:
+            return False
+        activity = False
+        while True:
+            data = self._file.read(self.chunk_size)
+            if not data:
+                return activity
+            activity = True
+            text = self._decoder.decode(data)
+            if text:
+                self._broadcast(format_event("append", text))
+
+    def _broadcast(self, event: bytes):
+        with self._lock:
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.put_nowait(event)
+                except queue.Full:
+                    self._subscribers.remove(subscriber)
+                    end_stream(subscriber)
+
+
+class LogFollowRegistry:
+    """Hands out one shared reader per log file, closed with its last subscriber."""
+
+    def __init__(self, **reader_options):
+        """
+        LogFollowRegistry init
+
+        :param reader_options: Keyword arguments passed to every ``SharedLogReader``
+        """
+        self.reader_options = reader_options
+        self._lock = threading.Lock()
+        self._readers: Dict[str, SharedLogReader] = {}
+
+    def subscribe(self, path: str) -> queue.Queue:
+        path = os.path.abspath(path)
+        with self._lock:
+            reader = self._readers.get(path)
+            if reader is None:
+                reader = self._readers[path] = SharedLogReader(path, **self.reader_options)
+            return reader.subscribe()
+
+    def unsubscribe(self, path: str, subscriber: queue.Queue):
+        path = os.path.abspath(path)
+        with self._lock:
+            reader = self._readers.get(path)
+            if reader is None or reader.unsubscribe(subscriber):
+                return
+            del self._readers[path]
+        reader.close()
+
+    def reader_count(self) -> int:
+        with self._lock:
+            return len(self._readers)
+
+    def close(self):
+        with self._lock:
+            readers = list(self._readers.values())
+            self._readers = {}
+        for reader in readers:
+            reader.close()
@@ -0,0 +1,351 @@
+import bisect
+import os
+import re
+import struct
+import threading
+from array import array
+from datetime import datetime
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+_MAGIC = b"BLOGIDX1"
+# magic, inode, indexed bytes, indexed lines, stride
+_HEADER = struct.Struct("<8sQQQI")
+# line start offset, timestamp
+_RECORD = struct.Struct("<Qd")
+
+# ISO-like timestamp near the start of a line, e.g. "[2024-01-31 12:00:00]" or "2024-01-31T12:00:00"
+_TIMESTAMP = re.compile(rb"(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2})")
+_TIMESTAMP_SCAN = 64
+
+
+def parse_line_timestamp(line: bytes) -> Optional[float]:
+    """Epoch of the timestamp found at the start of a log line, if any."""
+    match = _TIMESTAMP.search(line, 0, _TIMESTAMP_SCAN)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(
+            f"{match.group(1).decode()} {match.group(2).decode()}", "%Y-%m-%d %H:%M:%S"
+        ).timestamp()
+    except ValueError:
+        return None
+
+
+def default_index_path(log_path: str) -> str:
+    """Hidden sidecar next to the log, so rotation globs like ``task.log*`` skip it."""
+    directory, name = os.path.split(os.path.abspath(log_path))
+    return os.path.join(directory, f".{name}.idx")
+
+
+class LogLineIndex:
+    """
+    Incremental index of line start offsets for one log file.
+
+    Every ``stride``-th line start is recorded with the timestamp found at
+    the beginning of that line (or the previous checkpoint's one), so a
+    line number or a time maps to a checkpoint in O(log n) and at most
+    ``stride`` lines are scanned from there. Only complete lines are
+    indexed, and each update only reads the bytes appended since the
+    previous one. A new inode or a shrinking file restarts the index.
+
+    Checkpoints are persisted in an append-only sidecar file of 16-byte
+    records; when it cannot be written the index is kept in memory only.
+    Updates scan the file without holding the lock lookups take, new
+    checkpoints are swapped in once the scan is over, so a long first
+    indexing never stalls ``locate_line`` and ``locate_time``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        stride: int = 64,
+        index_path: Optional[str] = None,
+        chunk_size: int = 1 << 20,
+    ):
+        """
+        LogLineIndex init
+
+        :param path: Log file to index
+        :param stride: Number of lines between two checkpoints
+        :param index_path: Sidecar file, defaults to a hidden file next to the log
+        :param chunk_size: Bytes read at once while indexing
+        """
+        self.path = os.path.abspath(path)
+        self.stride = stride
+        self.index_path = index_path or default_index_path(self.path)
+        self.chunk_size = chunk_size
+        # Guards the checkpoints read by lookups, only held for the swap
+        self._lock = threading.Lock()
+        # Serializes updates, the only writers of the index
+        self._update_lock = threading.Lock()
+        self._loaded = False
+        self._reset(None)
+
+    def _reset(self, ino: Optional[int]):
+        self._ino = ino
+        self._indexed_bytes = 0
+        self._line_count = 0
+        self._offsets = array("Q")
+        self._times = array("d")
+        self._persisted = 0
+
+    @property
+    def line_count(self) -> int:
+        """Number of complete lines indexed so far."""
+        return self._line_count
+
+    @property
+    def indexed_bytes(self) -> int:
+        return self._indexed_bytes
+
+    def _load(self):
+        """Resume from the sidecar when it describes the current file."""
+        self._loaded = True
+        try:
+            st = os.stat(self.path)
+            with open(self.index_path, "rb") as f:
+                magic, ino, indexed_bytes, line_count, stride = _HEADER.unpack(
+                    f.read(_HEADER.size)
+                )
+                if magic != _MAGIC or ino != st.st_ino or stride != self.stride:
+                    return
+                if indexed_bytes > st.st_size:
+                    return
+                expected = (line_count + stride - 1) // stride
+                raw = f.read(expected * _RECORD.size)
+        except (OSError, struct.error):
+            return
+        if len(raw) != expected * _RECORD.size:
+            return
+
+        offsets, times = array("Q"), array("d")
+        for offset, timestamp in _RECORD.iter_unpack(raw):
+            offsets.append(offset)
+            times.append(timestamp)
+        with self._lock:
+            self._ino = ino
+            self._indexed_bytes = indexed_bytes
+            self._line_count = line_count
+            self._offsets, self._times = offsets, times
+        self._persisted = expected
+
+    def _persist(self):
+        header = _HEADER.pack(
+            _MAGIC, self._ino or 0, self._indexed_bytes, self._line_count, self.stride
+        )
+        records = b"".join(
+            _RECORD.pack(self._offsets[i], self._times[i])
+            for i in range(self._persisted, len(self._offsets))
+        )
+        try:
+            if self._persisted == 0:
+                with open(self.index_path, "wb") as f:
+                    f.write(header)
+                    f.write(records)
+            else:
+                with open(self.index_path, "r+b") as f:
+                    f.seek(_HEADER.size + self._persisted * _RECORD.size)
+                    f.write(records)
+                    f.truncate()
+                    # Header last, so a crash never points past the records
+                    f.seek(0)
+                    f.write(header)
+        except OSError:
+            return
+        self._persisted = len(self._offsets)
+
+    def update(self) -> int:
+        """
+        Index lines appended since the previous update.
+
+        :return: Number of indexed lines
+        """
+        with self._update_lock:
+            if not self._loaded:
+                self._load()
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                with self._lock:
+                    self._reset(None)
+                return 0
+
+            if st.st_ino != self._ino or st.st_size < self._indexed_bytes:
+                # Dropped before the scan, lookups must not use offsets of the old file
+                with self._lock:
+                    self._reset(st.st_ino)
+            if st.st_size > self._indexed_bytes:
+                offsets, times, indexed_bytes, line_count = self._scan()
+                with self._lock:
+                    self._offsets.extend(offsets)
+                    self._times.extend(times)
+                    self._indexed_bytes = indexed_bytes
+                    self._line_count = line_count
+                self._persist()
+            return self._line_count
+
+    def _scan(self) -> Tuple[array, array, int, int]:
+        """
+        Read the lines appended since the indexed part, without the lock.
+
+        :return: The new checkpoints, and the indexed bytes and lines once they are added
+        """
+        offsets, times = array("Q"), array("d")
+        indexed_bytes, line_count = self._indexed_bytes, self._line_count
+        last_time = self._times[-1] if self._times else 0.0
+        with open(self.path, "rb") as f:
+            f.seek(indexed_bytes)
+            pending = b""
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    return offsets, times, indexed_bytes, line_count
+                buf = pending + data
+                end = buf.rfind(b"\n") + 1
+                if not end:
+                    pending = buf
+                    continue
+
+                lines = buf[:end].split(b"\n")
+                del lines[-1]
+                # Line starts relative to buf, computed without a Python-level loop
+                starts = [0]
+                starts.extend(accumulate(map((1).__add__, map(len, lines[:-1]))))
+                first = -line_count % self.stride
+                for i in range(first, len(lines), self.stride):
+                    timestamp = parse_line_timestamp(lines[i])
+                    if timestamp is not None:
+                        last_time = timestamp
+                    offsets.append(indexed_bytes + starts[i])
+                    times.append(last_time)
+
+                indexed_bytes += end
+                line_count += len(lines)
+                pending = buf[end:]
+
+    def locate_line(self, line: int) -> Tuple[int, int]:
+        """
+        Byte offset of a line start.
+
+        :param line: 0-based line number, clamped to the indexed lines
+        :return: ``(line, offset)``, the end of the indexed part for lines past it
+        """
+        with self._lock:
+            if line >= self._line_count:
+                return self._line_count, self._indexed_bytes
+            line = max(0, line)
+            checkpoint = line // self.stride
+            offset = self._offsets[checkpoint]
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for _ in range(line - checkpoint * self.stride):
+                offset += len(f.readline())
+        return line, offset
+
+    def locate_time(self, since: float) -> Tuple[int, int]:
+        """
+        First line whose timestamp is at or after ``since``.
+
+        :param since: Epoch seconds
+        :return: ``(line, offset)``, the end of the indexed part when no line matches
+        """
+        with self._lock:
+            checkpoint = max(0, bisect.bisect_left(self._times, since) - 1)
+            if checkpoint >= len(self._offsets):
+                return self._line_count, self._indexed_bytes
+            line = checkpoint * self.stride
+            offset = self._offsets[checkpoint]
+            line_count = self._line_count
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while line < line_count:
+                text = f.readline()
+                timestamp = parse_line_timestamp(text)
+                if timestamp is not None and timestamp >= since:
+                    return line, offset
+                line += 1
+                offset += len(text)
+        return line, offset
+
+    def read_lines(self, offset: int, limit: int) -> Tuple[str, int]:
+        """
+        Read whole lines starting at a line start offset.
+
+        :param offset: Line start, as returned by ``locate_line``/``locate_time``
+        :param limit: Maximum bytes, a single longer line is still returned whole
+        :return: The decoded text and the number of lines in it
+        """
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(limit)
+            end = data.rfind(b"\n") + 1
+            if end:
+                data = data[:end]
+            elif data:
+                data += f.readline()
+        return data.decode("utf-8", errors="replace"), data.count(b"\n")
+
+
+class LogIndexRegistry:
+    """
+    One ``LogLineIndex`` per log file, kept up to date in the background.
+    """
+
+    def __init__(self, interval: float = 30.0, **index_options):
+        """
+        LogIndexRegistry init
+
+        :param interval: Seconds between two background updates
+        :param index_options: Keyword arguments passed to every ``LogLineIndex``
+        """
+        self.interval = interval
+        self.index_options = index_options
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, LogLineIndex] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, path: str) -> LogLineIndex:
+        path = os.path.abspath(path)
+        with self._lock:
+            index = self._indexes.get(path)
+            if index is None:
+                index = self._indexes[path] = LogLineIndex(path, **self.index_options)
+            return index
+
+    def start(self, log_paths: Callable[[], Iterable[str]]):
+        """
+        Index the given logs every ``interval`` seconds.
+
+        :param log_paths: Returns the log files currently worth indexing
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(log_paths,), name="LogIndexer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, log_paths):
+        while not self._stop.is_set():
+            try:
+                paths = list(log_paths())
+            except Exception:
+                # The task list is being changed, retry on the next round
+                paths = []
+            for path in paths:
+                if self._stop.is_set():
+                    return
+                if os.path.isfile(path):
+                    try:
+                        self.get(path).update()
+                    except OSError:
+                        pass
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
@@ -0,0 +1,266 @@
+import base64
+import glob
+import gzip
+import json
+import mmap
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_MAX_LINE_CHARS = 1000
+# A quantified group that itself contains a quantifier, like (a+)+ or (\w*x)*,
+# can backtrack exponentially on a line that almost matches
+_NESTED_QUANTIFIER = re.compile(r"\((?:[^()\\]|\\.)*[+*}](?:[^()\\]|\\.)*\)(?:[+*]|\{\d*,)")
+
+
+class SearchBusyError(RuntimeError):
+    """Raised when too many searches already run."""
+
+
+def rotated_log_files(path: str) -> List[str]:
+    """
+    Return a log file followed by its rotated siblings, newest first.
+
+    Rotated files are those named ``<log>.<suffix>`` or ``<log>-<suffix>``,
+    like ``task.log.1``, ``task.log.2.gz`` or ``task.log-20240131``.
+    """
+    path = os.path.abspath(path)
+    rotated = {
+        candidate
+        for pattern in (glob.escape(path) + ".*", glob.escape(path) + "-*")
+        for candidate in glob.glob(pattern)
+        if os.path.isfile(candidate)
+    }
+    files = [path] if os.path.isfile(path) else []
+    return files + sorted(rotated, key=lambda p: os.stat(p).st_mtime, reverse=True)
+
+
+def encode_cursor(file_id: int, offset: int, line: int) -> str:
+    raw = json.dumps([file_id, offset, line]).encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int, int]:
+    try:
+        file_id, offset, line = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(file_id), int(offset), int(line)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid search cursor: {cursor!r}")
+
+
+def _locate_cursor_file(files: List[str], file_id: int, offset: int) -> int:
+    """
+    Index in ``files`` of the file a cursor points into.
+
+    The cursor names the file by inode, which a rename keeps, so a search
+    follows ``task.log`` when it is rotated to ``task.log.1`` between pages.
+
+    :raises ValueError: When the file is gone or was truncated below the offset
+    """
+    for index, path in enumerate(files):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_ino != file_id:
+            continue
+        if path.endswith(".gz") or offset <= stat.st_size:
+            return index
+        break
+    raise ValueError("Search cursor refers to a log file that was rotated away, search again")
+
+
+class LogSearcher:
+    """
+    Bounded, streaming search through a log and its rotated files.
+
+    Plain files are memory mapped and scanned in line-aligned chunks, gzip
+    files are decompressed as a stream in chunks of the same size, so memory
+    use does not depend on the file sizes. A search stops at ``limit``
+    matches or when its time budget is spent, and returns a cursor to
+    resume from. The budget is checked after every chunk and every match,
+    and chunks are kept small so one regex pass cannot overrun it by much;
+    long patterns and nested quantifiers are refused for the same reason.
+    At most ``max_concurrent`` searches run at once, so searches cannot
+    take every dashboard thread.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        chunk_size: int = 256 << 10,
+        time_budget: float = 2.0,
+        max_limit: int = 1000,
+        max_pattern: int = 256,
+    ):
+        """
+        LogSearcher init
+
+        :param max_concurrent: Searches allowed to run at the same time
+        :param chunk_size: Bytes scanned at once
+        :param time_budget: Seconds a single request may scan before returning
+        :param max_limit: Upper bound of matches per page
+        :param max_pattern: Longest query accepted, in characters
+        """
+        self.chunk_size = chunk_size
+        self.time_budget = time_budget
+        self.max_limit = max_limit
+        self.max_pattern = max_pattern
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def search(
+        self,
+        path: str,
+        query: str,
+        regex: bool = False,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        ignore_case: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Search a log and its rotated files.
+
+        :param path: Current log file
+        :param query: Text to look for, or a regular expression
+        :param regex: Treat ``query`` as a regular expression
+        :param limit: Matches per page
+        :param cursor: ``next_cursor`` of the previous page
+        :param ignore_case: Case-insensitive match
+        :return: ``matches`` (file, line, offset, text), ``next_cursor``,
+            ``complete`` and ``scanned_bytes``
+        :raises ValueError: On an empty or too long query, an invalid or too costly
+            regex, an invalid cursor or a cursor into a file that was rotated away
+        :raises SearchBusyError: When too many searches already run
+        """
+        if not query:
+            raise ValueError("Empty search query")
+        if len(query) > self.max_pattern:
+            raise ValueError(f"Search query longer than {self.max_pattern} characters")
+        if regex and _NESTED_QUANTIFIER.search(query):
+            raise ValueError("Nested quantifiers like (a+)+ are not allowed in a search")
+        flags = re.IGNORECASE if ignore_case else 0
+        pattern = query.encode("utf-8") if regex else re.escape(query.encode("utf-8"))
+        try:
+            matcher = re.compile(pattern, flags | re.MULTILINE)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression: {e}")
+
+        limit = max(1, min(limit, self.max_limit))
+        position = decode_cursor(cursor) if cursor else None
+
+        if not self._slots.acquire(timeout=0.5):
+            raise SearchBusyError("Too many searches running, retry later")
+        try:
+            files = rotated_log_files(path)
+            file_index, offset, line = 0, 0, 0
+            if position:
+                file_id, offset, line = position
+                file_index = _locate_cursor_file(files, file_id, offset)
+            return self._search(files, matcher, limit, file_index, offset, line)
+        finally:
+            self._slots.release()
+
+    def _search(self, files, matcher, limit, file_index, offset, line) -> Dict[str, Any]:
+        deadline = time.monotonic() + self.time_budget
+        matches: List[Dict[str, Any]] = []
+        scanned = 0
+
+        while file_index < len(files):
+            path = files[file_index]
+            try:
+                file_id = os.stat(path).st_ino
+                for chunk_offset, chunk in self._chunks(path, offset):
+                    scanned += len(chunk)
+                    position, counted = 0, 0
+                    for match in matcher.finditer(chunk):
+                        # Matches may span lines with a regex, report the line where they start
+                        start = chunk.rfind(b"\n", 0, match.start()) + 1
+                        if start < position:
+                            continue
+                        end = chunk.find(b"\n", match.start())
+                        end = len(chunk) if end == -1 else end
+                        line += chunk.count(b"\n", counted, start)
+                        counted = start
+                        matches.append(
+                            {
+                                "file": os.path.basename(path),
+                                "line": line,
+                                "offset": chunk_offset + start,
+                                "text": chunk[start:end]
+                                .decode("utf-8", errors="replace")[:_MAX_LINE_CHARS],
+                            }
+                        )
+                        position = end + 1
+                        if len(matches) >= limit or time.monotonic() >= deadline:
+                            next_line = line + chunk.count(b"\n", counted, position)
+                            return self._page(
+                                matches,
+                                encode_cursor(file_id, chunk_offset + position, next_line),
+                                scanned,
+                            )
+                    line += chunk.count(b"\n", counted)
+                    offset = chunk_offset + len(chunk)
+                    if time.monotonic() >= deadline:
+                        return self._page(
+                            matches, encode_cursor(file_id, offset, line), scanned
+                        )
+            except (OSError, EOFError):
+                # Rotated away or a corrupted archive, go on with the next file
+                pass
+            file_index, offset, line = file_index + 1, 0, 0
+
+        return self._page(matches, None, scanned)
+
+    @staticmethod
+    def _page(matches, next_cursor, scanned) -> Dict[str, Any]:
+        return {
+            "matches": matches,
+            "next_cursor": next_cursor,
+            "complete": next_cursor is None,
+            "scanned_bytes": scanned,
+        }
+
+    def _chunks(self, path: str, offset: int) -> Iterator[Tuple[int, bytes]]:
+        """Yield ``(offset, chunk)`` pairs, each chunk ending on a line boundary."""
+        if path.endswith(".gz"):
+            yield from self._gzip_chunks(path, offset)
+            return
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if offset >= size:
+                return
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                while offset < size:
+                    end = min(offset + self.chunk_size, size)
+                    if end < size:
+                        newline = mm.rfind(b"\n", offset, end)
+                        if newline == -1:
+                            # A line longer than a chunk, take it whole
+                            newline = mm.find(b"\n", end)
+                            newline = size - 1 if newline == -1 else newline
+                        end = newline + 1
+                    yield offset, mm[offset:end]
+                    offset = end
+
+    def _gzip_chunks(self, path: str, offset: int) -> Iterator[Tuple[int, bytes]]:
+        with gzip.open(path, "rb") as f:
+            if offset:
+                f.seek(offset)
+            pending = b""
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    if pending:
+                        yield offset, pending
+                    return
+                buf = pending + data
+                end = buf.rfind(b"\n") + 1
+                if not end:
+                    pending = buf
+                    continue
+                yield offset, buf[:end]
+                offset += end
+                pending = buf[end:]
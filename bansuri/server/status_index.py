@@ -0,0 +1,239 @@
+import base64
+import bisect
+import fnmatch
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+FIELDS = (
+    "name",
+    "status",
+    "last_run",
+    "next_run",
+    "attempts",
+    "failed_attempts",
+    "command",
+    "tags",
+    "resources",
+)
+SORT_KEYS = ("name", "status", "last_run", "cpu", "rss")
+_GLOB_CHARS = "*?["
+
+
+def _encode_cursor(sort: str, descending: bool, key) -> str:
+    raw = json.dumps([sort, descending, *key]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str, sort: str, descending: bool):
+    """The sort key of the last task of the previous page, checked against the query order"""
+    try:
+        cursor_sort, cursor_descending, value, name = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid status cursor: {cursor!r}")
+    if cursor_sort != sort or cursor_descending != descending:
+        order = f"-{cursor_sort}" if cursor_descending else cursor_sort
+        raise ValueError(f"Status cursor was issued for sort '{order}', repeat that sort")
+    # name and status sort by string, the other keys by number
+    expected = str if sort in ("name", "status") else (int, float)
+    if not isinstance(name, str) or not isinstance(value, expected):
+        raise ValueError(f"Invalid status cursor: {cursor!r}")
+    return value, name
+
+
+def _timestamp(value) -> float:
+    to_timestamp = getattr(value, "timestamp", None)
+    return to_timestamp() if to_timestamp else 0.0
+
+
+class StatusIndex:
+    """
+    Task fields kept up to date from state change notifications.
+
+    Tasks are also indexed by status and by tag, and their names are kept
+    sorted, so a query only touches the tasks it may return: a status or
+    tag filter starts from the matching set, and a name glob with a literal
+    prefix (``web-*``) from a range of the sorted names. Resource usage is
+    not a state, it is only sampled for the tasks a query sorts by it or
+    returns it for.
+    """
+
+    def __init__(
+        self,
+        describe: Callable[[Any], Dict[str, Any]],
+        usage: Callable[[str], Optional[Dict[str, Any]]],
+    ):
+        """
+        StatusIndex init
+
+        :param describe: Returns the fields of a runner, ``name``, ``status`` and ``tags`` included
+        :param usage: Returns the ``{"cpu", "memory"}`` usage of a task by name
+        """
+        self.describe = describe
+        self.usage = usage
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._names: List[str] = []
+        self._by_status: Dict[str, Set[str]] = {}
+        self._by_tag: Dict[str, Set[str]] = {}
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def update(self, name: str, runner: Optional[Any]):
+        """Re-index a task from its runner, or drop it when ``runner`` is None"""
+        record = self.describe(runner) if runner is not None else None
+        with self._lock:
+            previous = self._tasks.pop(name, None)
+            if previous is not None:
+                self._unindex(name, previous)
+            if record is None:
+                if previous is not None:
+                    del self._names[bisect.bisect_left(self._names, name)]
+                return
+
+            if previous is None:
+                bisect.insort(self._names, name)
+            self._tasks[name] = record
+            self._by_status.setdefault(record["status"], set()).add(name)
+            for tag in record.get("tags") or ():
+                self._by_tag.setdefault(tag, set()).add(name)
+
+    def rebuild(self, runners: Dict[str, Any]):
+        """Replace the whole index, for orchestrators that do not report changes"""
+        records = {name: self.describe(runner) for name, runner in runners.items()}
+        with self._lock:
+            self._tasks = {}
+            self._names = sorted(records)
+            self._by_status = {}
+            self._by_tag = {}
+            for name, record in records.items():
+                self._tasks[name] = record
+                self._by_status.setdefault(record["status"], set()).add(name)
+                for tag in record.get("tags") or ():
+                    self._by_tag.setdefault(tag, set()).add(name)
+
+    def _unindex(self, name: str, record: Dict[str, Any]):
+        for index, key in [(self._by_status, record["status"])] + [
+            (self._by_tag, tag) for tag in record.get("tags") or ()
+        ]:
+            names = index.get(key)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del index[key]
+
+    def _candidates(
+        self, statuses: Sequence[str], name: Optional[str], tag: Optional[str]
+    ) -> Iterable[str]:
+        """Names that may match, narrowed with the indexes. Caller holds the lock."""
+        candidates: Optional[Set[str]] = None
+        if statuses:
+            candidates = set()
+            for status in statuses:
+                candidates |= self._by_status.get(status, set())
+        if tag is not None:
+            tagged = self._by_tag.get(tag, set())
+            candidates = tagged if candidates is None else candidates & tagged
+
+        if candidates is None:
+            names: Iterable[str] = self._names
+            if name:
+                prefix = name
+                for char in _GLOB_CHARS:
+                    prefix = prefix.split(char, 1)[0]
+                if prefix:
+                    start = bisect.bisect_left(self._names, prefix)
+                    end = bisect.bisect_left(self._names, prefix + "\U0010ffff", start)
+                    names = self._names[start:end]
+            candidates_list = list(names)
+        else:
+            candidates_list = list(candidates)
+
+        if name:
+            return [n for n in candidates_list if fnmatch.fnmatchcase(n, name)]
+        return candidates_list
+
+    def select(
+        self, statuses: Sequence[str] = (), name: Optional[str] = None, tag: Optional[str] = None
+    ) -> List[str]:
+        """Sorted names of the tasks matching every given filter"""
+        with self._lock:
+            return sorted(self._candidates(statuses, name, tag))
+
+    def query(
+        self,
+        statuses: Sequence[str] = (),
+        name: Optional[str] = None,
+        tag: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        sort: str = "name",
+        descending: bool = False,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Select, sort and paginate tasks.
+
+        :param statuses: Keep tasks in one of these statuses
+        :param name: Keep tasks whose name matches this glob
+        :param tag: Keep tasks with this tag
+        :param fields: Fields returned for each task, every field by default
+        :param sort: One of ``SORT_KEYS``
+        :param descending: Reverse the order
+        :param limit: Tasks per page
+        :param cursor: ``next_cursor`` of the previous page
+        :return: ``tasks``, ``total`` (matching tasks) and ``next_cursor``
+        :raises ValueError: On an unknown field or sort key, or a cursor of another sort
+        """
+        fields = list(fields) if fields else list(FIELDS)
+        unknown = [f for f in fields if f not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown status field(s): {', '.join(unknown)}")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{sort}', expected one of {', '.join(SORT_KEYS)}")
+        after = _decode_cursor(cursor, sort, descending) if cursor else None
+
+        with self._lock:
+            records = {
+                n: dict(self._tasks[n]) for n in self._candidates(statuses, name, tag)
+            }
+
+        if sort in ("cpu", "rss"):
+            for task_name, record in records.items():
+                record["resources"] = self.usage(task_name) or {"cpu": 0.0, "memory": 0}
+        keys = {n: (self._sort_value(sort, record), n) for n, record in records.items()}
+        ordered = sorted(keys, key=keys.get, reverse=descending)
+
+        if after is not None:
+            ordered = [
+                n for n in ordered if (keys[n] < after if descending else keys[n] > after)
+            ]
+
+        page = ordered[: max(1, limit)]
+        tasks = []
+        for task_name in page:
+            record = records[task_name]
+            if "resources" in fields and "resources" not in record:
+                record["resources"] = self.usage(task_name) or {"cpu": 0.0, "memory": 0}
+            tasks.append({f: record.get(f) for f in fields})
+
+        return {
+            "tasks": tasks,
+            "total": len(records),
+            "next_cursor": _encode_cursor(sort, descending, keys[page[-1]]) if len(ordered) > len(page) else None,
+        }
+
+    @staticmethod
+    def _sort_value(sort: str, record: Dict[str, Any]):
+        if sort == "status":
+            return record["status"] or ""
+        if sort == "last_run":
+            return _timestamp(record.get("last_run"))
+        if sort == "cpu":
+            return float(record["resources"]["cpu"])
+        if sort == "rss":
+            return float(record["resources"]["memory"])
+        return ""
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from bansuri.base.config_manager import StartupConfig
+from bansuri.task_runner import TaskRunner
+
+
+class StartupRamp:
+    """
+    Starts runners at a bounded rate instead of forking them all in one burst.
+
+    Runners are ordered by descending ``priority`` (configuration order
+    breaks ties), optionally with services first, and launched by a
+    background thread at ``rate`` starts per second. With a rate of 0 every
+    runner is started synchronously, as before.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[StartupConfig] = None,
+        log: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        StartupRamp init
+
+        :param settings: Ramp settings, defaults to starting everything at once
+        :param log: Callback used to report progress
+        """
+        self.settings = settings or StartupConfig()
+        self._log = log or (lambda message: None)
+        self._cond = threading.Condition()
+        self._queue: Deque[TaskRunner] = deque()
+        # Runner taken from the queue and being started by the launcher thread
+        self._launching: Optional[TaskRunner] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._total = 0
+        self._started = 0
+        self._began_at = 0.0
+        self._next_report = 0
+
+    def configure(self, settings: StartupConfig):
+        """Apply new settings, also to runners still waiting in the queue."""
+        with self._cond:
+            self.settings = settings
+            self._cond.notify_all()
+
+    def order(self, runners: Iterable[TaskRunner]) -> List[TaskRunner]:
+        """Return runners in launch order."""
+        services_first = self.settings.services_first
+        return sorted(
+            runners,
+            key=lambda runner: (
+                services_first and not runner.is_service,
+                -runner.config.priority,
+            ),
+        )
+
+    def submit(self, runners: Iterable[TaskRunner]):
+        """
+        Start runners, right away or through the ramp.
+
+        :param runners: Runners to start
+        """
+        ordered = self.order(runners)
+        if not ordered:
+            return
+
+        if self.settings.rate <= 0:
+            for runner in ordered:
+                runner.start()
+            return
+
+        with self._cond:
+            if not self._queue:
+                self._total = 0
+                self._started = 0
+                self._began_at = time.monotonic()
+                self._next_report = 0
+            for runner in ordered:
+                runner.mark_queued()
+                self._queue.append(runner)
+            self._total += len(ordered)
+            self._stopped = False
+            self._log(
+                f"Startup ramp: queued {len(ordered)} task(s) at {self.settings.rate:g}/s "
+                f"({len(self._queue)} pending)"
+            )
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(
+                    target=self._launch_loop, name="StartupRamp", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def cancel(self, runner: TaskRunner) -> bool:
+        """
+        Drop a runner that was not started yet.
+
+        When the launcher thread is starting that runner, waits until
+        ``start`` returned, so a stop issued right after cancel never races
+        with the launch.
+
+        :return: True when the runner was still waiting in the queue
+        """
+        with self._cond:
+            if threading.current_thread() is not self._thread:
+                while self._launching is runner:
+                    self._cond.wait()
+            try:
+                self._queue.remove(runner)
+            except ValueError:
+                return False
+            self._total -= 1
+            self._cond.notify_all()
+            return True
+
+    def progress(self) -> Dict[str, object]:
+        """Snapshot of the ramp progress for the dashboard."""
+        with self._cond:
+            return {
+                "active": bool(self._queue),
+                "total": self._total,
+                "started": self._started,
+                "pending": len(self._queue),
+                "rate": self.settings.rate,
+            }
+
+    def stop(self):
+        """Drop pending runners and stop the launcher thread."""
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._cond.notify_all()
+            thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def _launch_loop(self):
+        next_launch = time.monotonic()
+        while True:
+            with self._cond:
+                if self._stopped or not self._queue:
+                    return
+                delay = next_launch - time.monotonic()
+                if delay > 0:
+                    # Woken early by cancel, stop or new settings
+                    self._cond.wait(delay)
+                    continue
+                runner = self._queue.popleft()
+                self._launching = runner
+
+            try:
+                runner.start()
+            except Exception as e:
+                self._log(f"ERROR: Failed to start task '{runner.config.name}': {e}")
+
+            with self._cond:
+                self._launching = None
+                self._cond.notify_all()
+                self._started += 1
+                rate = self.settings.rate
+                self._report_progress()
+            # Never burst to catch up after a slow start
+            next_launch = max(next_launch, time.monotonic()) + (1 / rate if rate > 0 else 0)
+
+    def _report_progress(self):
+        """Log every 10% and on completion, caller holds the lock."""
+        if self._queue:
+            if self._started < self._next_report:
+                return
+            self._log(f"Startup ramp: {self._started}/{self._total} tasks started")
+            self._next_report = self._started + max(1, self._total // 10)
+            return
+
+        elapsed = time.monotonic() - self._began_at
+        self._log(f"Startup ramp complete: {self._started} task(s) started in {elapsed:.1f}s")
@@ -1,18 +1,21 @@
+import dataclasses
+import random
 import subprocess
 import threading
 import time
 import os
 import signal
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Callable, Deque, List, Optional
 from bansuri.base.config_manager import BansuriConfig, ScriptConfig
+from bansuri.base.config_diff import NOTIFY_FIELDS
+from bansuri.base.logger import DEBUG, ERROR, INFO, WARNING, Logger, default_logger
 from bansuri.alerts.notifier import FailureInfo, Notifier
 from bansuri.alerts.cmd_notifier import CommandNotifier
-
-try:
-    import psutil  # type: ignore[import-untyped]
-except ImportError:
-    psutil = None
+from bansuri.alerts.dispatcher import NotificationDispatcher, default_dispatcher
+from bansuri.alerts.timer import Timer
+from bansuri.base.misc.lazy import optional_import
 
 
 class TaskRunner:
@@ -21,6 +24,9 @@ class TaskRunner:
     It handles process execution, log redirection, and other policies.
     """
 
+    # Seconds a resource sample is shared between the dashboard views
+    usage_interval = 1.0
+
     def __init__(self, config: ScriptConfig, bansuri_config: BansuriConfig):
         """
         TaskRunner initializer
@@ -39,9 +45,23 @@ class TaskRunner:
         self.successful_times = 0
         self.failed_attempts = 0
         self.watchdog_timeout = 120  # seconds to wait before force killing
+        self.logger: Logger = default_logger()
         self.notifier: Optional[Notifier] = self._create_notifier()
+        # Delivers notifications off the runner thread
+        self.dispatcher: NotificationDispatcher = default_dispatcher()
+        # Notification waiting for notify_after, on the dispatcher timer heap
+        self._alert_lock = threading.Lock()
+        self._alert_timer: Optional[Timer] = None
+        self._alert_failure: Optional[FailureInfo] = None
+        # Restart backoff and flap detection of the simple loop
+        self._restart_streak = 0  # failures since the last healthy run, the backoff exponent
+        self._restart_times: Deque[float] = deque()  # monotonic restart times within the flap window
+        self._run_started = 0.0
         self._psutil_proc = None
         self._children_cache: dict[int, Any] = {}  # cache for children procs
+        self._usage_lock = threading.Lock()
+        self._usage: Optional[dict] = None
+        self._usage_at = 0.0
         self._last_stdout = ""
         self._last_stderr = ""
         self._last_return_code: Optional[int] = None
@@ -49,11 +69,26 @@ class TaskRunner:
         self._status = "STOPPED"
         self._last_run: Optional[datetime] = None
         self._next_run: Optional[datetime] = None
+        # Called with the runner after its status or configuration changed
+        self.on_state_change: Optional[Callable[["TaskRunner"], None]] = None
 
     @property
     def status(self):
         return self._status
 
+    def _set_status(self, status: str):
+        self._status = status
+        self._state_changed()
+
+    def _state_changed(self):
+        listener = self.on_state_change
+        if listener is None:
+            return
+        try:
+            listener(self)
+        except Exception as e:
+            self.log(f"WARNING: State change listener failed: {e}", WARNING)
+
     @property
     def last_run(self):
         return self._last_run
@@ -71,6 +106,20 @@ class TaskRunner:
     def attempts(self, value):
         self.times = value
 
+    @property
+    def is_service(self) -> bool:
+        """True for unscheduled tasks restarted on failure, i.e. long-running services."""
+        return (
+            not self.config.schedule_cron
+            and not self._has_timer_schedule()
+            and self.config.on_fail.lower() == "restart"
+        )
+
+    def mark_queued(self):
+        """Flag a runner waiting for its turn in the startup ramp."""
+        if not (self.thread and self.thread.is_alive()):
+            self._set_status("QUEUED")
+
     def _has_timer_schedule(self) -> bool:
         """Return True when timer mode should be used."""
         return bool(self.config.timer and str(self.config.timer).lower() not in {"none", "0"})
@@ -86,8 +135,9 @@ class TaskRunner:
     def _begin_execution(self):
         """Record the start of a new execution."""
         self.times += 1
-        self._status = "EXECUTING"
         self._last_run = datetime.now()
+        self._run_started = time.monotonic()
+        self._set_status("EXECUTING")
 
     def _process_failed(self) -> bool:
         """Return True when the latest process finished with a failure code."""
@@ -105,6 +155,7 @@ class TaskRunner:
         """Track a successful execution."""
         self.successful_times += 1
         self.failed_attempts = 0
+        self._cancel_delayed_notification()
 
     def _finalize_single_execution(self):
         """Finalize a one-shot execution without scheduling another run."""
@@ -113,36 +164,89 @@ class TaskRunner:
 
         if self._process_failed():
             self._record_failed_execution()
-            self._status = "FAILED"
+            self._set_status("FAILED")
             return
 
         self._record_successful_execution()
-        self._status = "COMPLETED"
+        self._set_status("COMPLETED")
 
     def _mark_simple_execution_success(self):
         """Finalize a successful simple execution."""
         self._record_successful_execution()
         self.log("Task completed successfully.")
-        self._status = "COMPLETED"
+        self._set_status("COMPLETED")
+
+    def _restart_backoff(self) -> float:
+        """Seconds to wait before the next restart.
+
+        With ``restart_scheduling`` ``none`` the delay is always
+        ``restart_delay``. ``dynamic-linear`` adds ``restart_step`` seconds
+        (``restart_delay`` by default) after each failure, ``dynamic``
+        multiplies it by ``restart_step`` (2 by default). A growing delay
+        stops at ``restart_max_delay``, and a run lasting longer than that
+        resets it. ``restart_jitter`` spreads out the restarts of tasks that
+        crashed together.
+        """
+        base = self._parse_timeout(self.config.restart_delay or "5s") or 5
+        cap = max(base, self._parse_timeout(self.config.restart_max_delay) or 300)
+        if time.monotonic() - self._run_started >= cap:
+            self._restart_streak = 0
+
+        scheduling = self.config.restart_scheduling
+        step = self.config.restart_step
+        if scheduling == "dynamic-linear":
+            delay = base + (step or base) * self._restart_streak
+        elif scheduling == "dynamic":
+            # The exponent is bounded, the cap is reached long before
+            delay = base * (step or 2) ** min(self._restart_streak, 64)
+        else:
+            delay = base
+        self._restart_streak += 1
+        jitter = self.config.restart_jitter
+        if jitter:
+            delay *= random.uniform(1 - jitter, 1 + jitter)
+        return min(cap, delay)
+
+    def _is_flapping(self) -> bool:
+        """Record a restart, True when there were more than the flap limit in the window."""
+        now = time.monotonic()
+        window = self._parse_timeout(self.config.restart_flap_window) or 60
+        restarts = self._restart_times
+        restarts.append(now)
+        while restarts and now - restarts[0] > window:
+            restarts.popleft()
+        limit = self.config.restart_flap_limit
+        return bool(limit) and len(restarts) > limit
 
     def _wait_for_restart_delay(self) -> bool:
-        """Wait before retrying a failed execution."""
-        restart_delay = self.config.restart_delay or "5s"
-        restart_delay_seconds = self._parse_timeout(restart_delay) or 5
-        self.log(f"Restarting in {restart_delay}...")
-        self._status = "WAITING_RETRY"
-        return self.stop_event.wait(timeout=restart_delay_seconds)
+        """Wait before retrying a failed execution, cooling down a flapping task."""
+        if self._is_flapping():
+            cooldown = self._parse_timeout(self.config.restart_cooldown) or 300
+            self.log(
+                f"Restarted {len(self._restart_times)} times within {self.config.restart_flap_window}. "
+                f"Cooling down for {cooldown:g}s..."
+            )
+            self._restart_times.clear()
+            self._next_run = datetime.now() + timedelta(seconds=cooldown)
+            self._set_status("COOLDOWN")
+            return self.stop_event.wait(timeout=cooldown)
+
+        delay = self._restart_backoff()
+        self.log(f"Restarting in {delay:.1f}s...")
+        self._next_run = datetime.now() + timedelta(seconds=delay)
+        self._set_status("WAITING_RETRY")
+        return self.stop_event.wait(timeout=delay)
 
     def _handle_simple_failure(self) -> bool:
         """Handle failure policy for the simple execution loop."""
         self._record_failed_execution()
 
         if self.config.on_fail.lower() == "ignore":
-            self._status = "COMPLETED"
+            self._set_status("COMPLETED")
             return True
 
         if self._handle_on_fail():
-            self._status = "FAILED"
+            self._set_status("FAILED")
             return True
 
         return self._wait_for_restart_delay()
@@ -151,17 +255,34 @@ class TaskRunner:
         """Handle failure policy for timer and cron loops."""
         self._record_failed_execution()
         if self._handle_on_fail():
-            self._status = "FAILED"
+            self._set_status("FAILED")
             return True
         return False
 
     def get_resource_usage(self):
-        """Returns resource stats from psutil cache"""
+        """
+        Returns resource stats from psutil cache.
+
+        The status, events, history and sorted queries of the dashboard all
+        read the task usage on their own schedule. The processes are sampled
+        at most once per ``usage_interval`` and the others get the same
+        sample, so that each ``cpu_percent`` measures a full interval
+        instead of the time since another view sampled it.
+        """
+        with self._usage_lock:
+            now = time.monotonic()
+            if self._usage is None or now - self._usage_at >= self.usage_interval:
+                self._usage = self._sample_resource_usage()
+                self._usage_at = now
+            return dict(self._usage)
+
+    def _sample_resource_usage(self):
         if not self.process or self.process.poll() is not None:
             self._psutil_proc = None
             self._children_cache = {}
             return {"cpu": 0.0, "memory": 0}
 
+        psutil = optional_import("psutil")
         if psutil is None:
             return {"cpu": 0.0, "memory": 0}
 
@@ -209,13 +330,9 @@ class TaskRunner:
                 self.log(f"Resource stats error: {e}")
             return {"cpu": 0.0, "memory": 0}
 
-    def log(self, message: str):
-        """Fallback formatted log output"""
-        # print(self.config)
-        print(
-            f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [{self.config.name}] {message}",
-            flush=True,
-        )
+    def log(self, message: str, level: int = INFO):
+        """Queue a log line tagged with the task name"""
+        self.logger.log(level, self.config.name, message)
 
     def start(self):
         """Starts the control thread if it is stopped"""
@@ -226,18 +343,44 @@ class TaskRunner:
         self.times = 0
         self.successful_times = 0
         self.failed_attempts = 0
+        self._restart_streak = 0
+        self._restart_times.clear()
         self.thread = threading.Thread(
             target=self._execution_loop, name=f"Runner-{self.config.name}", daemon=False
         )
-        self._status = "STARTING"
+        self._set_status("STARTING")
         self.thread.start()
         self.log("Runner started.")
 
+    def apply_config(
+        self, config: ScriptConfig, bansuri_config: BansuriConfig, changed_fields: List[str]
+    ):
+        """Hot-apply a configuration whose changes do not require a restart.
+
+        Every setting is read from ``self.config`` when it is needed, so the
+        new values take effect on the next run, retry or timer cycle.
+
+        :param config: The new task configuration
+        :param bansuri_config: The new global configuration
+        :param changed_fields: Task fields that differ from the current config
+        """
+        global_notify_changed = bansuri_config.notify_command != self.bansuri_config.notify_command
+        self.config = config
+        self.bansuri_config = bansuri_config
+
+        if global_notify_changed or NOTIFY_FIELDS.intersection(changed_fields):
+            self.notifier = self._create_notifier()
+
+        if changed_fields:
+            self.log(f"Hot-applied configuration changes: {', '.join(changed_fields)}")
+            self._state_changed()
+
     def stop(self) -> bool:
         """Stop the runner and report whether the worker thread fully exited."""
         self.log("Stopping task...")
-        self._status = "STOPPING"
+        self._set_status("STOPPING")
         self.stop_event.set()
+        self._cancel_delayed_notification("Task stopped")
         self._kill_process()
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=5)
@@ -245,7 +388,7 @@ class TaskRunner:
             self.log("Task is still stopping after 5 seconds.")
             return False
         self.log("Task stopped!")
-        self._status = "STOPPED"
+        self._set_status("STOPPED")
         return True
 
     def _execution_loop(self):
@@ -259,7 +402,7 @@ class TaskRunner:
             execution_loop()
         finally:
             if self._status not in ["FAILED", "COMPLETED"]:
-                self._status = "STOPPED"
+                self._set_status("STOPPED")
 
     def _check_max_executions(self) -> bool:
         """Checks if max successful executions reached. Returns True if should stop.
@@ -285,13 +428,31 @@ class TaskRunner:
         if self.failed_attempts < self.config.max_attempts:
             return False
 
-        self._status = "FAILED"
+        self._set_status("FAILED")
         self.log(f"Reached max attempts ({self.config.max_attempts}). Giving up...")
         return True
 
     def _create_notifier(self) -> Optional[Notifier]:
         """Create the appropriate notifier based on config."""
         notify_kind = self.config.notify.lower()
+        if notify_kind == "webhook":
+            # http.client and ssl are only loaded by tasks posting to a webhook
+            from bansuri.alerts.webhook_notifier import WebhookNotifier
+
+            try:
+                return WebhookNotifier.from_options(self.config.notify_options)
+            except (TypeError, ValueError) as e:
+                self.log(f"Invalid webhook notification settings: {e}. Notifications disabled.", WARNING)
+                return None
+        if notify_kind == "mail" and self.config.notify_options:
+            # smtplib, ssl and email are only loaded by tasks notifying by mail
+            from bansuri.alerts.mail_notifier import MailNotifier
+
+            try:
+                return MailNotifier.from_options(self.config.notify_options)
+            except (TypeError, ValueError) as e:
+                self.log(f"Invalid mail notification settings: {e}. Notifications disabled.", WARNING)
+                return None
         if notify_kind not in ["mail", "command"]:
             return None
 
@@ -325,11 +486,82 @@ class TaskRunner:
             stderr=error,
         )
 
-        self.log("Sending notification...")
-        if self.notifier.notify(failure_info):
+        # A task that gave up cannot recover, its notification is not delayed
+        delay = 0
+        if self.config.notify_mode.lower() != "on-exhausted":
+            delay = self._parse_timeout(self.config.notify_after) or 0
+        if delay > 0 and self._delay_notification(failure_info, delay):
+            return
+        self._submit_notification(failure_info)
+
+    def _submit_notification(self, failure_info: FailureInfo):
+        self.log("Queueing notification...", DEBUG)
+        if not self.dispatcher.submit(self.notifier, failure_info, self._notification_done):
+            self.log("WARNING: Notification queue is full, notification dropped", WARNING)
+
+    def _delay_notification(self, failure_info: FailureInfo, delay: float) -> bool:
+        """
+        Hold a notification for ``delay`` seconds, it is cancelled if the task recovers meanwhile.
+
+        Failures during the delay are merged into the pending notification.
+
+        :return: False when the timer heap is closed
+        """
+        with self._alert_lock:
+            if self._alert_timer is not None:
+                self._alert_failure = dataclasses.replace(
+                    failure_info, occurrences=self._alert_failure.occurrences + 1
+                )
+                return True
+            try:
+                self._alert_timer = self.dispatcher.timers.schedule(
+                    delay, self._fire_delayed_notification
+                )
+            except RuntimeError:
+                return False
+            self._alert_failure = failure_info
+        self.log(f"Notification delayed by {self.config.notify_after}")
+        return True
+
+    def _fire_delayed_notification(self):
+        """
+        Send the delayed notification, called on the timer heap thread.
+
+        Other tasks recover with a successful run, which cancels the timer. A
+        service recovers once it restarted and kept running for the whole
+        delay without failing again.
+        """
+        with self._alert_lock:
+            failure_info = self._alert_failure
+            self._alert_timer = None
+            self._alert_failure = None
+        if failure_info is None:
+            return
+
+        if (
+            failure_info.occurrences == 1
+            and self.is_service
+            and self.status in ("STARTING", "RUNNING", "EXECUTING")
+        ):
+            self.log("Task recovered, notification cancelled")
+            return
+        self._submit_notification(failure_info)
+
+    def _cancel_delayed_notification(self, reason: str = "Task recovered"):
+        with self._alert_lock:
+            timer = self._alert_timer
+            self._alert_timer = None
+            self._alert_failure = None
+        if timer is not None:
+            timer.cancel()
+            self.log(f"{reason}, notification cancelled")
+
+    def _notification_done(self, delivered: bool):
+        """Report the delivery of a notification, called from a dispatcher worker"""
+        if delivered:
             self.log("Notification sent successfully")
         else:
-            self.log("Failed to send notification")
+            self.log("Failed to send notification", WARNING)
 
     def _maybe_notify_failure(self):
         """Send a failure notification only when the configured mode allows it."""
@@ -379,7 +611,7 @@ class TaskRunner:
 
     def _simple_execution_loop(self):
         """Simple execution loop without timer"""
-        self._status = "RUNNING"
+        self._set_status("RUNNING")
         while not self.stop_event.is_set():
             if self._check_max_executions():
                 break
@@ -403,7 +635,7 @@ class TaskRunner:
         timer_seconds = self._parse_timeout(self.config.timer)
 
         if not timer_seconds:
-            self.log(f"ERROR: Invalid timer format '{self.config.timer}'. Running once.")
+            self.log(f"ERROR: Invalid timer format '{self.config.timer}'. Running once.", ERROR)
             self._begin_execution()
             self._run_process()
             self._finalize_single_execution()
@@ -411,7 +643,7 @@ class TaskRunner:
 
         self.log(f"Timer configured: running every {self.config.timer} ({timer_seconds}s)")
 
-        self._status = "RUNNING"
+        self._set_status("RUNNING")
         while not self.stop_event.is_set():
             if self._check_max_executions():
                 break
@@ -428,9 +660,11 @@ class TaskRunner:
             if self.stop_event.is_set():
                 break
 
+            # The period may have been hot-applied since the previous cycle
+            timer_seconds = self._parse_timeout(self.config.timer) or timer_seconds
             self.log(f"Waiting {self.config.timer} until next execution...")
-            self._status = "WAITING"
             self._next_run = datetime.now() + timedelta(seconds=timer_seconds)
+            self._set_status("WAITING")
             if self.stop_event.wait(timeout=timer_seconds):
                 break
 
@@ -439,16 +673,16 @@ class TaskRunner:
         try:
             from croniter import croniter  # type: ignore[import-untyped]
         except ImportError:
-            self.log("ERROR: 'croniter' library is missing")
+            self.log("ERROR: 'croniter' library is missing", ERROR)
             return
 
         if not self.config.schedule_cron or not croniter.is_valid(self.config.schedule_cron):
-            self.log(f"ERROR: Invalid cron expression '{self.config.schedule_cron}'")
+            self.log(f"ERROR: Invalid cron expression '{self.config.schedule_cron}'", ERROR)
             return
 
         self.log(f"Cron configured: '{self.config.schedule_cron}'")
 
-        self._status = "RUNNING"
+        self._set_status("RUNNING")
         while not self.stop_event.is_set():
             if self._check_max_executions():
                 break
@@ -463,7 +697,7 @@ class TaskRunner:
                 self.log(
                     f"Next execution at {next_run.strftime('%Y-%m-%d %H:%M:%S')} (in {int(delay)}s)"
                 )
-                self._status = "WAITING"
+                self._set_status("WAITING")
                 if self.stop_event.wait(timeout=delay):
                     break
 
@@ -498,13 +732,14 @@ class TaskRunner:
         """Open and announce a redirected log file."""
         resolved_path = self._resolve_log_path(path, cwd)
         log_file = open(resolved_path, "a")
-        self.log(f"Redirecting {stream_name} to {resolved_path}")
+        if self.logger.enabled_for(DEBUG):
+            self.log(f"Redirecting {stream_name} to {resolved_path}", DEBUG)
         return log_file
 
     def _configure_stdout_destination(self, cwd: Optional[str]):
         """Return the destination and file handle for stdout."""
         if self.config.stdout == "ignore":
-            self.log("Ignoring stdout")
+            self.log("Ignoring stdout", DEBUG)
             return subprocess.DEVNULL, None
 
         if not self.config.stdout:
@@ -516,11 +751,11 @@ class TaskRunner:
     def _configure_stderr_destination(self, cwd: Optional[str]):
         """Return the destination and file handle for stderr."""
         if self.config.stderr == "ignore":
-            self.log("Ignoring stderr")
+            self.log("Ignoring stderr", DEBUG)
             return subprocess.DEVNULL, None
 
         if self.config.stderr in ["combined", "$$combined"]:
-            self.log("Redirecting stderr to stdout")
+            self.log("Redirecting stderr to stdout", DEBUG)
             return subprocess.STDOUT, None
 
         if not self.config.stderr:
@@ -603,7 +838,9 @@ class TaskRunner:
             stdout_dest, stdout_f = self._configure_stdout_destination(cwd)
             stderr_dest, stderr_f = self._configure_stderr_destination(cwd)
 
-            self.log(f"Executing shell command: {cmd}")
+            # Per-run details, not even formatted unless debug logging is on
+            if self.logger.enabled_for(DEBUG):
+                self.log(f"Executing shell command: {cmd}", DEBUG)
 
             self.process = subprocess.Popen(
                 cmd,
@@ -620,7 +857,7 @@ class TaskRunner:
 
         except Exception as e:
             error_message = f"Critical error executing shell command: {e}"
-            self.log(error_message)
+            self.log(error_message, ERROR)
             self._last_return_code = -1
             self._last_stderr = error_message
             self._ensure_process_stopped()
@@ -675,5 +912,5 @@ class TaskRunner:
             if unit == "d":
                 return value * 86400
         except (ValueError, IndexError):
-            self.log(f"Warning: Invalid timeout format '{timeout_str}'. Ignoring.")
+            self.log(f"Warning: Invalid timeout format '{timeout_str}'. Ignoring.", WARNING)
         return None
@@ -0,0 +1,50 @@
+"""Synthetic configuration generators shared by the benchmarks."""
+
+import json
+from typing import List
+
+
+def synthetic_task(index: int) -> dict:
+    return {
+        "general": {
+            "name": f"task-{index:05d}",
+            "command": f"/opt/jobs/run.sh --shard {index} --url http://svc-{index % 50}/api",
+            "description": f"Synthetic task number {index}",
+            "working-directory": f"/srv/jobs/{index % 100}",
+        },
+        "scheduling": {"scheduler": "timer", "params": f"{1 + index % 59}m", "timeout": "5m"},
+        "failure-control": {
+            "on-fail": "restart",
+            "max-attempts": 3,
+            "restart-params": {"after": "10s"},
+        },
+        "logging": {"stdout": f"logs/task-{index:05d}.log", "stderr": "$$combined"},
+    }
+
+
+def synthetic_config(task_count: int, comments: bool = True, trailing_commas: bool = True) -> str:
+    """Build a config with ``task_count`` grouped tasks.
+
+    ``comments`` precedes every task with line and block comments and
+    ``trailing_commas`` leaves a comma after the last member of objects and
+    arrays, as hand-edited and generated JSONC files usually do.
+    """
+    tail = "," if trailing_commas else ""
+    parts: List[str] = ["{"]
+    if comments:
+        parts.append("  // Generated by the benchmark suite")
+    parts.append('  "version": "1.0",')
+    parts.append(f'  "defaults": {{"logging": {{"stderr": "$$combined"}}{tail}}},')
+    parts.append('  "scripts": [')
+    for index in range(task_count):
+        body = json.dumps(synthetic_task(index), indent=2)
+        if trailing_commas:
+            body = body[: body.rindex("}")].rstrip() + ",\n}"
+        if comments:
+            parts.append(f"    // task {index}")
+            parts.append(f"    /* owner: team-{index % 20}\n       generated entry */")
+        last = index == task_count - 1
+        parts.append(body + ("" if last and not trailing_commas else ","))
+    parts.append(f"  ]{tail}")
+    parts.append("}")
+    return "\n".join(parts)
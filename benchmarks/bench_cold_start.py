@@ -0,0 +1,73 @@
+"""
+Cold-start benchmark for large configs with and without the compiled cache.
+
+Every measurement runs in a fresh interpreter and times importing the
+loader plus loading a synthetic config of ``--tasks`` grouped tasks.
+
+Usage::
+
+    python -m benchmarks.bench_cold_start [--tasks 20000] [--repeat 3]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks._synthetic import synthetic_config
+
+_SNIPPET = """
+import time
+start = time.perf_counter()
+from bansuri.base.config_loader import ConfigLoader
+loader = ConfigLoader({config!r}, cache_path={cache!r})
+config = loader.load()
+elapsed = time.perf_counter() - start
+assert len(config.scripts) == {tasks}
+print(f"{{elapsed:.6f}} {{int(loader.cache_hit)}}")
+"""
+
+
+def _run(config_path: str, cache_path, tasks: int):
+    code = _SNIPPET.format(config=config_path, cache=cache_path, tasks=tasks)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    elapsed, hit = result.stdout.strip().splitlines()[-1].split()
+    return float(elapsed), hit == "1"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "scripts.jsonc")
+        cache_path = os.path.join(tmp, "scripts.cache")
+        with open(config_path, "w", encoding="utf-8") as f:
+            f.write(synthetic_config(args.tasks))
+
+        without_cache = min(_run(config_path, None, args.tasks)[0] for _ in range(args.repeat))
+
+        # Populate the snapshot, then measure hits
+        _run(config_path, cache_path, args.tasks)
+        hits = [_run(config_path, cache_path, args.tasks) for _ in range(args.repeat)]
+        assert all(hit for _, hit in hits), "compiled cache was not used"
+        with_cache = min(elapsed for elapsed, _ in hits)
+
+    print(f"{args.tasks} tasks, best of {args.repeat} fresh interpreters")
+    print(f"  full parse:     {without_cache * 1000:8.1f}ms")
+    print(f"  compiled cache: {with_cache * 1000:8.1f}ms ({without_cache / with_cache:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+JSONC preprocessing benchmark on large synthetic configs.
+
+Compares the previous character-by-character comment stripper, which ran
+over the whole text after a failed ``json.loads``, with the single regex
+pass used by ``BansuriConfig``, which only preprocesses the text from the
+first JSONC token on.
+
+Usage::
+
+    python -m benchmarks.bench_config_parse [--tasks 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+
+from bansuri.base.config_manager import BansuriConfig
+from benchmarks._synthetic import synthetic_config
+
+
+def legacy_strip_json_comments(text: str) -> str:
+    """Character-by-character stripper kept for comparison."""
+    result = []
+    in_string = False
+    escaped = False
+    in_line_comment = False
+    in_block_comment = False
+    index = 0
+
+    while index < len(text):
+        char = text[index]
+        next_char = text[index + 1] if index + 1 < len(text) else ""
+
+        if in_line_comment:
+            if char == "\n":
+                in_line_comment = False
+                result.append(char)
+            index += 1
+            continue
+
+        if in_block_comment:
+            if char == "*" and next_char == "/":
+                in_block_comment = False
+                index += 2
+                continue
+            if char == "\n":
+                result.append(char)
+            index += 1
+            continue
+
+        if in_string:
+            result.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            index += 1
+            continue
+
+        if char == '"':
+            in_string = True
+            result.append(char)
+            index += 1
+            continue
+
+        if char == "/" and next_char == "/":
+            in_line_comment = True
+            index += 2
+            continue
+
+        if char == "/" and next_char == "*":
+            in_block_comment = True
+            index += 2
+            continue
+
+        result.append(char)
+        index += 1
+
+    return "".join(result)
+
+
+def legacy_parse(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(legacy_strip_json_comments(text))
+
+
+def current_parse(text: str):
+    return BansuriConfig._loads_jsonc(text)
+
+
+def _best_of(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    plain = synthetic_config(args.tasks, comments=False, trailing_commas=False)
+    # The legacy stripper does not understand trailing commas
+    commented = synthetic_config(args.tasks, comments=True, trailing_commas=False)
+    jsonc = synthetic_config(args.tasks, comments=True, trailing_commas=True)
+
+    assert current_parse(plain) == legacy_parse(plain)
+    assert current_parse(commented) == legacy_parse(commented)
+    assert current_parse(jsonc) == current_parse(plain)
+
+    print(f"{args.tasks} tasks, best of {args.repeat}")
+    print(f"{'input':<28}{'size':>10}{'before':>12}{'after':>12}{'speedup':>10}")
+    rows = [
+        ("plain JSON", plain, legacy_parse),
+        ("JSON with comments", commented, legacy_parse),
+        ("comments + trailing commas", jsonc, None),
+    ]
+    for label, text, legacy in rows:
+        after = _best_of(current_parse, text, args.repeat)
+        size = f"{len(text) / 1024 / 1024:.1f}MB"
+        if legacy is None:
+            print(f"{label:<28}{size:>10}{'n/a':>12}{after * 1000:>10.1f}ms{'':>10}")
+            continue
+        before = _best_of(legacy, text, args.repeat)
+        print(
+            f"{label:<28}{size:>10}{before * 1000:>10.1f}ms{after * 1000:>10.1f}ms"
+            f"{before / after:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Startup benchmark for the ``bansuri`` entry point.
+
+Runs ``python -X importtime -c "import bansuri.master"`` in fresh
+interpreters, reports the cumulative import time of ``bansuri.master`` and
+the slowest imported modules, and fails when the best run exceeds the
+budget. Modules that must stay lazy (dashboard, HTTP and SMTP clients,
+ssl, psutil, croniter) are checked as well.
+
+Usage::
+
+    python -m benchmarks.bench_startup [--repeat 5] [--budget-ms 150] [--top 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Imported on demand only, never by the entry point itself
+LAZY_MODULES = (
+    "http.server",
+    "http.client",
+    "smtplib",
+    "ssl",
+    "email",
+    "bansuri.server.dashboard",
+    "psutil",
+    "croniter",
+)
+
+_ENTRY_POINT = "bansuri.master"
+
+
+def _import_times() -> Tuple[Dict[str, int], List[str]]:
+    """Return the cumulative import time of every module in microseconds, and the loaded modules."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    code = f"import sys, {_ENTRY_POINT}; print('\\n'.join(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+
+    cumulative: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumul, name = line.split(":", 1)[1].split("|")
+        cumulative[name.strip()] = int(cumul)
+    return cumulative, result.stdout.split()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    runs = [_import_times() for _ in range(args.repeat)]
+    best_times, modules = min(runs, key=lambda run: run[0].get(_ENTRY_POINT, 0))
+    best_ms = best_times.get(_ENTRY_POINT, 0) / 1000
+
+    print(f"import {_ENTRY_POINT}: {best_ms:.1f}ms (best of {args.repeat}, budget {args.budget_ms:.0f}ms)")
+    slowest = sorted(best_times.items(), key=lambda item: item[1], reverse=True)
+    for name, micros in slowest[1 : args.top + 1]:
+        print(f"  {micros / 1000:8.1f}ms  {name}")
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        failures.append(f"modules imported eagerly: {', '.join(eager)}")
+    if best_ms > args.budget_ms:
+        failures.append(f"startup over budget: {best_ms:.1f}ms > {args.budget_ms:.0f}ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
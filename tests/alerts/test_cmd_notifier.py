@@ -1,3 +1,4 @@
+import dataclasses
 import subprocess
 from unittest.mock import MagicMock, patch
 
@@ -60,3 +61,19 @@ def test_notify_returns_false_when_subprocess_raises(mock_run, failure_info, sid
     notifier = CommandNotifier("send-alert")
 
     assert notifier.notify(failure_info) is False
+
+
+@patch("bansuri.alerts.cmd_notifier.subprocess.run")
+def test_notify_batch_runs_the_command_once_with_a_digest(mock_run, failure_info):
+    mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+    notifier = CommandNotifier("send-alert")
+    other = dataclasses.replace(failure_info, task_name="other-task", occurrences=3)
+
+    assert notifier.notify_batch([failure_info, other]) == []
+
+    mock_run.assert_called_once()
+    message = mock_run.call_args.kwargs["input"]
+    assert "Tasks other-task, test-task have failed." in message
+    assert "Occurrences:       3" in message
+    assert "  error line" in message
+    assert notifier.destination == CommandNotifier("send-alert").destination
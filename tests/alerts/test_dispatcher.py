@@ -0,0 +1,250 @@
+import dataclasses
+import threading
+import time
+
+from bansuri.alerts.dispatcher import NotificationDispatcher
+from bansuri.alerts.notifier import Notifier
+from bansuri.alerts.timer import TimerHeap
+from bansuri.base.config_manager import NotificationsConfig
+
+# Every notification delivered on its own
+UNCOALESCED = NotificationsConfig(window=0, rate_limit=0)
+
+
+class FlakyNotifier(Notifier):
+    retry_backoff = 0.01
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    def notify(self, failure_info):
+        self.calls.append(time.monotonic())
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_failed_deliveries_are_retried_with_backoff(failure_info):
+    notifier = FlakyNotifier([False, RuntimeError("boom"), True])
+    results = []
+    dispatcher = NotificationDispatcher()
+    try:
+        assert dispatcher.submit(notifier, failure_info, results.append)
+        assert dispatcher.flush(timeout=5)
+    finally:
+        dispatcher.close()
+
+    assert results == [True]
+    assert len(notifier.calls) == 3
+    # The backoff doubles between attempts
+    assert notifier.calls[2] - notifier.calls[1] >= 0.02
+    metrics = dispatcher.metrics()
+    assert metrics["delivered"] == 1
+    assert metrics["retried"] == 2
+    assert metrics["failed"] == 0
+
+
+def test_delivery_fails_once_retries_are_exhausted(failure_info):
+    notifier = FlakyNotifier([False] * 3)
+    results = []
+    dispatcher = NotificationDispatcher()
+    try:
+        dispatcher.submit(notifier, failure_info, results.append)
+        assert dispatcher.flush(timeout=5)
+    finally:
+        dispatcher.close()
+
+    assert results == [False]
+    assert dispatcher.metrics()["failed"] == 1
+
+
+def test_workers_deliver_concurrently(failure_info):
+    barrier = threading.Barrier(3, timeout=5)
+
+    class BlockingNotifier(Notifier):
+        def notify(self, failure_info):
+            barrier.wait()
+            return True
+
+    dispatcher = NotificationDispatcher(workers=3)
+    try:
+        for _ in range(3):
+            dispatcher.submit(BlockingNotifier(), failure_info)
+        assert dispatcher.flush(timeout=5)
+    finally:
+        dispatcher.close()
+    assert dispatcher.metrics()["delivered"] == 3
+
+
+def test_slow_deliveries_are_counted_as_delayed(failure_info):
+    dispatcher = NotificationDispatcher(workers=1, delay_threshold=0.05, settings=UNCOALESCED)
+    notifier = FlakyNotifier([True, True])
+    notifier.notify = lambda info: time.sleep(0.1) or True
+    try:
+        dispatcher.submit(notifier, failure_info)
+        dispatcher.submit(notifier, failure_info)
+        assert dispatcher.flush(timeout=5)
+    finally:
+        dispatcher.close()
+    metrics = dispatcher.metrics()
+    assert metrics["delayed"] == 2
+    assert metrics["max_latency"] >= 0.15
+
+
+def test_closed_dispatcher_drops_notifications(failure_info):
+    dispatcher = NotificationDispatcher()
+    assert dispatcher.close()
+    assert not dispatcher.submit(FlakyNotifier([True]), failure_info)
+    assert dispatcher.metrics()["dropped"] == 1
+
+
+def test_timer_heap_runs_callbacks_in_due_order():
+    fired = []
+    done = threading.Event()
+    timers = TimerHeap()
+    try:
+        timers.schedule(0.06, lambda: (fired.append("late"), done.set()))
+        timers.schedule(0.02, fired.append, "early")
+        timers.schedule(0.04, fired.append, "cancelled").cancel()
+        assert done.wait(5)
+    finally:
+        timers.close()
+    assert fired == ["early", "late"]
+    assert len(timers) == 0
+
+
+class RecordingNotifier(Notifier):
+    destination = "ops"
+
+    def __init__(self):
+        self.sent = []
+
+    def notify(self, failure_info):
+        self.sent.append([failure_info])
+        return True
+
+    def notify_batch(self, failures):
+        self.sent.append(list(failures))
+        return []
+
+
+def make_failure(failure_info, task, return_code=1):
+    return dataclasses.replace(failure_info, task_name=task, return_code=return_code)
+
+
+def test_failures_within_a_window_are_sent_as_one_digest(failure_info):
+    notifier = RecordingNotifier()
+    results = []
+    dispatcher = NotificationDispatcher(settings=NotificationsConfig(window=0.1, rate_limit=0))
+    try:
+        for task in ["a", "b", "a", "c", "a"]:
+            dispatcher.submit(notifier, make_failure(failure_info, task), results.append)
+        assert dispatcher.flush(timeout=5)
+    finally:
+        dispatcher.close()
+
+    # The first failure goes out at once, the others wait for the window
+    assert [[f.task_name for f in batch] for batch in notifier.sent] == [["a"], ["b", "a", "c"]]
+    assert notifier.sent[1][1].occurrences == 2
+    assert results == [True] * 5
+    metrics = dispatcher.metrics()
+    assert metrics["coalesced"] == 1
+    assert metrics["digests"] == 1
+    assert metrics["delivered"] == 2
+
+
+def test_different_return_codes_are_not_merged(failure_info):
+    notifier = RecordingNotifier()
+    dispatcher = NotificationDispatcher(
+        settings=NotificationsConfig(window=0.05, digest=False, rate_limit=0)
+    )
+    try:
+        for return_code in [1, 2, 2]:
+            dispatcher.submit(notifier, make_failure(failure_info, "a", return_code))
+        assert dispatcher.flush(timeout=5)
+    finally:
+        dispatcher.close()
+
+    assert [[(f.return_code, f.occurrences) for f in b] for b in notifier.sent] == [
+        [(1, 1)],
+        [(2, 2)],
+    ]
+
+
+def test_rate_limit_holds_messages_per_destination(failure_info):
+    notifier = RecordingNotifier()
+    other = RecordingNotifier()
+    other.destination = "dev"
+    settings = NotificationsConfig(window=0, digest=False, rate_limit=2, rate_period=0.2)
+    dispatcher = NotificationDispatcher(settings=settings)
+    try:
+        started = time.monotonic()
+        for task in ["a", "b", "c", "d"]:
+            dispatcher.submit(notifier, make_failure(failure_info, task))
+        dispatcher.submit(other, make_failure(failure_info, "e"))
+        assert dispatcher.flush(timeout=5)
+        elapsed = time.monotonic() - started
+    finally:
+        dispatcher.close()
+
+    assert [b[0].task_name for b in notifier.sent] == ["a", "b", "c", "d"]
+    # Two messages right away, then one every rate_period / rate_limit
+    assert elapsed >= 0.15
+    assert len(other.sent) == 1
+
+
+def test_close_sends_held_notifications(failure_info):
+    notifier = RecordingNotifier()
+    dispatcher = NotificationDispatcher(settings=NotificationsConfig(window=60))
+    dispatcher.submit(notifier, make_failure(failure_info, "a"))
+    dispatcher.submit(notifier, make_failure(failure_info, "b"))
+    assert dispatcher.metrics()["held"] == 1
+
+    assert dispatcher.close(timeout=5)
+    assert [[f.task_name for f in b] for b in notifier.sent] == [["a"], ["b"]]
+
+
+def test_timer_heap_sweeps_cancelled_timers():
+    timers = TimerHeap()
+    try:
+        for _ in range(1000):
+            timers.schedule(60, print).cancel()
+        assert len(timers._heap) < 200
+        assert len(timers) == 0
+    finally:
+        timers.close()
+
+
+class PartialNotifier(RecordingNotifier):
+    retry_backoff = 0.01
+
+    def __init__(self, failing):
+        super().__init__()
+        self.failing = set(failing)
+
+    def notify_batch(self, failures):
+        self.sent.append(list(failures))
+        undelivered = [f for f in failures if f.task_name in self.failing]
+        self.failing.clear()
+        return undelivered
+
+
+def test_retries_only_resend_the_undelivered_failures(failure_info):
+    notifier = PartialNotifier(failing=["b"])
+    results = {}
+    dispatcher = NotificationDispatcher(settings=NotificationsConfig(window=60, rate_limit=0))
+    try:
+        for task in ["a", "b", "c", "d"]:
+            on_result = lambda ok, task=task: results.update({task: ok})
+            dispatcher.submit(notifier, make_failure(failure_info, task), on_result)
+        # The held b, c and d go out as one digest
+        dispatcher._flush(notifier.destination, force=True)
+        assert dispatcher.flush(timeout=5)
+    finally:
+        dispatcher.close()
+
+    assert [[f.task_name for f in b] for b in notifier.sent] == [["a"], ["b", "c", "d"], ["b"]]
+    assert results == {"a": True, "b": True, "c": True, "d": True}
+    assert dispatcher.metrics()["retried"] == 1
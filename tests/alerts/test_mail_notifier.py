@@ -0,0 +1,195 @@
+import dataclasses
+import socketserver
+import threading
+from email import message_from_bytes
+from unittest.mock import patch
+
+import pytest
+
+from bansuri.alerts.mail_notifier import MailNotifier
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages"""
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 stub ESMTP")
+        sent = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.decode().strip().split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-stub", "250-AUTH PLAIN", "250 8BITMIME")
+            elif verb in ("MAIL", "RCPT"):
+                server.envelopes.append(line.decode().strip())
+                self.reply("250 OK")
+            elif verb in ("HELO", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "AUTH":
+                server.logins += 1
+                self.reply("235 Authenticated")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data += chunk
+                server.messages.append(message_from_bytes(data))
+                self.reply("250 Queued")
+                sent += 1
+                if server.drop_after and sent >= server.drop_after:
+                    # Closed without telling the client, like an idle timeout
+                    return
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+    def reply(self, *lines):
+        self.wfile.write("".join(f"{line}\r\n" for line in lines).encode())
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), StubSMTPHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.logins = 0
+    server.messages = []
+    server.envelopes = []
+    server.drop_after = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_notifier(server, **options):
+    return MailNotifier.from_options(
+        {
+            "host": "127.0.0.1",
+            "port": server.server_address[1],
+            "to": ["ops@example.com", "oncall@example.com"],
+            "from": "bansuri@example.com",
+            "timeout": 2,
+            **options,
+        }
+    )
+
+
+def test_failure_is_sent_as_one_mail(smtp_server, failure_info):
+    notifier = make_notifier(smtp_server, **{"subject-prefix": "[prod]"})
+
+    assert notifier.notify(failure_info) is True
+    notifier.relay.close()
+
+    message = smtp_server.messages[0]
+    assert message["Subject"] == "[prod] Task test-task failed"
+    assert message["To"] == "ops@example.com, oncall@example.com"
+    assert "Return Code:       1" in message.get_payload(decode=True).decode()
+    assert "rcpt TO:<oncall@example.com>" in smtp_server.envelopes
+
+
+def test_session_is_reused_between_notifiers(smtp_server, failure_info):
+    first = make_notifier(smtp_server, username="bansuri", password="secret")
+    second = make_notifier(smtp_server, username="bansuri", password="secret")
+
+    for _ in range(3):
+        assert first.notify(failure_info)
+        assert second.notify(failure_info)
+
+    assert first.relay is second.relay
+    assert len(smtp_server.messages) == 6
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == 1
+    first.relay.close()
+
+
+def test_digest_is_merged_into_one_mail(smtp_server, failure_info):
+    notifier = make_notifier(smtp_server)
+    failures = [dataclasses.replace(failure_info, task_name=f"t{i}") for i in range(3)]
+
+    assert notifier.notify_batch(failures) == []
+    notifier.relay.close()
+
+    assert len(smtp_server.messages) == 1
+    message = smtp_server.messages[0]
+    assert message["Subject"] == "[Bansuri] 3 tasks failed"
+    assert "Tasks t0, t1, t2 have failed." in message.get_payload(decode=True).decode()
+
+
+def test_session_closed_by_the_server_is_replaced(smtp_server, failure_info):
+    smtp_server.drop_after = 1
+    notifier = make_notifier(smtp_server, keepalive=30)
+
+    assert notifier.notify(failure_info)
+    assert notifier.notify(failure_info)
+
+    assert len(smtp_server.messages) == 2
+    assert notifier.relay.connections == 2
+    notifier.relay.close()
+
+
+def test_idle_session_is_replaced(smtp_server, failure_info):
+    notifier = make_notifier(smtp_server, keepalive=0)
+
+    assert notifier.notify(failure_info)
+    assert notifier.notify(failure_info)
+
+    assert smtp_server.connections == 2
+    notifier.relay.close()
+
+
+def test_unreachable_relay_fails_the_delivery(failure_info):
+    notifier = MailNotifier("127.0.0.1", "ops@example.com", port=9, timeout=1)
+    assert notifier.notify(failure_info) is False
+
+
+def test_destination_groups_by_relay_and_recipients():
+    first = MailNotifier("smtp.local", ["b@example.com", "a@example.com"])
+    second = MailNotifier("smtp.local", "a@example.com")
+
+    assert first.destination == "mail:smtp.local:25:a@example.com,b@example.com"
+    assert second.destination == "mail:smtp.local:25:a@example.com"
+    assert MailNotifier("smtp.local", "a@example.com", use_ssl=True).relay.port == 465
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"to": "a@example.com"},
+        {"host": "smtp.local"},
+        {"host": "smtp.local", "to": "nobody"},
+        {"host": "smtp.local", "to": "a@example.com", "ssl": True, "starttls": True},
+        {"host": "smtp.local", "to": "a@example.com", "timeout": 0},
+        {"host": "smtp.local", "to": "a@example.com", "cc": "b@example.com"},
+    ],
+)
+def test_invalid_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        MailNotifier.from_options(options)
+
+
+def test_default_sender_is_resolved_on_the_first_mail(smtp_server, failure_info):
+    with patch("bansuri.alerts.mail_notifier.socket.getfqdn", return_value="host.local") as getfqdn:
+        notifier = MailNotifier(
+            "127.0.0.1", "ops@example.com", port=smtp_server.server_address[1], timeout=2
+        )
+        getfqdn.assert_not_called()
+        with patch("bansuri.alerts.mail_notifier._default_sender", None):
+            assert notifier.notify(failure_info)
+    notifier.relay.close()
+
+    assert smtp_server.messages[0]["From"] == "bansuri@host.local"
@@ -0,0 +1,137 @@
+import dataclasses
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bansuri.alerts.webhook_notifier import WebhookNotifier, parse_webhook_url
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.received.append(
+            {
+                "path": self.path,
+                "client": self.client_address,
+                "headers": dict(self.headers),
+                "body": json.loads(body),
+            }
+        )
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+        if self.server.drop_connections:
+            # Closed without telling the client, like an idle timeout
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.received = []
+    server.statuses = []
+    server.drop_connections = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_notifier(server, **options):
+    url = f"http://127.0.0.1:{server.server_address[1]}/hooks/bansuri?channel=ops"
+    return WebhookNotifier.from_options({"url": url, **options})
+
+
+def test_failures_are_posted_as_json(stub_server, failure_info):
+    notifier = make_notifier(stub_server, headers={"Authorization": "Bearer token"})
+
+    assert notifier.notify(failure_info) is True
+
+    request = stub_server.received[0]
+    assert request["path"] == "/hooks/bansuri?channel=ops"
+    assert request["headers"]["Authorization"] == "Bearer token"
+    assert request["headers"]["Content-Type"] == "application/json"
+    failure = request["body"]["failures"][0]
+    assert failure["task_name"] == "test-task"
+    assert failure["return_code"] == 1
+    assert failure["timestamp"] == "2023-01-01T12:00:00"
+
+
+def test_connections_are_kept_alive_and_shared(stub_server, failure_info):
+    first = make_notifier(stub_server)
+    second = make_notifier(stub_server)
+
+    for _ in range(3):
+        assert first.notify(failure_info)
+        assert second.notify(failure_info)
+
+    assert first.pool is second.pool
+    assert len({request["client"] for request in stub_server.received}) == 1
+
+
+def test_connection_closed_by_the_server_is_replaced(stub_server, failure_info):
+    stub_server.drop_connections = True
+    notifier = make_notifier(stub_server, timeout=2)
+    assert notifier.notify(failure_info)
+    assert len(notifier.pool._idle) == 1
+
+    assert notifier.notify(failure_info)
+    assert len(stub_server.received) == 2
+    assert stub_server.received[0]["client"] != stub_server.received[1]["client"]
+
+
+def test_batches_are_split_by_batch_size(stub_server, failure_info):
+    notifier = make_notifier(stub_server, **{"batch-size": 2})
+    failures = [dataclasses.replace(failure_info, task_name=f"t{i}") for i in range(5)]
+
+    assert notifier.notify_batch(failures) == []
+
+    assert [len(r["body"]["failures"]) for r in stub_server.received] == [2, 2, 1]
+
+
+def test_failed_chunk_returns_the_failures_not_posted(stub_server, failure_info):
+    stub_server.statuses = [200, 503]
+    notifier = make_notifier(stub_server, **{"batch-size": 2})
+    failures = [dataclasses.replace(failure_info, task_name=f"t{i}") for i in range(5)]
+
+    assert notifier.notify_batch(failures) == failures[2:]
+    assert len(stub_server.received) == 2
+
+
+def test_error_status_fails_the_delivery(stub_server, failure_info):
+    stub_server.statuses = [503]
+    notifier = make_notifier(stub_server, retries=5, timeout=3)
+
+    assert notifier.notify(failure_info) is False
+    assert notifier.retries == 5
+    assert notifier.timeout == 3.0
+
+
+def test_unreachable_endpoint_fails_the_delivery(failure_info):
+    notifier = WebhookNotifier("http://127.0.0.1:9/hook", timeout=1)
+    assert notifier.notify(failure_info) is False
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"url": "ftp://host/x"}, {"url": "http://host", "batch-size": 0}, {"url": "http://h", "x": 1}],
+)
+def test_invalid_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        WebhookNotifier.from_options(options)
+
+
+def test_parse_webhook_url_defaults():
+    assert parse_webhook_url("https://example.com") == ("https", "example.com", 443, "/")
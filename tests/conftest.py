@@ -1,9 +1,13 @@
 from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from bansuri.alerts.notifier import FailureInfo
 from bansuri.base.config_manager import BansuriConfig, ScriptConfig
+from bansuri.master import Orchestrator
+from bansuri.server.dashboard import Dashboard
 
 
 @pytest.fixture
@@ -44,3 +48,57 @@ def failure_info():
         stdout="output line",
         stderr="error line",
     )
+
+
+@pytest.fixture
+def orchestrator_factory():
+    with (
+        patch("bansuri.master.signal.signal") as mock_signal,
+        patch("bansuri.server.dashboard.Dashboard") as mock_dashboard_cls,
+    ):
+        dashboard = MagicMock()
+        mock_dashboard_cls.return_value = dashboard
+
+        def _make(**kwargs):
+            orchestrator = Orchestrator(**kwargs)
+            return orchestrator, dashboard, mock_signal, mock_dashboard_cls
+
+        yield _make
+
+
+@pytest.fixture
+def make_runner_mock():
+    """Runner mock with the fields and usage the dashboard reads"""
+
+    def _make(name="a", status="RUNNING", **config):
+        runner = MagicMock()
+        config.setdefault("command", f"echo {name}")
+        runner.config = SimpleNamespace(name=name, **config)
+        runner.status = status
+        runner.last_run = None
+        runner.next_run = None
+        runner.attempts = 1
+        runner.failed_attempts = 0
+        runner.get_resource_usage.return_value = {"cpu": 0.0, "memory": 0}
+        return runner
+
+    return _make
+
+
+@pytest.fixture
+def dashboard_factory():
+    """Dashboards over an orchestrator holding the given runners, stopped after the test"""
+    dashboards = []
+    with patch("bansuri.server.dashboard.optional_import", return_value=None):
+
+        def _make(*runners, start=True, **options):
+            orchestrator = SimpleNamespace(runners={r.config.name: r for r in runners})
+            dashboard = Dashboard(orchestrator, **{"port": 0, **options})
+            dashboards.append(dashboard)
+            if start:
+                dashboard.start()
+            return dashboard
+
+        yield _make
+        for dashboard in dashboards:
+            dashboard.stop()
@@ -1,27 +1,14 @@
 import signal
 import sys
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from bansuri.base.config_manager import BansuriConfig, ScriptConfig
-from bansuri.master import Orchestrator, main
-
-
-@pytest.fixture
-def orchestrator_factory():
-    with (
-        patch("bansuri.master.signal.signal") as mock_signal,
-        patch("bansuri.master.Dashboard") as mock_dashboard_cls,
-    ):
-        dashboard = MagicMock()
-        mock_dashboard_cls.return_value = dashboard
-
-        def _make(**kwargs):
-            orchestrator = Orchestrator(**kwargs)
-            return orchestrator, dashboard, mock_signal, mock_dashboard_cls
-
-        yield _make
+from bansuri.base.config_manager import BansuriConfig, ScriptConfig, StartupConfig
+from bansuri.master import main
+from bansuri.server.bulk_control import BulkControl
+from bansuri.task_runner import TaskRunner
 
 
 def test_orchestrator_initializes_dashboard_from_environment(monkeypatch, orchestrator_factory):
@@ -36,17 +23,36 @@ def test_orchestrator_initializes_dashboard_from_environment(monkeypatch, orches
 
     assert orchestrator.config_file == "conf.json"
     assert orchestrator.check_interval == 10
-    assert mock_signal.call_count == 2
+    assert mock_signal.call_count == 3
     mock_signal.assert_any_call(signal.SIGTERM, orchestrator.signal_handler)
     mock_signal.assert_any_call(signal.SIGINT, orchestrator.signal_handler)
+    mock_signal.assert_any_call(signal.SIGHUP, orchestrator.signal_handler)
     mock_dashboard_cls.assert_called_once_with(
         orchestrator,
         username="alice",
         password="secret",
         port=9090,
+        backend="threading",
     )
 
 
+def test_dashboard_can_be_disabled_from_environment(monkeypatch, orchestrator_factory):
+    monkeypatch.setenv("BANSURI_DASHBOARD", "0")
+
+    orchestrator, _, _, mock_dashboard_cls = orchestrator_factory()
+
+    assert orchestrator.dashboard is None
+    mock_dashboard_cls.assert_not_called()
+
+
+def test_dashboard_backend_is_read_from_environment(monkeypatch, orchestrator_factory):
+    monkeypatch.setenv("BANSURI_DASHBOARD_BACKEND", "AsyncIO")
+
+    _, _, _, mock_dashboard_cls = orchestrator_factory()
+
+    assert mock_dashboard_cls.call_args.kwargs["backend"] == "asyncio"
+
+
 def test_sync_tasks_adds_new_runner(orchestrator_factory):
     orchestrator, _, _, _ = orchestrator_factory(config_file="scripts.json")
     task = ScriptConfig(name="backup", command="echo backup", timer="1m")
@@ -66,6 +72,36 @@ def test_sync_tasks_adds_new_runner(orchestrator_factory):
     runner.start.assert_called_once()
 
 
+def test_state_listeners_follow_added_changed_and_removed_tasks(orchestrator_factory):
+    orchestrator, _, _, _ = orchestrator_factory(config_file="scripts.json")
+    existing = MagicMock()
+    orchestrator.runners["old"] = existing
+    events = []
+    orchestrator.add_state_listener(lambda name, runner: events.append((name, runner)))
+    assert events == [("old", existing)]
+
+    config = BansuriConfig(
+        version="1.0", scripts=[ScriptConfig(name="new", command="echo", timer="1m")]
+    )
+    with (
+        patch("bansuri.master.BansuriConfig.load_from_file", return_value=config),
+        patch("bansuri.master.TaskRunner") as mock_runner_cls,
+    ):
+        runner = MagicMock()
+        runner.config.name = "new"
+        mock_runner_cls.return_value = runner
+        orchestrator.sync_tasks()
+
+    assert events[1:] == [("old", None), ("new", runner)]
+    assert existing.on_state_change is None
+
+    runner.on_state_change(runner)
+    assert events[-1] == ("new", runner)
+    # A replaced runner is ignored
+    orchestrator._runner_state_changed(existing)
+    assert len(events) == 4
+
+
 def test_sync_tasks_removes_runner_missing_from_new_config(orchestrator_factory):
     orchestrator, _, _, _ = orchestrator_factory(config_file="scripts.json")
     old_runner = MagicMock()
@@ -98,11 +134,36 @@ def test_sync_tasks_restarts_runner_when_configuration_changes(orchestrator_fact
         new_runner = MagicMock()
         mock_runner_cls.return_value = new_runner
 
-        orchestrator.sync_tasks()
+        report = orchestrator.sync_tasks()
 
     old_runner.stop.assert_called_once()
     assert orchestrator.runners["backup"] is new_runner
     new_runner.start.assert_called_once()
+    assert report.restarted == {"backup": ["command"]}
+
+
+def test_sync_tasks_hot_applies_non_disruptive_changes(orchestrator_factory):
+    orchestrator, _, _, _ = orchestrator_factory(config_file="scripts.json")
+    old_task = ScriptConfig(name="backup", command="echo backup", timer="1m")
+    new_task = ScriptConfig(
+        name="backup", command="echo backup", timer="1m", description="nightly backup"
+    )
+    old_runner = MagicMock()
+    old_runner.config = old_task
+    orchestrator.runners = {"backup": old_runner}
+    config = BansuriConfig(version="1.0", scripts=[new_task])
+
+    with (
+        patch("bansuri.master.BansuriConfig.load_from_file", return_value=config),
+        patch("bansuri.master.TaskRunner") as mock_runner_cls,
+    ):
+        report = orchestrator.sync_tasks()
+
+    old_runner.stop.assert_not_called()
+    mock_runner_cls.assert_not_called()
+    old_runner.apply_config.assert_called_once_with(new_task, config, ["description"])
+    assert orchestrator.runners["backup"] is old_runner
+    assert report.hot_applied == {"backup": ["description"]}
 
 
 def test_sync_tasks_delays_restart_while_previous_runner_is_still_stopping(orchestrator_factory):
@@ -132,12 +193,15 @@ def test_stop_all_stops_dashboard_and_all_runners(orchestrator_factory):
         "one": MagicMock(),
         "two": MagicMock(),
     }
+    orchestrator.notifications = MagicMock()
+    orchestrator.notifications.metrics.return_value = {"delivered": 0, "failed": 0, "dropped": 0}
 
     orchestrator.stop_all()
 
     dashboard.stop.assert_called_once()
     orchestrator.runners["one"].stop.assert_called_once()
     orchestrator.runners["two"].stop.assert_called_once()
+    orchestrator.notifications.close.assert_called_once()
 
 
 def test_run_starts_dashboard_and_syncs_until_stop(orchestrator_factory):
@@ -147,13 +211,33 @@ def test_run_starts_dashboard_and_syncs_until_stop(orchestrator_factory):
         orchestrator.should_stop = True
 
     orchestrator.sync_tasks = MagicMock(side_effect=stop_after_first_sync)
+    orchestrator.watcher = MagicMock()
 
-    with patch("bansuri.master.time.sleep") as mock_sleep:
-        orchestrator.run()
+    orchestrator.run()
 
     dashboard.start.assert_called_once()
     orchestrator.sync_tasks.assert_called_once()
-    mock_sleep.assert_called_once_with(1)
+    orchestrator.watcher.wait_for_change.assert_not_called()
+
+
+def test_run_only_resyncs_when_watcher_reports_a_change(orchestrator_factory):
+    orchestrator, _, _, _ = orchestrator_factory(check_interval=1)
+    orchestrator.sync_tasks = MagicMock()
+    orchestrator.watcher = MagicMock()
+    changes = iter([False, True, False])
+
+    def wait_for_change():
+        try:
+            return next(changes)
+        except StopIteration:
+            orchestrator.should_stop = True
+            return False
+
+    orchestrator.watcher.wait_for_change.side_effect = wait_for_change
+
+    orchestrator.run()
+
+    assert orchestrator.sync_tasks.call_count == 2
 
 
 def test_signal_handler_stops_all_and_exits(orchestrator_factory):
@@ -167,6 +251,19 @@ def test_signal_handler_stops_all_and_exits(orchestrator_factory):
     mock_exit.assert_called_once_with(0)
 
 
+def test_sighup_requests_reload_instead_of_exiting(orchestrator_factory):
+    orchestrator, _, _, _ = orchestrator_factory()
+    orchestrator.stop_all = MagicMock()
+    orchestrator.watcher = MagicMock()
+
+    with patch("bansuri.master.sys.exit") as mock_exit:
+        orchestrator.signal_handler(signal.SIGHUP, None)
+
+    orchestrator.watcher.request_reload.assert_called_once()
+    orchestrator.stop_all.assert_not_called()
+    mock_exit.assert_not_called()
+
+
 def test_main_uses_cwd_default_config_path():
     with (
         patch("bansuri.master.Orchestrator") as mock_orchestrator_cls,
@@ -176,7 +273,9 @@ def test_main_uses_cwd_default_config_path():
 
         main()
 
-    mock_orchestrator_cls.assert_called_once_with(config_file="scripts.json", check_interval=5)
+    mock_orchestrator_cls.assert_called_once_with(
+        config_file="scripts.json", check_interval=5, config_cache=None
+    )
     orchestrator.run.assert_called_once()
 
 
@@ -189,5 +288,113 @@ def test_main_accepts_config_override_from_cli():
 
         main()
 
-    mock_orchestrator_cls.assert_called_once_with(config_file="conf.json", check_interval=5)
+    mock_orchestrator_cls.assert_called_once_with(
+        config_file="conf.json", check_interval=5, config_cache=None
+    )
     orchestrator.run.assert_called_once()
+
+
+def test_main_validate_loads_config_and_exits_without_orchestrator(tmp_path, capsys):
+    config_path = tmp_path / "scripts.json"
+    config_path.write_text(
+        '{"version": "1", "scripts": [{"name": "a", "command": "true", "timer": "5"}]}'
+    )
+
+    with (
+        patch("bansuri.master.Orchestrator") as mock_orchestrator_cls,
+        pytest.raises(SystemExit) as exc,
+    ):
+        main(["--validate", "-c", str(config_path)])
+
+    assert exc.value.code == 0
+    assert "1 task(s)" in capsys.readouterr().out
+    mock_orchestrator_cls.assert_not_called()
+
+
+def test_main_validate_reports_invalid_config(tmp_path, capsys):
+    config_path = tmp_path / "scripts.json"
+    config_path.write_text('{"scripts": [{"name": "a", "command": "true"}]}')
+
+    with pytest.raises(SystemExit) as exc:
+        main(["--validate", "-c", str(config_path)])
+
+    assert exc.value.code == 1
+    assert "Invalid configuration" in capsys.readouterr().err
+
+
+def test_sync_tasks_launches_new_runners_through_startup_ramp(orchestrator_factory):
+    orchestrator, _, _, _ = orchestrator_factory(config_file="scripts.json")
+    tasks = [
+        ScriptConfig(name=name, command="echo 1", timer="1m") for name in ("c", "a", "b")
+    ]
+    config = BansuriConfig(version="1.0", scripts=tasks)
+    orchestrator.ramp = MagicMock()
+
+    with (
+        patch("bansuri.master.BansuriConfig.load_from_file", return_value=config),
+        patch("bansuri.master.TaskRunner", side_effect=lambda task, _: MagicMock(name=task.name)),
+    ):
+        orchestrator.sync_tasks()
+
+    orchestrator.ramp.configure.assert_called_once_with(config.startup)
+    (submitted,), _ = orchestrator.ramp.submit.call_args
+    assert submitted == [orchestrator.runners[name] for name in ("c", "a", "b")]
+    for runner in submitted:
+        runner.start.assert_not_called()
+
+
+@pytest.fixture
+def queued_orchestrator(orchestrator_factory, make_script_config, global_config):
+    """An orchestrator whose ramp started 'first' and holds 'queued' for two seconds"""
+    orchestrator, _, _, _ = orchestrator_factory(config_file="scripts.json")
+    orchestrator.ramp.configure(StartupConfig(rate=0.5))
+    runners = [
+        TaskRunner(make_script_config(name=name), global_config) for name in ("first", "queued")
+    ]
+    for runner in runners:
+        orchestrator._add_runner(runner.config.name, runner)
+
+    with patch.object(TaskRunner, "start", autospec=True) as start:
+        orchestrator.ramp.submit(runners)
+        deadline = time.monotonic() + 2
+        while not start.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        try:
+            yield orchestrator, start
+        finally:
+            orchestrator.ramp.stop()
+
+
+def test_bulk_stop_of_a_queued_task_takes_it_out_of_the_ramp(queued_orchestrator):
+    orchestrator, start = queued_orchestrator
+    bulk = BulkControl(orchestrator.control_task)
+    try:
+        job = bulk.submit(["queued"], "stop")
+        deadline = time.monotonic() + 5
+        while not job.done and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        bulk.close()
+
+    assert job.state == "completed"
+    assert job.counts["succeeded"] == 1
+    assert orchestrator.runners["queued"].status == "STOPPED"
+    assert orchestrator.ramp.progress()["pending"] == 0
+    assert [call.args[0].config.name for call in start.call_args_list] == ["first"]
+
+
+def test_restart_of_a_queued_task_keeps_its_place_in_the_ramp(queued_orchestrator):
+    orchestrator, start = queued_orchestrator
+
+    assert orchestrator.control_task("queued", "restart") is None
+
+    assert orchestrator.ramp.progress()["pending"] == 1
+    assert [call.args[0].config.name for call in start.call_args_list] == ["first"]
+
+
+def test_control_task_reports_unknown_tasks_and_actions(orchestrator_factory):
+    orchestrator, _, _, _ = orchestrator_factory(config_file="scripts.json")
+
+    assert orchestrator.control_task("missing", "stop") == "Task not found"
+    with pytest.raises(ValueError):
+        orchestrator.control_task("missing", "reload")
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+# Only imported once a feature needs them, never by the entry point
+LAZY_MODULES = (
+    "http.server",
+    "http.client",
+    "smtplib",
+    "ssl",
+    "email",
+    "bansuri.server.dashboard",
+    "psutil",
+    "croniter",
+)
+
+
+def test_entry_point_import_does_not_load_optional_modules():
+    code = (
+        "import sys, bansuri.master; "
+        "print(' '.join(m for m in %r if m in sys.modules))" % (LAZY_MODULES,)
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == ""
+
+
+def test_package_exports_resolve_lazily():
+    code = (
+        "import sys, bansuri; "
+        "assert 'bansuri.task_runner' not in sys.modules; "
+        "bansuri.TaskRunner; "
+        "assert 'bansuri.task_runner' in sys.modules"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,116 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from bansuri.base.config_manager import StartupConfig
+from bansuri.startup_ramp import StartupRamp
+
+
+class FakeRunner:
+    def __init__(self, name, priority=0, is_service=False):
+        self.config = SimpleNamespace(name=name, priority=priority)
+        self.is_service = is_service
+        self.status = "STOPPED"
+        self.started_at = None
+        self.started = threading.Event()
+
+    def mark_queued(self):
+        self.status = "QUEUED"
+
+    def start(self):
+        self.status = "RUNNING"
+        self.started_at = time.monotonic()
+        self.started.set()
+
+
+def test_submit_without_rate_starts_everything_in_priority_order():
+    order = []
+    runners = [FakeRunner("low", priority=0), FakeRunner("high", priority=10)]
+    for runner in runners:
+        runner.start = lambda name=runner.config.name: order.append(name)
+
+    StartupRamp().submit(runners)
+
+    assert order == ["high", "low"]
+
+
+def test_order_puts_services_first_and_keeps_config_order_on_ties():
+    ramp = StartupRamp(StartupConfig(services_first=True))
+    job_a = FakeRunner("job-a", priority=5)
+    service = FakeRunner("service", is_service=True)
+    job_b = FakeRunner("job-b", priority=5)
+
+    assert [r.config.name for r in ramp.order([job_a, service, job_b])] == [
+        "service",
+        "job-a",
+        "job-b",
+    ]
+
+
+def test_submit_with_rate_spaces_launches_and_reports_progress():
+    messages = []
+    ramp = StartupRamp(StartupConfig(rate=50), log=messages.append)
+    runners = [FakeRunner(f"task-{i}") for i in range(4)]
+
+    ramp.submit(runners)
+
+    assert all(r.status in ("QUEUED", "RUNNING") for r in runners)
+    for runner in runners:
+        assert runner.started.wait(timeout=2)
+    gaps = [b.started_at - a.started_at for a, b in zip(runners, runners[1:])]
+    assert min(gaps) >= 0.015
+
+    ramp.stop()
+    assert ramp.progress() == {
+        "active": False,
+        "total": 4,
+        "started": 4,
+        "pending": 0,
+        "rate": 50,
+    }
+    assert any("Startup ramp complete: 4 task(s)" in m for m in messages)
+
+
+def test_cancel_drops_runner_that_was_not_started_yet():
+    ramp = StartupRamp(StartupConfig(rate=1))
+    first, second = FakeRunner("first"), FakeRunner("second")
+
+    ramp.submit([first, second])
+    assert first.started.wait(timeout=2)
+
+    assert ramp.cancel(second) is True
+    assert ramp.cancel(second) is False
+    ramp.stop()
+
+    assert not second.started.is_set()
+    assert ramp.progress()["total"] == 1
+
+
+def test_cancel_waits_for_a_launch_in_progress():
+    ramp = StartupRamp(StartupConfig(rate=10))
+    runner = FakeRunner("slow")
+    entered, release = threading.Event(), threading.Event()
+    start = runner.start
+
+    def slow_start():
+        entered.set()
+        release.wait(5)
+        start()
+
+    runner.start = slow_start
+    ramp.submit([runner])
+    assert entered.wait(timeout=2)
+
+    result = []
+    cancel = threading.Thread(target=lambda: result.append(ramp.cancel(runner)))
+    cancel.start()
+    cancel.join(timeout=0.1)
+    assert cancel.is_alive()
+
+    release.set()
+    cancel.join(timeout=2)
+    ramp.stop()
+
+    # The launch went through, the caller stops the runner it got back
+    assert result == [False]
+    assert runner.started.is_set()
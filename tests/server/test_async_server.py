@@ -0,0 +1,240 @@
+import base64
+import http.client
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+
+import pytest
+
+from bansuri.server.async_server import AsyncHTTPServer
+
+
+@pytest.fixture
+def dashboard(tmp_path, dashboard_factory, make_runner_mock):
+    (tmp_path / "task.log").write_bytes(b"".join(b"line %d\n" % i for i in range(1000)))
+    runner = make_runner_mock(
+        command="echo", working_directory=str(tmp_path), stdout="task.log", stderr=None
+    )
+    return dashboard_factory(
+        runner, username="admin", password="pw", status_interval=0, backend="asyncio"
+    )
+
+
+def connect(dashboard):
+    return http.client.HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+
+
+AUTH = {"Authorization": "Basic " + base64.b64encode(b"admin:pw").decode()}
+
+
+def fetch(conn, method, path, body=None, **headers):
+    conn.request(method, path, body=body, headers={**AUTH, **headers})
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_unknown_backend_is_rejected(dashboard_factory):
+    with pytest.raises(ValueError):
+        dashboard_factory(start=False, backend="twisted")
+
+
+def test_routes_and_basic_auth_keep_working(dashboard):
+    assert isinstance(dashboard.server, AsyncHTTPServer)
+    conn = connect(dashboard)
+
+    conn.request("GET", "/api/status")
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 401
+    assert response.getheader("WWW-Authenticate")
+
+    response, body = fetch(conn, "GET", "/api/status")
+    assert response.status == 200
+    assert json.loads(body)["tasks"][0]["name"] == "a"
+
+    response, _ = fetch(conn, "GET", "/api/status", **{"If-None-Match": response.getheader("ETag")})
+    assert response.status == 304
+
+    response, body = fetch(conn, "GET", "/api/logs?task=a&type=stdout&line=10&limit=16")
+    assert body == b"line 10\nline 11\n"
+
+    response, body = fetch(conn, "GET", "/api/logs/search?task=a&q=line%20999")
+    assert json.loads(body)["matches"][0]["line"] == 999
+
+    response, body = fetch(
+        conn, "POST", "/api/control", body=json.dumps({"task": "missing", "action": "stop"})
+    )
+    assert response.status == 400
+    assert json.loads(body) == {"success": False}
+
+    response, body = fetch(conn, "GET", "/missing")
+    assert response.status == 404
+
+
+def test_raw_log_download_with_range(dashboard, tmp_path):
+    content = (tmp_path / "task.log").read_bytes()
+    conn = connect(dashboard)
+
+    response, body = fetch(conn, "GET", "/api/logs/raw?task=a&type=stdout")
+    assert response.status == 200
+    assert body == content
+
+    response, body = fetch(conn, "GET", "/api/logs/raw?task=a&type=stdout", Range="bytes=-8")
+    assert response.status == 206
+    assert body == b"ine 999\n"
+
+    response, body = fetch(conn, "HEAD", "/api/logs/raw?task=a&type=stdout")
+    assert int(response.getheader("Content-Length")) == len(content)
+    assert body == b""
+
+
+def test_event_stream_is_served_by_the_event_loop(dashboard):
+    dashboard.events.interval = 0.05
+    conn = connect(dashboard)
+    conn.request("GET", "/api/events", headers=AUTH)
+    response = conn.getresponse()
+    assert response.getheader("Content-Type") == "text/event-stream"
+    assert response.fp.readline() == b"event: snapshot\n"
+    response.fp.readline()
+    response.fp.readline()
+
+    dashboard.orchestrator.runners["a"].status = "FAILED"
+    assert response.fp.readline() == b"event: patch\n"
+    assert b'"FAILED"' in response.fp.readline()
+
+    # The stream holds neither a worker nor a request slot
+    response, body = fetch(connect(dashboard), "GET", "/api/status")
+    assert response.status == 200
+    conn.close()
+
+
+def test_idle_event_stream_waits_for_events_and_sends_keepalives(dashboard):
+    with patch("bansuri.server.async_server.SSE_KEEPALIVE", 0.2):
+        conn = connect(dashboard)
+        conn.request("GET", "/api/events", headers=AUTH)
+        response = conn.getresponse()
+        assert response.fp.readline() == b"event: snapshot\n"
+        response.fp.readline()
+        response.fp.readline()
+
+        # Nothing changes, the stream wakes up for its keepalive only
+        assert response.fp.readline() == b": keepalive\n"
+        conn.close()
+
+
+def test_idle_event_streams_hold_no_thread(dashboard):
+    def open_stream():
+        conn = connect(dashboard)
+        conn.request("GET", "/api/events", headers=AUTH)
+        response = conn.getresponse()
+        assert response.fp.readline() == b"event: snapshot\n"
+        return conn
+
+    streams = [open_stream()]
+    before = threading.active_count()
+    try:
+        streams += [open_stream() for _ in range(8)]
+        # At most the idle request workers were started, none per stream
+        assert threading.active_count() < before + 8
+    finally:
+        for conn in streams:
+            conn.close()
+
+
+def test_excess_connections_are_refused(dashboard):
+    dashboard.server.max_connections = 2
+    idle = [socket.create_connection(dashboard.server.server_address) for _ in range(2)]
+    try:
+        deadline = time.monotonic() + 5
+        while dashboard.server.connection_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        response, _ = fetch(connect(dashboard), "GET", "/api/status")
+        assert response.status == 503
+        assert response.getheader("Retry-After") == "1"
+    finally:
+        for sock in idle:
+            sock.close()
+
+
+def test_slow_clients_are_disconnected(dashboard):
+    dashboard.server.request_timeout = 0.2
+    sock = socket.create_connection(dashboard.server.server_address, timeout=5)
+    try:
+        sock.sendall(b"GET /api/status HTTP/1.1\r\nHost: x\r\n")
+        assert sock.recv(1024) == b""
+    finally:
+        sock.close()
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/slow":
+            self.server.release.wait(5)
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_requests_beyond_the_concurrency_limit_are_refused():
+    server = AsyncHTTPServer(("127.0.0.1", 0), SlowHandler, max_concurrent=1, queue_timeout=0.2)
+    server.release = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+
+    def get(path):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.status, response.read()
+
+    results = []
+    try:
+        slow = threading.Thread(target=lambda: results.append(get("/slow")))
+        slow.start()
+        time.sleep(0.2)
+        assert get("/fast")[0] == 503
+
+        server.release.set()
+        slow.join(5)
+        assert results == [(200, b"/slow")]
+        assert get("/fast") == (200, b"/fast")
+    finally:
+        server.release.set()
+        server.shutdown()
+        server.server_close()
+
+
+class FailingHandler(SlowHandler):
+    def do_GET(self):
+        raise RuntimeError("boom")
+
+
+def test_handler_failures_are_logged_with_their_traceback():
+    server = AsyncHTTPServer(("127.0.0.1", 0), FailingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with patch("bansuri.server.async_server.default_logger") as logger:
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+            conn.request("GET", "/")
+            response = conn.getresponse()
+            response.read()
+        assert response.status == 500
+        source, message, trace = logger.return_value.error.call_args.args
+        assert source == "DASHBOARD"
+        assert "RuntimeError: boom" in trace
+    finally:
+        server.shutdown()
+        server.server_close()
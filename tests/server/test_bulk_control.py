@@ -0,0 +1,294 @@
+import http.client
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from bansuri.server.bulk_control import BulkControl
+from bansuri.server.dashboard import Dashboard
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class FakeRunner:
+    """Records how many stops overlap, and can be held until released"""
+
+    def __init__(self, name, tracker, stop_result=True, tags=()):
+        self.config = SimpleNamespace(name=name, command="echo", tags=list(tags))
+        self.status = "RUNNING"
+        self.last_run = None
+        self.next_run = None
+        self.attempts = 1
+        self.failed_attempts = 0
+        self.tracker = tracker
+        self.stop_result = stop_result
+
+    def stop(self):
+        with self.tracker["lock"]:
+            self.tracker["active"] += 1
+            self.tracker["peak"] = max(self.tracker["peak"], self.tracker["active"])
+            self.tracker["order"].append(self.config.name)
+        self.tracker["release"].wait(5)
+        with self.tracker["lock"]:
+            self.tracker["active"] -= 1
+        self.status = "STOPPED"
+        return self.stop_result
+
+    def start(self):
+        self.status = "RUNNING"
+
+    def get_resource_usage(self):
+        return {"cpu": 0.0, "memory": 0}
+
+
+def control_of(runners):
+    """Apply actions straight to the fake runners, like the orchestrator does for a running task"""
+
+    def control(name, action):
+        runner = runners.get(name)
+        if runner is None:
+            return "Task not found"
+        if action == "start":
+            runner.start()
+            return None
+        if runner.stop() is False:
+            return "Task is still stopping"
+        if action == "restart":
+            runner.start()
+        return None
+
+    return control
+
+
+def make_tracker(released=True):
+    tracker = {"lock": threading.Lock(), "active": 0, "peak": 0, "order": [], "release": threading.Event()}
+    if released:
+        tracker["release"].set()
+    return tracker
+
+
+@pytest.fixture
+def bulk():
+    control = BulkControl(control_of({}), max_workers=8)
+    yield control
+    control.close()
+
+
+def test_parallelism_bounds_the_actions_in_flight(bulk):
+    tracker = make_tracker(released=False)
+    runners = {f"t{i}": FakeRunner(f"t{i}", tracker) for i in range(10)}
+    bulk.control = control_of(runners)
+
+    job = bulk.submit(list(runners), "stop", parallelism=3)
+    assert wait_for(lambda: tracker["active"] == 3)
+    time.sleep(0.05)
+    assert tracker["active"] == 3
+
+    tracker["release"].set()
+    assert wait_for(lambda: job.done)
+    assert job.state == "completed"
+    assert tracker["peak"] == 3
+    assert job.summary()["succeeded"] == 10
+
+
+def test_rolling_batches_run_one_after_the_other(bulk):
+    tracker = make_tracker()
+    runners = {f"t{i}": FakeRunner(f"t{i}", tracker) for i in range(6)}
+    bulk.control = control_of(runners)
+
+    job = bulk.submit(list(runners), "restart", parallelism=4, batch_size=2)
+    assert wait_for(lambda: job.done)
+    assert job.batches == 3
+    assert job.batch == 3
+    assert tracker["peak"] <= 2
+    assert [set(tracker["order"][i:i + 2]) for i in (0, 2, 4)] == [
+        {"t0", "t1"},
+        {"t2", "t3"},
+        {"t4", "t5"},
+    ]
+    assert all(runner.status == "RUNNING" for runner in runners.values())
+
+
+def test_too_many_failures_skip_the_remaining_batches(bulk):
+    tracker = make_tracker()
+    runners = {f"t{i}": FakeRunner(f"t{i}", tracker, stop_result=False) for i in range(6)}
+    bulk.control = control_of(runners)
+
+    job = bulk.submit(list(runners), "stop", batch_size=2, max_failures=1)
+    assert wait_for(lambda: job.done)
+    data = job.to_dict()
+    assert data["state"] == "aborted"
+    assert data["failed"] == 2
+    assert data["skipped"] == 4
+    assert data["results"]["t0"] == {"state": "failed", "error": "Task is still stopping"}
+    assert data["results"]["t5"] == {"state": "skipped"}
+
+
+def test_cancel_skips_what_did_not_start(bulk):
+    tracker = make_tracker(released=False)
+    runners = {f"t{i}": FakeRunner(f"t{i}", tracker) for i in range(4)}
+    bulk.control = control_of(runners)
+
+    job = bulk.submit(list(runners), "stop", parallelism=1)
+    assert wait_for(lambda: tracker["active"] == 1)
+    job.cancel()
+    tracker["release"].set()
+
+    assert wait_for(lambda: job.done)
+    assert job.state == "cancelled"
+    assert job.counts == {"succeeded": 1, "failed": 0, "skipped": 3}
+
+
+def test_jobs_share_the_pool_threads():
+    tracker = make_tracker(released=False)
+    runners = {f"t{i}": FakeRunner(f"t{i}", tracker) for i in range(20)}
+    control = BulkControl(control_of(runners), max_workers=2)
+    before = threading.active_count()
+    try:
+        jobs = [control.submit([name], "stop") for name in runners]
+        assert wait_for(lambda: tracker["active"] == 2)
+        # Waiting jobs hold no thread, only the pool threads were started
+        assert threading.active_count() <= before + 2
+
+        tracker["release"].set()
+        assert wait_for(lambda: all(job.done for job in jobs))
+        assert all(job.state == "completed" for job in jobs)
+    finally:
+        control.close()
+
+
+def test_invalid_jobs_are_rejected(bulk):
+    with pytest.raises(ValueError):
+        bulk.submit(["a"], "reload")
+    with pytest.raises(ValueError):
+        bulk.submit(["a"], "stop", parallelism=0)
+
+
+def test_progress_events(bulk):
+    tracker = make_tracker(released=False)
+    runners = {"a": FakeRunner("a", tracker)}
+    # Nothing completes before the subscription
+    control = control_of(runners)
+    bulk.control = lambda name, action: tracker["release"].wait(5) and control(name, action)
+
+    job = bulk.submit(["a", "missing"], "stop")
+    subscriber = job.subscribe()
+    tracker["release"].set()
+
+    events = []
+    while True:
+        chunk = subscriber.get(timeout=5)
+        if chunk is None:
+            break
+        events.append(chunk.decode())
+    assert events[0].startswith("event: snapshot\n")
+    assert events[-1].startswith("event: done\n")
+    progress = [e for e in events if e.startswith("event: progress\n")]
+    assert len(progress) == 2
+    assert any('"Task not found"' in e for e in progress)
+
+
+@pytest.fixture
+def dashboard():
+    tracker = make_tracker()
+    runners = {
+        "web-1": FakeRunner("web-1", tracker, tags=["web"]),
+        "web-2": FakeRunner("web-2", tracker, tags=["web"]),
+        "db": FakeRunner("db", tracker, tags=["db"]),
+    }
+    runners["web-2"].status = "FAILED"
+    with patch("bansuri.server.dashboard.optional_import", return_value=None):
+        dashboard = Dashboard(
+            SimpleNamespace(runners=runners, control_task=control_of(runners)),
+            port=0,
+            status_interval=0,
+        )
+        dashboard.start()
+    try:
+        yield dashboard
+    finally:
+        dashboard.stop()
+
+
+def request(dashboard, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+    conn.request(method, path, body=json.dumps(body) if body is not None else None)
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_bulk_endpoint_selects_and_polls(dashboard):
+    response, body = request(
+        dashboard,
+        "POST",
+        "/api/control/bulk",
+        {"selector": {"tag": "web", "status": "RUNNING"}, "action": "stop", "parallelism": 2},
+    )
+    assert response.status == 202
+    submitted = json.loads(body)
+    assert submitted["tasks"] == ["web-1"]
+
+    job = dashboard.bulk_control.get(submitted["job"])
+    assert wait_for(lambda: job.done)
+    response, body = request(dashboard, "GET", f"/api/control/jobs/{job.id}")
+    data = json.loads(body)
+    assert data["state"] == "completed"
+    assert data["results"] == {"web-1": {"state": "succeeded"}}
+    assert dashboard.orchestrator.runners["web-1"].status == "STOPPED"
+
+    response, body = request(dashboard, "GET", "/api/control/jobs")
+    assert [j["id"] for j in json.loads(body)["jobs"]] == [job.id]
+
+    response, body = request(dashboard, "GET", f"/api/control/jobs/{job.id}/events")
+    assert response.getheader("Content-Type") == "text/event-stream"
+    assert body.startswith(b"event: snapshot\n")
+
+
+def test_bulk_endpoint_reports_unknown_names_and_bad_requests(dashboard):
+    response, body = request(
+        dashboard,
+        "POST",
+        "/api/control/bulk",
+        {"selector": {"names": ["db", "nope"], "glob": "*"}, "action": "restart"},
+    )
+    submitted = json.loads(body)
+    assert submitted["tasks"] == ["db"]
+    assert submitted["unknown"] == ["nope"]
+
+    response, body = request(dashboard, "POST", "/api/control/bulk", {"selector": {}, "action": "stop"})
+    assert response.status == 400
+    assert json.loads(body)["success"] is False
+
+    response, body = request(
+        dashboard, "POST", "/api/control/bulk", {"selector": {"glob": "*"}, "action": "reload"}
+    )
+    assert response.status == 400
+
+    response, _ = request(dashboard, "GET", "/api/control/jobs/missing")
+    assert response.status == 404
+    response, _ = request(dashboard, "POST", "/api/control/jobs/missing/cancel")
+    assert response.status == 404
+
+
+def test_single_control_runs_as_a_job(dashboard):
+    response, body = request(dashboard, "POST", "/api/control", {"task": "db", "action": "restart"})
+    data = json.loads(body)
+    assert response.status == 200
+    assert data["success"] is True
+    job = dashboard.bulk_control.get(data["job"])
+    assert wait_for(lambda: job.done)
+    assert job.counts["succeeded"] == 1
+
+    response, body = request(dashboard, "POST", "/api/control", {"task": "db", "action": "start"})
+    assert json.loads(body) == {"success": True}
+
+    response, body = request(dashboard, "POST", "/api/control", {"task": "db", "action": "reload"})
+    assert response.status == 400
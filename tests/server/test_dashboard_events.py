@@ -0,0 +1,121 @@
+import http.client
+import json
+
+import pytest
+
+from bansuri.server.events import EventQueue, StatusEventHub, diff_task_states, end_stream
+
+
+def parse_event(chunk):
+    lines = chunk.decode("utf-8").strip().splitlines()
+    return lines[0].split(": ", 1)[1], json.loads(lines[1].split(": ", 1)[1])
+
+
+@pytest.fixture
+def hub_factory():
+    hubs = []
+
+    def _make(states, resources=None, **kwargs):
+        kwargs.setdefault("interval", 60)
+        hub = StatusEventHub(
+            lambda: {name: dict(fields) for name, fields in states.items()},
+            lambda: resources or {"tasks": {}, "global": {"cpu": 0.0, "memory": 0}},
+            **kwargs,
+        )
+        hubs.append(hub)
+        return hub
+
+    yield _make
+    for hub in hubs:
+        hub.close()
+
+
+def test_diff_task_states_reports_changed_fields_added_and_removed_tasks():
+    changed, removed = diff_task_states(
+        {"a": {"status": "RUNNING", "attempts": 1}, "gone": {"status": "STOPPED"}},
+        {"a": {"status": "RUNNING", "attempts": 2}, "new": {"status": "QUEUED"}},
+    )
+
+    assert changed == {"a": {"attempts": 2}, "new": {"status": "QUEUED"}}
+    assert removed == ["gone"]
+
+
+def test_event_queue_calls_its_waker_after_each_put():
+    subscriber = EventQueue(maxsize=2)
+    sizes = []
+    subscriber.set_waker(lambda: sizes.append(subscriber._qsize()))
+
+    subscriber.put_nowait(b"event")
+    end_stream(subscriber)
+    assert sizes == [1, 2]
+
+    subscriber.set_waker(None)
+    subscriber.get_nowait()
+    subscriber.put_nowait(b"event")
+    assert sizes == [1, 2]
+
+
+def test_subscriber_gets_a_snapshot_then_only_changed_fields(hub_factory):
+    states = {"a": {"status": "RUNNING", "attempts": 1}, "b": {"status": "WAITING", "attempts": 3}}
+    hub = hub_factory(states, resource_interval=60)
+    subscriber = hub.subscribe()
+
+    event, data = parse_event(subscriber.get_nowait())
+    assert event == "snapshot"
+    assert data["tasks"] == states
+
+    hub.sample()
+    assert subscriber.empty()
+
+    states["a"]["status"] = "EXECUTING"
+    hub.sample()
+
+    event, data = parse_event(subscriber.get_nowait())
+    assert event == "patch"
+    assert data == {"tasks": {"a": {"status": "EXECUTING"}}, "removed": []}
+    assert subscriber.empty()
+
+
+def test_resources_are_pushed_at_the_capped_rate(hub_factory):
+    resources = {"tasks": {"a": {"cpu": 1.0, "memory": 10}}, "global": {"cpu": 1.0, "memory": 10}}
+    hub = hub_factory({"a": {"status": "RUNNING"}}, resources, resource_interval=0)
+    subscriber = hub.subscribe()
+    subscriber.get_nowait()
+
+    hub.sample()
+
+    event, data = parse_event(subscriber.get_nowait())
+    assert event == "resources"
+    # Unchanged task usage is left out, global totals are always sent
+    assert data["tasks"] == {}
+    assert data["global"] == {"cpu": 1.0, "memory": 10}
+
+
+def test_slow_subscriber_is_disconnected(hub_factory):
+    states = {"a": {"attempts": 0}}
+    hub = hub_factory(states, queue_size=2, resource_interval=60)
+    subscriber = hub.subscribe()
+
+    for attempt in range(1, 4):
+        states["a"]["attempts"] = attempt
+        hub.sample()
+
+    chunks = [subscriber.get_nowait() for _ in range(subscriber.qsize())]
+    assert chunks[-1] is None
+    assert hub.subscriber_count == 0
+
+
+def test_events_endpoint_streams_the_snapshot(dashboard_factory, make_runner_mock):
+    dashboard = dashboard_factory(make_runner_mock("a"))
+    conn = http.client.HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+    conn.request("GET", "/api/events")
+    response = conn.getresponse()
+    assert response.status == 200
+    assert response.getheader("Content-type") == "text/event-stream"
+
+    chunk = b""
+    while not chunk.endswith(b"\n\n"):
+        chunk += response.fp.readline()
+    event, data = parse_event(chunk)
+    assert event == "snapshot"
+    assert data["tasks"]["a"]["status"] == "RUNNING"
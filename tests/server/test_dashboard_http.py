@@ -0,0 +1,109 @@
+import gzip
+import http.client
+import json
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def server(tmp_path, dashboard_factory, make_runner_mock):
+    (tmp_path / "task.log").write_text("".join(f"line {i}\n" for i in range(500)))
+    runner = make_runner_mock(working_directory=str(tmp_path), stdout="task.log", stderr=None)
+    dashboard = dashboard_factory(runner, status_interval=0)
+    conn = http.client.HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+    try:
+        yield dashboard, conn
+    finally:
+        conn.close()
+
+
+def fetch(conn, method, path, body=None, **headers):
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_requests_share_one_persistent_connection(server):
+    dashboard, conn = server
+
+    paths = ["/", "/api/status", "/api/logs?task=a&type=stdout", "/api/missing"]
+    sockets = set()
+    for path in paths:
+        response, body = fetch(conn, "GET", path)
+        assert int(response.getheader("Content-Length")) == len(body)
+        if response.status == 200:
+            assert not response.will_close
+            sockets.add(id(conn.sock))
+
+    response, body = fetch(
+        conn,
+        "POST",
+        "/api/control",
+        body=json.dumps({"task": "missing", "action": "stop"}),
+        **{"Content-Type": "application/json"},
+    )
+    assert response.status == 400
+    assert int(response.getheader("Content-Length")) == len(body)
+    assert len(sockets) == 1
+
+
+def test_json_and_logs_are_gzipped_when_accepted(server):
+    _, conn = server
+
+    response, body = fetch(conn, "GET", "/api/logs?task=a&type=stdout", **{"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("Vary") == "Accept-Encoding"
+    assert gzip.decompress(body).decode().startswith("line 0\n")
+
+    response, body = fetch(conn, "GET", "/api/status", **{"Accept-Encoding": "br, gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("ETag").endswith('-gz"')
+    assert json.loads(gzip.decompress(body))["tasks"][0]["name"] == "a"
+
+    response, body = fetch(conn, "GET", "/api/status", **{"Accept-Encoding": "gzip;q=0"})
+    assert response.getheader("Content-Encoding") is None
+    assert json.loads(body)["tasks"][0]["name"] == "a"
+
+
+def test_small_bodies_are_not_compressed(server):
+    _, conn = server
+
+    response, body = fetch(
+        conn, "GET", "/api/logs?task=a&type=stdout&limit=20", **{"Accept-Encoding": "gzip"}
+    )
+    assert response.getheader("Content-Encoding") is None
+    assert body.endswith(b"line 499\n")
+
+
+def test_index_page_is_served_from_memory_with_an_etag(server):
+    dashboard, conn = server
+
+    response, raw = fetch(conn, "GET", "/")
+    etag = response.getheader("ETag")
+    assert response.status == 200
+    assert response.getheader("Cache-Control") == "no-cache"
+    assert b"<html" in raw.lower()
+
+    with patch("builtins.open", side_effect=AssertionError("page read again")):
+        response, body = fetch(conn, "GET", "/", **{"If-None-Match": etag})
+        assert response.status == 304
+        assert body == b""
+
+        response, body = fetch(conn, "GET", "/", **{"Accept-Encoding": "gzip"})
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert gzip.decompress(body) == raw
+        assert response.getheader("ETag") != etag
+
+
+@pytest.mark.parametrize("backend", ["threading", "asyncio"])
+def test_start_logs_the_bound_address(backend, dashboard_factory):
+    dashboard = dashboard_factory(start=False, backend=backend)
+    with patch("bansuri.server.dashboard.default_logger") as logger:
+        dashboard.start()
+
+    port = dashboard.server.server_address[1]
+    logger.return_value.info.assert_called_with(
+        "DASHBOARD", "Server started at http://%s:%d", "0.0.0.0", port
+    )
+    assert port != 0
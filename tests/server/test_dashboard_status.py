@@ -0,0 +1,53 @@
+import http.client
+import json
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def dashboard(dashboard_factory, make_runner_mock):
+    return dashboard_factory(make_runner_mock("a"), start=False, status_interval=0)
+
+
+def test_status_snapshot_is_shared_within_the_sampling_interval(dashboard):
+    dashboard.status_interval = 60
+
+    with patch.object(dashboard, "get_status_data", wraps=dashboard.get_status_data) as sample:
+        first = dashboard.get_status_snapshot()
+        second = dashboard.get_status_snapshot()
+
+    assert first == second
+    sample.assert_called_once()
+
+
+def test_status_version_only_changes_with_the_data(dashboard):
+    etag, body = dashboard.get_status_snapshot()
+    assert dashboard.get_status_snapshot() == (etag, body)
+
+    dashboard.orchestrator.runners["a"].status = "FAILED"
+    new_etag, new_body = dashboard.get_status_snapshot()
+
+    assert new_etag != etag
+    assert json.loads(new_body)["tasks"][0]["status"] == "FAILED"
+
+
+def test_status_endpoint_answers_304_for_a_matching_etag(dashboard):
+    dashboard.start()
+    port = dashboard.server.server_address[1]
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+
+    conn.request("GET", "/api/status")
+    response = conn.getresponse()
+    body = response.read()
+    etag = response.getheader("ETag")
+    assert response.status == 200
+    assert int(response.getheader("Content-Length")) == len(body)
+    assert json.loads(body)["tasks"][0]["name"] == "a"
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/api/status", headers={"If-None-Match": etag})
+    response = conn.getresponse()
+    assert response.status == 304
+    assert response.read() == b""
+    assert response.getheader("ETag") == etag
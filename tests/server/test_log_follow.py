@@ -0,0 +1,142 @@
+import json
+import os
+from http.client import HTTPConnection
+
+import pytest
+
+from bansuri.base.misc.inotify import inotify_available
+from bansuri.server.log_follow import LogFollowRegistry, SharedLogReader
+
+BACKENDS = [
+    pytest.param(False, id="polling"),
+    pytest.param(
+        True,
+        id="inotify",
+        marks=pytest.mark.skipif(not inotify_available(), reason="inotify not available"),
+    ),
+]
+
+
+def next_event(subscriber, timeout=3):
+    chunk = subscriber.get(timeout=timeout)
+    lines = chunk.decode("utf-8").strip().splitlines()
+    return lines[0].split(": ", 1)[1], json.loads(lines[1].split(": ", 1)[1])
+
+
+def read_appended(subscriber, expected):
+    text = ""
+    while len(text) < len(expected):
+        event, data = next_event(subscriber)
+        assert event == "append"
+        text += data
+    return text
+
+
+@pytest.fixture
+def reader_factory():
+    readers = []
+
+    def _make(path, use_inotify):
+        reader = SharedLogReader(
+            str(path), poll_interval=0.01, max_poll_interval=0.05, use_inotify=use_inotify
+        )
+        readers.append(reader)
+        return reader
+
+    yield _make
+    for reader in readers:
+        reader.close()
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_reader_streams_only_appended_bytes(tmp_path, reader_factory, use_inotify):
+    log = tmp_path / "task.log"
+    log.write_text("old line\n")
+    reader = reader_factory(log, use_inotify)
+    assert reader.backend == ("inotify" if use_inotify else "polling")
+    subscriber = reader.subscribe()
+
+    with open(log, "a") as f:
+        f.write("new line\n")
+
+    assert read_appended(subscriber, "new line\n") == "new line\n"
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_reader_follows_rotation_by_inode(tmp_path, reader_factory, use_inotify):
+    log = tmp_path / "task.log"
+    log.write_text("")
+    reader = reader_factory(log, use_inotify)
+    subscriber = reader.subscribe()
+
+    os.rename(log, tmp_path / "task.log.1")
+    log.write_text("fresh\n")
+
+    assert next_event(subscriber) == ("rotate", {"reason": "rotated"})
+    assert read_appended(subscriber, "fresh\n") == "fresh\n"
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_reader_restarts_from_the_beginning_after_truncation(tmp_path, reader_factory, use_inotify):
+    log = tmp_path / "task.log"
+    log.write_text("a rather long first line\n")
+    reader = reader_factory(log, use_inotify)
+    subscriber = reader.subscribe()
+
+    with open(log, "r+") as f:
+        f.truncate(0)
+        f.write("short\n")
+
+    assert next_event(subscriber) == ("rotate", {"reason": "truncated"})
+    assert read_appended(subscriber, "short\n") == "short\n"
+
+
+def test_registry_shares_one_reader_per_file(tmp_path):
+    log = tmp_path / "task.log"
+    log.write_text("")
+    registry = LogFollowRegistry(poll_interval=0.01, max_poll_interval=0.05)
+    try:
+        first = registry.subscribe(str(log))
+        second = registry.subscribe(str(log))
+        assert registry.reader_count() == 1
+
+        with open(log, "a") as f:
+            f.write("shared\n")
+        assert read_appended(first, "shared\n") == "shared\n"
+        assert read_appended(second, "shared\n") == "shared\n"
+
+        registry.unsubscribe(str(log), first)
+        assert registry.reader_count() == 1
+        registry.unsubscribe(str(log), second)
+        assert registry.reader_count() == 0
+    finally:
+        registry.close()
+
+
+def test_follow_endpoint_rejects_unknown_task(dashboard_factory):
+    dashboard = dashboard_factory()
+    conn = HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+    conn.request("GET", "/api/logs/follow?task=missing")
+    assert conn.getresponse().status == 404
+
+
+def test_follow_endpoint_streams_appends(tmp_path, dashboard_factory, make_runner_mock):
+    log = tmp_path / "task.log"
+    log.write_text("")
+    runner = make_runner_mock(
+        command="echo", working_directory=str(tmp_path), stdout="task.log", stderr=None
+    )
+
+    dashboard = dashboard_factory(runner)
+    conn = HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+    conn.request("GET", "/api/logs/follow?task=a&type=stdout")
+    response = conn.getresponse()
+    assert response.status == 200
+
+    with open(log, "a") as f:
+        f.write("hello\n")
+
+    chunk = b""
+    while not chunk.endswith(b"\n\n"):
+        chunk += response.fp.readline()
+    assert chunk == b'event: append\ndata: "hello\\n"\n\n'
@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from datetime import datetime
+from http.client import HTTPConnection
+from unittest.mock import patch
+
+import pytest
+
+from bansuri.server.log_index import LogLineIndex, default_index_path, parse_line_timestamp
+
+
+def write_lines(path, lines, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in lines)
+
+
+def stamped(i):
+    return f"[2024-01-01 00:{i // 60:02d}:{i % 60:02d}] [TASK] line {i} é"
+
+
+def test_parse_line_timestamp_reads_iso_and_bansuri_prefixes():
+    expected = datetime(2024, 1, 31, 12, 0, 5).timestamp()
+
+    assert parse_line_timestamp(b"[2024-01-31 12:00:05] [MASTER] started") == expected
+    assert parse_line_timestamp(b"2024-01-31T12:00:05Z level=info") == expected
+    assert parse_line_timestamp(b"no timestamp here") is None
+
+
+@pytest.mark.parametrize("line", [0, 1, 7, 8, 63, 99])
+def test_locate_line_returns_the_exact_line_start(tmp_path, line):
+    log = tmp_path / "task.log"
+    write_lines(log, [stamped(i) for i in range(100)])
+    index = LogLineIndex(str(log), stride=8)
+
+    assert index.update() == 100
+    found, offset = index.locate_line(line)
+    text, count = index.read_lines(offset, 10_000)
+
+    assert found == line
+    assert text.splitlines()[0] == stamped(line)
+    assert count == 100 - line
+
+
+def test_locate_time_finds_first_line_at_or_after_since(tmp_path):
+    log = tmp_path / "task.log"
+    write_lines(log, [stamped(i) for i in range(200)])
+    index = LogLineIndex(str(log), stride=16)
+    index.update()
+
+    line, offset = index.locate_time(datetime(2024, 1, 1, 0, 1, 40).timestamp())
+
+    assert line == 100
+    assert index.read_lines(offset, 1)[0] == stamped(100) + "\n"
+
+
+def test_update_is_incremental_and_ignores_partial_lines(tmp_path):
+    log = tmp_path / "task.log"
+    write_lines(log, ["one", "two"])
+    with open(log, "a") as f:
+        f.write("thr")
+    index = LogLineIndex(str(log), stride=2)
+
+    assert index.update() == 2
+    with open(log, "a") as f:
+        f.write("ee\nfour\n")
+    assert index.update() == 4
+
+    _, offset = index.locate_line(2)
+    assert index.read_lines(offset, 100) == ("three\nfour\n", 2)
+
+
+def test_sidecar_is_reused_and_discarded_after_rotation(tmp_path):
+    log = tmp_path / "task.log"
+    write_lines(log, [f"line {i}" for i in range(10)])
+    LogLineIndex(str(log), stride=4).update()
+    assert os.path.exists(default_index_path(str(log)))
+
+    resumed = LogLineIndex(str(log), stride=4)
+    with patch.object(resumed, "_scan", wraps=resumed._scan) as scan:
+        assert resumed.update() == 10
+    scan.assert_not_called()
+
+    os.rename(log, tmp_path / "task.log.1")
+    write_lines(log, ["fresh"])
+    assert resumed.update() == 1
+    assert resumed.read_lines(resumed.locate_line(0)[1], 100) == ("fresh\n", 1)
+
+
+def test_lookups_are_served_while_an_update_scans(tmp_path):
+    log = tmp_path / "task.log"
+    write_lines(log, [stamped(i) for i in range(10)])
+    index = LogLineIndex(str(log), stride=4)
+    index.update()
+    write_lines(log, [stamped(i) for i in range(10, 20)], mode="a")
+
+    scanning, release = threading.Event(), threading.Event()
+    scan = index._scan
+
+    def slow_scan():
+        scanning.set()
+        release.wait(5)
+        return scan()
+
+    with patch.object(index, "_scan", side_effect=slow_scan):
+        updater = threading.Thread(target=index.update)
+        updater.start()
+        assert scanning.wait(timeout=2)
+        # The previous checkpoints answer without waiting for the scan
+        began = time.monotonic()
+        assert index.locate_line(5)[0] == 5
+        assert index.locate_line(15)[0] == 10
+        assert time.monotonic() - began < 1
+        release.set()
+        updater.join(timeout=5)
+
+    assert index.locate_line(15)[0] == 15
+
+
+def test_logs_endpoint_pages_by_line(tmp_path, dashboard_factory, make_runner_mock):
+    log = tmp_path / "task.log"
+    write_lines(log, [stamped(i) for i in range(50)])
+    runner = make_runner_mock(
+        command="echo", working_directory=str(tmp_path), stdout="task.log", stderr=None
+    )
+
+    dashboard = dashboard_factory(runner)
+    conn = HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+    conn.request("GET", "/api/logs?task=a&line=10&limit=100")
+    response = conn.getresponse()
+    body = response.read().decode("utf-8")
+
+    assert response.status == 200
+    assert body.splitlines()[0] == stamped(10)
+    assert body.endswith("\n")
+    assert response.getheader("X-Log-Line") == "10"
+    assert int(response.getheader("X-Log-Next-Line")) == 10 + body.count("\n")
+
+    conn = HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+    conn.request("GET", "/api/logs?task=a&since=2024-01-01T00:00:30")
+    response = conn.getresponse()
+    assert response.read().decode("utf-8").splitlines()[0] == stamped(30)
+    assert response.getheader("X-Log-Line") == "30"
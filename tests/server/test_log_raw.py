@@ -0,0 +1,104 @@
+import os
+from email.utils import formatdate
+from http.client import HTTPConnection
+
+import pytest
+
+from bansuri.server.http_range import RangeNotSatisfiable, parse_range
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=10-", (10, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=990-5000", (990, 999)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+        ("bytes=50-10", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_parse_range_rejects_ranges_outside_the_file(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 1000)
+
+
+@pytest.fixture
+def raw_log(tmp_path, dashboard_factory, make_runner_mock):
+    log = tmp_path / "task.log"
+    content = bytes(range(256)) * 4096
+    log.write_bytes(content)
+    runner = make_runner_mock(working_directory=str(tmp_path), stdout="task.log", stderr=None)
+    port = dashboard_factory(runner).server.server_address[1]
+
+    def request(method="GET", **headers):
+        conn = HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request(method, "/api/logs/raw?task=a&type=stdout", headers=headers)
+        response = conn.getresponse()
+        return response, response.read()
+
+    return request, log, content
+
+
+def test_raw_log_is_served_whole(raw_log):
+    request, log, content = raw_log
+
+    response, body = request()
+
+    assert response.status == 200
+    assert body == content
+    assert int(response.getheader("Content-Length")) == len(content)
+    assert response.getheader("Accept-Ranges") == "bytes"
+    assert response.getheader("Last-Modified") == formatdate(os.stat(log).st_mtime, usegmt=True)
+
+
+def test_raw_log_serves_byte_ranges(raw_log):
+    request, _, content = raw_log
+
+    response, body = request(Range="bytes=1000-1999")
+    assert response.status == 206
+    assert body == content[1000:2000]
+    assert response.getheader("Content-Range") == f"bytes 1000-1999/{len(content)}"
+
+    response, body = request(Range="bytes=-10")
+    assert body == content[-10:]
+
+
+def test_raw_log_answers_416_past_the_end(raw_log):
+    request, _, content = raw_log
+
+    response, body = request(Range=f"bytes={len(content)}-")
+
+    assert response.status == 416
+    assert response.getheader("Content-Range") == f"bytes */{len(content)}"
+
+
+def test_raw_log_ignores_range_when_if_range_is_stale(raw_log):
+    request, _, content = raw_log
+
+    response, body = request(Range="bytes=0-9", **{"If-Range": '"stale"'})
+    assert response.status == 200
+    assert body == content
+
+    etag = response.getheader("ETag")
+    response, body = request(Range="bytes=0-9", **{"If-Range": etag})
+    assert response.status == 206
+    assert body == content[:10]
+
+
+def test_raw_log_head_sends_headers_only(raw_log):
+    request, _, content = raw_log
+
+    response, body = request("HEAD")
+
+    assert response.status == 200
+    assert body == b""
+    assert int(response.getheader("Content-Length")) == len(content)
@@ -0,0 +1,174 @@
+import gzip
+import json
+import os
+from http.client import HTTPConnection
+
+import pytest
+
+from bansuri.server.log_search import LogSearcher, SearchBusyError, rotated_log_files
+
+
+@pytest.fixture
+def logs(tmp_path):
+    current = tmp_path / "task.log"
+    current.write_text("".join(f"current {i}{' ERROR' if i % 10 == 0 else ''}\n" for i in range(50)))
+    rotated = tmp_path / "task.log.1"
+    rotated.write_text("old ERROR one\nfine\n")
+    archived = tmp_path / "task.log.2.gz"
+    with gzip.open(archived, "wt") as f:
+        f.write("archived fine\narchived ERROR two\n")
+    os.utime(rotated, (2_000_000_000, 2_000_000_000))
+    os.utime(archived, (1_000_000_000, 1_000_000_000))
+    return current
+
+
+def test_rotated_log_files_lists_current_then_newest_rotations(logs, tmp_path):
+    (tmp_path / ".task.log.idx").write_bytes(b"")
+    (tmp_path / "other.log").write_text("")
+
+    assert [os.path.basename(p) for p in rotated_log_files(str(logs))] == [
+        "task.log",
+        "task.log.1",
+        "task.log.2.gz",
+    ]
+
+
+def test_search_covers_plain_rotated_and_gzipped_files(logs):
+    result = LogSearcher().search(str(logs), "ERROR")
+
+    assert result["complete"] is True
+    assert [(m["file"], m["line"], m["text"]) for m in result["matches"]] == [
+        ("task.log", 0, "current 0 ERROR"),
+        ("task.log", 10, "current 10 ERROR"),
+        ("task.log", 20, "current 20 ERROR"),
+        ("task.log", 30, "current 30 ERROR"),
+        ("task.log", 40, "current 40 ERROR"),
+        ("task.log.1", 0, "old ERROR one"),
+        ("task.log.2.gz", 1, "archived ERROR two"),
+    ]
+    first = result["matches"][1]
+    with open(logs, "rb") as f:
+        f.seek(first["offset"])
+        assert f.readline() == b"current 10 ERROR\n"
+
+
+@pytest.mark.parametrize("chunk_size", [16, 4 << 20])
+def test_search_pages_with_cursor(logs, chunk_size):
+    searcher = LogSearcher(chunk_size=chunk_size)
+    seen = []
+    cursor = None
+    while True:
+        page = searcher.search(
+            str(logs), r"^(current \d+|old|archived) ERROR", regex=True, limit=2, cursor=cursor
+        )
+        seen += [(m["file"], m["line"]) for m in page["matches"]]
+        cursor = page["next_cursor"]
+        if page["complete"]:
+            break
+
+    assert seen == [
+        ("task.log", 0),
+        ("task.log", 10),
+        ("task.log", 20),
+        ("task.log", 30),
+        ("task.log", 40),
+        ("task.log.1", 0),
+        ("task.log.2.gz", 1),
+    ]
+
+
+def test_search_cursor_follows_its_file_through_a_rotation(logs, tmp_path):
+    searcher = LogSearcher()
+    page = searcher.search(str(logs), "ERROR", limit=2)
+    assert [m["line"] for m in page["matches"]] == [0, 10]
+
+    os.rename(tmp_path / "task.log.1", tmp_path / "task.log.2")
+    os.utime(tmp_path / "task.log.2", (1_500_000_000, 1_500_000_000))
+    os.rename(logs, tmp_path / "task.log.1")
+    logs.write_text("new ERROR\n")
+
+    page = searcher.search(str(logs), "ERROR", limit=10, cursor=page["next_cursor"])
+    assert [(m["file"], m["line"]) for m in page["matches"]] == [
+        ("task.log.1", 20),
+        ("task.log.1", 30),
+        ("task.log.1", 40),
+        ("task.log.2", 0),
+        ("task.log.2.gz", 1),
+    ]
+
+
+def test_search_cursor_into_a_removed_file_is_rejected(logs):
+    searcher = LogSearcher()
+    cursor = searcher.search(str(logs), "ERROR", limit=2)["next_cursor"]
+
+    os.remove(logs)
+    logs.write_text("current 0 ERROR\n")
+
+    with pytest.raises(ValueError, match="rotated away"):
+        searcher.search(str(logs), "ERROR", cursor=cursor)
+
+
+def test_search_returns_a_cursor_when_the_time_budget_is_spent(logs):
+    searcher = LogSearcher(chunk_size=16, time_budget=0)
+
+    page = searcher.search(str(logs), "ERROR")
+
+    assert page["complete"] is False
+    assert page["next_cursor"]
+    assert page["scanned_bytes"] <= 32
+
+
+def test_time_budget_is_checked_between_matches_of_a_chunk(logs):
+    page = LogSearcher(time_budget=0).search(str(logs), "ERROR")
+
+    assert [m["line"] for m in page["matches"]] == [0]
+    assert page["complete"] is False
+    page = LogSearcher().search(str(logs), "ERROR", limit=1, cursor=page["next_cursor"])
+    assert [m["line"] for m in page["matches"]] == [10]
+
+
+def test_search_rejects_invalid_input(logs):
+    searcher = LogSearcher()
+
+    with pytest.raises(ValueError):
+        searcher.search(str(logs), "")
+    with pytest.raises(ValueError):
+        searcher.search(str(logs), "(", regex=True)
+    with pytest.raises(ValueError):
+        searcher.search(str(logs), "x", cursor="garbage")
+    with pytest.raises(ValueError):
+        searcher.search(str(logs), "x" * 257)
+    with pytest.raises(ValueError, match="Nested quantifiers"):
+        searcher.search(str(logs), r"(\w+\s?)+$", regex=True)
+    # Only regexes are checked for quantifiers
+    assert searcher.search(str(logs), "(a+)+")["complete"] is True
+
+
+def test_search_is_refused_when_all_slots_are_taken(logs):
+    searcher = LogSearcher(max_concurrent=1)
+    searcher._slots.acquire()
+    try:
+        with pytest.raises(SearchBusyError):
+            searcher.search(str(logs), "ERROR")
+    finally:
+        searcher._slots.release()
+
+
+def test_search_endpoint(logs, tmp_path, dashboard_factory, make_runner_mock):
+    runner = make_runner_mock(
+        command="echo", working_directory=str(tmp_path), stdout="task.log", stderr=None
+    )
+
+    dashboard = dashboard_factory(runner)
+    port = dashboard.server.server_address[1]
+    conn = HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/api/logs/search?task=a&q=error&icase=1&limit=3")
+    response = conn.getresponse()
+    page = json.loads(response.read())
+    assert response.status == 200
+    assert [m["line"] for m in page["matches"]] == [0, 10, 20]
+    assert page["next_cursor"]
+
+    conn = HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/api/logs/search?task=a&q=(&regex=1")
+    assert conn.getresponse().status == 400
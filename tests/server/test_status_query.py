@@ -0,0 +1,168 @@
+import http.client
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from bansuri.server.dashboard import Dashboard
+from bansuri.server.status_index import StatusIndex
+
+
+def make_runner(name, status="RUNNING", tags=(), cpu=0.0, memory=0, last_run=None):
+    runner = MagicMock()
+    runner.config = SimpleNamespace(name=name, command=f"run {name}", tags=list(tags))
+    runner.status = status
+    runner.last_run = last_run
+    runner.next_run = None
+    runner.attempts = 1
+    runner.failed_attempts = 0
+    runner.get_resource_usage.return_value = {"cpu": cpu, "memory": memory}
+    return runner
+
+
+@pytest.fixture
+def runners():
+    return {
+        "web-1": make_runner("web-1", tags=["web", "prod"], cpu=5.0, memory=300),
+        "web-2": make_runner("web-2", "FAILED", ["web"], cpu=1.0, memory=100,
+                             last_run=datetime(2024, 1, 2)),
+        "batch": make_runner("batch", "FAILED", ["prod"], cpu=9.0, memory=200,
+                             last_run=datetime(2024, 1, 1)),
+        "cleanup": make_runner("cleanup", "WAITING", cpu=0.5, memory=50),
+    }
+
+
+@pytest.fixture
+def index(runners):
+    index = StatusIndex(Dashboard._task_fields, lambda name: runners[name].get_resource_usage())
+    for name, runner in runners.items():
+        index.update(name, runner)
+    return index
+
+
+def names(result):
+    return [task["name"] for task in result["tasks"]]
+
+
+def test_filters_by_status_name_and_tag(index):
+    assert names(index.query(statuses=["FAILED"])) == ["batch", "web-2"]
+    assert names(index.query(name="web-*")) == ["web-1", "web-2"]
+    assert names(index.query(name="*u*")) == ["cleanup"]
+    assert names(index.query(tag="prod")) == ["batch", "web-1"]
+    assert names(index.query(statuses=["FAILED"], tag="web")) == ["web-2"]
+    assert index.query(tag="missing") == {"tasks": [], "total": 0, "next_cursor": None}
+
+
+def test_projects_fields_and_samples_resources_only_when_needed(index, runners):
+    result = index.query(statuses=["FAILED"], fields=["name", "status"])
+    assert result["tasks"] == [
+        {"name": "batch", "status": "FAILED"},
+        {"name": "web-2", "status": "FAILED"},
+    ]
+    for runner in runners.values():
+        runner.get_resource_usage.assert_not_called()
+
+    result = index.query(name="web-1", fields=["name", "resources"])
+    assert result["tasks"] == [{"name": "web-1", "resources": {"cpu": 5.0, "memory": 300}}]
+
+    with pytest.raises(ValueError):
+        index.query(fields=["password"])
+
+
+def test_sorts_by_usage_and_last_run(index):
+    assert names(index.query(sort="cpu", descending=True)) == ["batch", "web-1", "web-2", "cleanup"]
+    assert names(index.query(sort="rss")) == ["cleanup", "web-2", "batch", "web-1"]
+    assert names(index.query(statuses=["FAILED"], sort="last_run", descending=True)) == [
+        "web-2",
+        "batch",
+    ]
+    with pytest.raises(ValueError):
+        index.query(sort="priority")
+
+
+def test_paginates_with_a_cursor(index):
+    first = index.query(sort="cpu", descending=True, limit=3)
+    assert names(first) == ["batch", "web-1", "web-2"]
+    assert first["total"] == 4
+
+    second = index.query(sort="cpu", descending=True, limit=3, cursor=first["next_cursor"])
+    assert names(second) == ["cleanup"]
+    assert second["next_cursor"] is None
+
+    with pytest.raises(ValueError):
+        index.query(cursor="not-a-cursor")
+
+
+@pytest.mark.parametrize(("sort", "descending"), [("name", False), ("cpu", False), ("status", True)])
+def test_cursor_is_rejected_with_another_sort(index, sort, descending):
+    cursor = index.query(sort="cpu", descending=True, limit=1)["next_cursor"]
+
+    with pytest.raises(ValueError, match="-cpu"):
+        index.query(sort=sort, descending=descending, cursor=cursor)
+
+
+def test_updates_move_tasks_between_indexes(index, runners):
+    runners["web-1"].status = "FAILED"
+    runners["web-1"].config.tags = ["canary"]
+    index.update("web-1", runners["web-1"])
+    index.update("cleanup", None)
+
+    assert names(index.query(statuses=["FAILED"])) == ["batch", "web-1", "web-2"]
+    assert names(index.query(tag="canary")) == ["web-1"]
+    assert names(index.query(tag="prod")) == ["batch"]
+    assert len(index) == 3
+    assert "cleanup" not in names(index.query())
+
+
+def test_status_endpoint_query(runners):
+    listeners = []
+    orchestrator = SimpleNamespace(runners=runners, add_state_listener=listeners.append)
+
+    with patch("bansuri.server.dashboard.optional_import", return_value=None):
+        dashboard = Dashboard(orchestrator, port=0)
+        dashboard.start()
+    try:
+        assert listeners == [dashboard.status_index.update]
+        for name, runner in runners.items():
+            listeners[0](name, runner)
+
+        conn = http.client.HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+        conn.request("GET", "/api/status?status=failed&fields=name,status&limit=1")
+        response = conn.getresponse()
+        result = json.loads(response.read())
+        assert response.status == 200
+        assert result["tasks"] == [{"name": "batch", "status": "FAILED"}]
+        assert result["total"] == 2
+
+        conn.request("GET", "/api/status?status=failed&fields=name&cursor=" + result["next_cursor"])
+        response = conn.getresponse()
+        assert json.loads(response.read())["tasks"] == [{"name": "web-2"}]
+
+        conn.request("GET", "/api/status?sort=-cpu&fields=name,resources&limit=1")
+        response = conn.getresponse()
+        assert json.loads(response.read())["tasks"] == [
+            {"name": "batch", "resources": {"cpu": 9.0, "memory": 200}}
+        ]
+
+        conn.request("GET", "/api/status?sort=last_run&cursor=" + result["next_cursor"])
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 400
+
+        conn.request("GET", "/api/status?fields=secret")
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 400
+    finally:
+        dashboard.stop()
+
+
+def test_status_query_without_change_notifications(runners):
+    with patch("bansuri.server.dashboard.optional_import", return_value=None):
+        dashboard = Dashboard(SimpleNamespace(runners=runners), port=0)
+
+    assert names(dashboard.query_status(statuses=["WAITING"])) == ["cleanup"]
+    runners["cleanup"].status = "RUNNING"
+    assert names(dashboard.query_status(statuses=["WAITING"])) == []
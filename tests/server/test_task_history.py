@@ -0,0 +1,75 @@
+import http.client
+import json
+import time
+
+from bansuri.server.history import ResourceHistory
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_only_requested_tasks_are_sampled():
+    usage = {"a": {"cpu": 1.0, "memory": 10}, "b": {"cpu": 2.0, "memory": 20}}
+    sampled = []
+
+    def sample(name):
+        sampled.append(name)
+        return usage.get(name)
+
+    history = ResourceHistory(sample, size=3, interval=0.01)
+    try:
+        assert history.get("missing") is None
+        first = history.get("a")
+        assert first["samples"][0][1:] == [1.0, 10]
+
+        assert wait_for(lambda: len(history.get("a")["samples"]) == 3)
+        assert "b" not in sampled
+        assert history.watched() == ["a"]
+    finally:
+        history.close()
+
+
+def test_timelines_are_dropped_once_nobody_watches_them():
+    usage = {"a": {"cpu": 1.0, "memory": 10}}
+    history = ResourceHistory(usage.get, interval=0.01, ttl=0.05)
+    try:
+        history.get("a")
+        assert wait_for(lambda: history.watched() == [])
+        assert len(history.get("a")["samples"]) == 1
+    finally:
+        history.close()
+
+
+def test_removed_tasks_stop_being_sampled():
+    usage = {"a": {"cpu": 1.0, "memory": 10}}
+    history = ResourceHistory(usage.get, interval=0.01)
+    try:
+        history.get("a")
+        del usage["a"]
+        assert wait_for(lambda: history.watched() == [])
+        assert history.get("a") is None
+    finally:
+        history.close()
+
+
+def test_history_endpoint(dashboard_factory, make_runner_mock):
+    runner = make_runner_mock(command="echo")
+    runner.get_resource_usage.return_value = {"cpu": 3.0, "memory": 42}
+
+    dashboard = dashboard_factory(runner)
+    conn = http.client.HTTPConnection("127.0.0.1", dashboard.server.server_address[1], timeout=5)
+    conn.request("GET", "/api/tasks/history?task=a")
+    response = conn.getresponse()
+    history = json.loads(response.read())
+    assert response.status == 200
+    assert history["name"] == "a"
+    assert history["samples"][0][1:] == [3.0, 42]
+
+    conn.request("GET", "/api/tasks/history?task=missing")
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 404
@@ -3,6 +3,8 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from bansuri.alerts.cmd_notifier import CommandNotifier
+from bansuri.alerts.mail_notifier import MailNotifier
+from bansuri.alerts.webhook_notifier import WebhookNotifier
 from bansuri.task_runner import TaskRunner
 
 
@@ -45,6 +47,46 @@ def test_create_notifier_prefers_task_command_over_global_command(make_script_co
     assert runner.notifier.notify_command == "task-alert"
 
 
+def test_create_notifier_builds_webhook_notifier(make_script_config, global_config):
+    config = make_script_config(
+        notify="webhook", notify_options={"url": "http://alerts.local/hook", "retries": 4}
+    )
+
+    runner = TaskRunner(config, global_config)
+
+    assert isinstance(runner.notifier, WebhookNotifier)
+    assert runner.notifier.retries == 4
+    assert runner.notifier.destination == "webhook:http://alerts.local/hook"
+
+
+def test_create_notifier_disables_invalid_webhook(make_script_config, global_config):
+    config = make_script_config(notify="webhook", notify_options={"url": "alerts.local"})
+
+    runner = TaskRunner(config, global_config)
+
+    assert runner.notifier is None
+
+
+def test_create_notifier_builds_mail_notifier_from_options(make_script_config, global_config):
+    config = make_script_config(
+        notify="mail", notify_options={"host": "smtp.local", "to": "ops@example.com"}
+    )
+    global_config.notify_command = "global-alert"
+
+    runner = TaskRunner(config, global_config)
+
+    assert isinstance(runner.notifier, MailNotifier)
+    assert runner.notifier.destination == "mail:smtp.local:25:ops@example.com"
+
+
+def test_create_notifier_disables_invalid_mail_options(make_script_config, global_config):
+    config = make_script_config(notify="mail", notify_options={"host": "smtp.local"})
+
+    runner = TaskRunner(config, global_config)
+
+    assert runner.notifier is None
+
+
 def test_create_notifier_returns_none_without_notify_command(make_script_config, global_config):
     config = make_script_config(notify="mail")
 
@@ -100,3 +142,66 @@ def test_start_does_not_replace_running_thread(script_config, global_config):
         runner.start()
 
     mock_thread_cls.assert_not_called()
+
+
+def test_apply_config_swaps_config_and_rebuilds_notifier(make_script_config, global_config):
+    runner = TaskRunner(make_script_config(), global_config)
+    new_config = make_script_config(notify="command", notify_command="send-alert")
+
+    runner.apply_config(new_config, global_config, ["notify", "notify_command"])
+
+    assert runner.config is new_config
+    assert isinstance(runner.notifier, CommandNotifier)
+    assert runner.notifier.notify_command == "send-alert"
+
+
+def test_apply_config_keeps_notifier_when_notify_settings_are_unchanged(
+    make_script_config, global_config
+):
+    config = make_script_config(notify="command", notify_command="send-alert")
+    runner = TaskRunner(config, global_config)
+    notifier = runner.notifier
+
+    new_config = make_script_config(
+        notify="command", notify_command="send-alert", description="updated"
+    )
+
+    runner.apply_config(new_config, global_config, ["description"])
+
+    assert runner.notifier is notifier
+
+
+def test_status_and_config_changes_are_reported(make_script_config, global_config):
+    runner = TaskRunner(make_script_config(), global_config)
+    seen = []
+    runner.on_state_change = lambda r: seen.append(r.status)
+
+    runner.mark_queued()
+    runner.apply_config(make_script_config(description="updated"), global_config, ["description"])
+    runner.apply_config(runner.config, global_config, [])
+
+    assert seen == ["QUEUED", "QUEUED"]
+
+
+def test_failing_state_listener_does_not_break_the_runner(script_config, global_config):
+    runner = TaskRunner(script_config, global_config)
+    runner.on_state_change = MagicMock(side_effect=RuntimeError("boom"))
+
+    runner.mark_queued()
+
+    assert runner.status == "QUEUED"
+
+
+def test_resource_usage_is_sampled_once_per_interval(script_config, global_config):
+    runner = TaskRunner(script_config, global_config)
+    sample = MagicMock(side_effect=[{"cpu": 12.5, "memory": 10}, {"cpu": 3.0, "memory": 20}])
+
+    with patch.object(runner, "_sample_resource_usage", sample), patch(
+        "bansuri.task_runner.time.monotonic", side_effect=[100.0, 100.4, 101.5]
+    ):
+        first = runner.get_resource_usage()
+        # The events stream, the history and the status read the same sample
+        assert runner.get_resource_usage() == first == {"cpu": 12.5, "memory": 10}
+        assert runner.get_resource_usage() == {"cpu": 3.0, "memory": 20}
+
+    assert sample.call_count == 2
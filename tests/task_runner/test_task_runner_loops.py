@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
@@ -123,3 +124,99 @@ def test_cron_execution_loop_waits_for_next_scheduled_run(make_script_config, gl
 
     mock_wait.assert_called_once()
     assert runner.next_run == expected_next_run
+
+
+@pytest.mark.parametrize(
+    ("scheduling", "step", "expected"),
+    [
+        pytest.param("none", None, [2, 2, 2, 2, 2, 2], id="fixed"),
+        pytest.param("dynamic-linear", None, [2, 4, 6, 8, 10, 12], id="linear"),
+        pytest.param("dynamic-linear", 10, [2, 12, 22, 30, 30, 30], id="linear-step"),
+        pytest.param("dynamic", None, [2, 4, 8, 16, 30, 30], id="exponential"),
+        pytest.param("dynamic", 3, [2, 6, 18, 30, 30, 30], id="exponential-step"),
+    ],
+)
+def test_restart_delay_follows_after_scheduling(
+    make_script_config, global_config, scheduling, step, expected
+):
+    config = make_script_config(
+        on_fail="restart",
+        restart_delay="2s",
+        restart_scheduling=scheduling,
+        restart_step=step,
+        restart_max_delay="30s",
+    )
+    runner = TaskRunner(config, global_config)
+    runner._run_started = time.monotonic()
+
+    assert [runner._restart_backoff() for _ in range(6)] == expected
+
+
+def test_restart_backoff_resets_after_a_healthy_run(make_script_config, global_config):
+    config = make_script_config(
+        restart_delay="2s", restart_scheduling="dynamic", restart_max_delay="30s"
+    )
+    runner = TaskRunner(config, global_config)
+    runner._restart_streak = 5
+
+    runner._run_started = time.monotonic() - 31
+
+    assert runner._restart_backoff() == 2
+
+
+def test_restart_jitter_stays_within_bounds(make_script_config, global_config):
+    config = make_script_config(restart_delay="10s", restart_jitter=0.5)
+    runner = TaskRunner(config, global_config)
+    runner._run_started = time.monotonic()
+
+    delays = [runner._restart_backoff() for _ in range(50)]
+
+    assert all(5 <= delay <= 15 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_flapping_task_enters_cooldown(make_script_config, global_config):
+    config = make_script_config(
+        on_fail="restart",
+        max_attempts=100,
+        restart_scheduling="dynamic",
+        restart_flap_limit=3,
+        restart_cooldown="2m",
+    )
+    runner = TaskRunner(config, global_config)
+    statuses = []
+    runner.on_state_change = lambda r: statuses.append(r.status)
+
+    def fake_run_process():
+        runner._last_return_code = 1
+
+    waits = []
+
+    def fake_wait(timeout):
+        waits.append(timeout)
+        return len(waits) == 4
+
+    with (
+        patch.object(runner, "_run_process", side_effect=fake_run_process),
+        patch.object(runner.stop_event, "wait", side_effect=fake_wait),
+    ):
+        runner._simple_execution_loop()
+
+    assert waits == [5, 10, 20, 120]
+    assert statuses[-1] == "COOLDOWN"
+    assert not runner._restart_times
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"restart_scheduling": "exponential"},
+        {"restart_scheduling": "dynamic", "restart_step": 0.5},
+        {"restart_step": "fast"},
+        {"restart_jitter": 2},
+        {"restart_flap_limit": -1},
+    ],
+)
+def test_invalid_restart_params_are_rejected(make_script_config, overrides):
+    with pytest.raises(ValueError):
+        make_script_config(**overrides).validate()
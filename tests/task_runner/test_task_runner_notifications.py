@@ -1,20 +1,30 @@
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from bansuri.alerts.dispatcher import NotificationDispatcher
 from bansuri.alerts.notifier import FailureInfo
+from bansuri.base.config_manager import NotificationsConfig
+from bansuri.base.logger import WARNING
 from bansuri.task_runner import TaskRunner
 
 
 def test_handle_notify_builds_failure_info_for_notifier(make_script_config, global_config):
-    config = make_script_config(notify="command", notify_command="send-alert")
+    config = make_script_config(notify="command", notify_command="send-alert", notify_after="0")
     runner = TaskRunner(config, global_config)
     runner.failed_attempts = 2
-    runner.notifier = MagicMock()
+    runner.notifier = MagicMock(retries=0)
     runner.notifier.notify.return_value = True
+    runner.dispatcher = NotificationDispatcher()
 
-    runner._handle_notify(1, "out", "err")
+    with patch.object(runner, "log") as mock_log:
+        runner._handle_notify(1, "out", "err")
+        assert runner.dispatcher.flush(timeout=5)
+    runner.dispatcher.close()
 
+    mock_log.assert_called_with("Notification sent successfully")
     runner.notifier.notify.assert_called_once()
     failure = runner.notifier.notify.call_args.args[0]
     assert isinstance(failure, FailureInfo)
@@ -25,6 +35,34 @@ def test_handle_notify_builds_failure_info_for_notifier(make_script_config, glob
     assert failure.stderr == "err"
 
 
+def test_handle_notify_does_not_wait_for_delivery(make_script_config, global_config):
+    config = make_script_config(notify="command", notify_command="send-alert", notify_after="0")
+    runner = TaskRunner(config, global_config)
+    taken, release = threading.Event(), threading.Event()
+    runner.notifier = MagicMock(retries=0)
+    runner.notifier.notify.side_effect = lambda info: taken.set() or release.wait(5)
+    runner.dispatcher = NotificationDispatcher(
+        workers=1, max_queue=1, settings=NotificationsConfig(window=0, rate_limit=0)
+    )
+
+    try:
+        with patch.object(runner, "log") as mock_log:
+            started = time.monotonic()
+            runner._handle_notify(1, "out", "err")
+            assert taken.wait(5)
+            runner._handle_notify(1, "out", "err")
+            runner._handle_notify(1, "out", "err")
+            assert time.monotonic() - started < 1
+            # One being delivered, one queued, the last one dropped
+            mock_log.assert_called_with(
+                "WARNING: Notification queue is full, notification dropped", WARNING
+            )
+    finally:
+        release.set()
+        runner.dispatcher.close()
+    assert runner.dispatcher.metrics()["dropped"] == 1
+
+
 @pytest.mark.parametrize(
     ("mode", "failed_attempts", "threshold", "max_attempts", "on_fail", "should_notify"),
     [
@@ -99,3 +137,99 @@ def test_check_max_executions_ignores_cron_limit(make_script_config, global_conf
     runner.attempts = 10
 
     assert runner._check_max_executions() is False
+
+
+@pytest.fixture
+def delayed_runner(make_script_config, global_config):
+    def _make(**overrides):
+        values = {"notify": "command", "notify_command": "send-alert", "notify_after": "50ms"}
+        values.update(overrides)
+        runner = TaskRunner(make_script_config(**values), global_config)
+        runner.notifier = MagicMock(retries=0)
+        runner.notifier.notify.return_value = True
+        runner.dispatcher = NotificationDispatcher(
+            settings=NotificationsConfig(window=0, rate_limit=0)
+        )
+        return runner
+
+    runners = []
+    yield lambda **overrides: runners.append(_make(**overrides)) or runners[-1]
+    for runner in runners:
+        runner.dispatcher.close()
+
+
+def wait_for_timers(runner):
+    deadline = time.monotonic() + 5
+    while len(runner.dispatcher.timers) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert runner.dispatcher.flush(timeout=5)
+
+
+def test_delayed_notification_is_cancelled_when_the_task_recovers(delayed_runner):
+    runner = delayed_runner()
+
+    runner._handle_notify(1, "out", "err")
+    assert len(runner.dispatcher.timers) == 1
+    runner._record_successful_execution()
+    assert len(runner.dispatcher.timers) == 0
+
+    time.sleep(0.1)
+    runner.notifier.notify.assert_not_called()
+
+
+def test_failures_during_the_delay_are_sent_as_one_notification(delayed_runner):
+    runner = delayed_runner()
+
+    runner._handle_notify(1, "out", "err")
+    runner._handle_notify(2, "out", "again")
+    assert len(runner.dispatcher.timers) == 1
+    wait_for_timers(runner)
+
+    runner.notifier.notify.assert_called_once()
+    failure = runner.notifier.notify.call_args.args[0]
+    assert failure.return_code == 2
+    assert failure.occurrences == 2
+
+
+def test_service_running_again_after_the_delay_is_not_reported(delayed_runner):
+    runner = delayed_runner(on_fail="restart", max_attempts=5)
+    assert runner.is_service
+
+    runner._handle_notify(1, "out", "err")
+    runner._status = "EXECUTING"
+    wait_for_timers(runner)
+    runner.notifier.notify.assert_not_called()
+
+    runner._handle_notify(1, "out", "err")
+    runner._status = "WAITING_RETRY"
+    wait_for_timers(runner)
+    runner.notifier.notify.assert_called_once()
+
+
+def test_exhausted_notifications_are_not_delayed(delayed_runner):
+    runner = delayed_runner(notify_mode="on-exhausted", notify_after="300s")
+
+    runner._handle_notify(1, "out", "err")
+    assert len(runner.dispatcher.timers) == 0
+    assert runner.dispatcher.flush(timeout=5)
+    runner.notifier.notify.assert_called_once()
+
+
+def test_stopping_the_task_cancels_the_delayed_notification(delayed_runner):
+    runner = delayed_runner(notify_after="300s")
+
+    runner._handle_notify(1, "out", "err")
+    assert runner.stop()
+
+    assert len(runner.dispatcher.timers) == 0
+    assert runner.dispatcher.metrics()["dropped"] == 0
+
+
+def test_delayed_notifications_left_on_close_are_counted_as_dropped(delayed_runner):
+    runner = delayed_runner(notify_after="300s")
+
+    runner._handle_notify(1, "out", "err")
+    runner.dispatcher.close()
+
+    assert runner.dispatcher.metrics()["dropped"] == 1
+    runner.notifier.notify.assert_not_called()
@@ -4,6 +4,7 @@ from textwrap import dedent
 import pytest
 
 from bansuri.base.config_manager import BansuriConfig, ScriptConfig
+from bansuri.base.logger import default_logger
 
 
 @pytest.fixture
@@ -33,6 +34,9 @@ def test_script_config_defaults_are_initialized():
     assert config.notify_mode == "after-fail"
     assert config.notify_threshold == 1
     assert config.restart_delay == "5s"
+    assert config.restart_scheduling == "none"
+    assert config.restart_jitter == 0
+    assert config.restart_flap_limit == 0
 
 
 @pytest.mark.parametrize(
@@ -104,11 +108,18 @@ def test_load_from_file_normalizes_grouped_scripts_and_merges_defaults(write_con
                 "failure-control": {
                     "on-fail": "restart",
                     "max-attempts": "4",
-                    "restart-params": {"after": "30s"},
+                    "restart-params": {
+                        "after": "30s",
+                        "after-scheduling": "dynamic",
+                        "after-step": "1.5",
+                        "max-delay": "10m",
+                        "flap-limit": "4",
+                    },
                     "notify": {
                         "enabled": "true",
                         "mode": "after-many",
                         "after-threshold": "3",
+                        "after": "2m",
                         "handler": "command",
                         "handler-config": "/usr/local/bin/default-notify",
                     },
@@ -122,6 +133,7 @@ def test_load_from_file_normalizes_grouped_scripts_and_merges_defaults(write_con
                         "command": "echo cleanup",
                         "description": "nightly cleanup",
                         "working-directory": "/srv/jobs",
+                        "priority": "5",
                     },
                     "scheduling": {"scheduler": "timer", "params": "5m"},
                     "failure-control": {
@@ -142,6 +154,7 @@ def test_load_from_file_normalizes_grouped_scripts_and_merges_defaults(write_con
     assert script.command == "echo cleanup"
     assert script.description == "nightly cleanup"
     assert script.working_directory == "/srv/jobs"
+    assert script.priority == 5
     assert script.timer == "5m"
     assert script.schedule_cron is None
     assert script.timeout == "15m"
@@ -153,8 +166,14 @@ def test_load_from_file_normalizes_grouped_scripts_and_merges_defaults(write_con
     assert script.notify == "command"
     assert script.notify_mode == "after-many"
     assert script.notify_threshold == 3
+    assert script.notify_after == "2m"
     assert script.notify_command == "/usr/local/bin/task-notify"
     assert script.restart_delay == "30s"
+    assert script.restart_scheduling == "dynamic"
+    assert script.restart_step == 1.5
+    assert script.restart_max_delay == "10m"
+    assert script.restart_flap_limit == 4
+    assert script.restart_cooldown == "5m"
 
 
 def test_load_from_file_supports_legacy_flat_scripts_and_warns_on_unknown_fields(
@@ -181,6 +200,7 @@ def test_load_from_file_supports_legacy_flat_scripts_and_warns_on_unknown_fields
     assert script.depends_on == ["bootstrap"]
     assert script.working_directory == "/tmp/legacy"
 
+    default_logger().flush()
     captured = capsys.readouterr()
     assert "Found key unknown_field but not recognized as a bansuri valid field" in captured.out
 
@@ -208,6 +228,42 @@ def test_load_from_file_supports_json_with_comments(write_config):
     assert config.scripts[0].command == 'printf "// keep /* this */"'
 
 
+def test_load_from_file_supports_trailing_commas_and_block_comments(write_config):
+    config_path = write_config(
+        """
+        {
+          "version": "1.0",
+          "scripts": [
+            {
+              "name": "trailing",
+              "command": "echo \\"a, ]\\" // not a comment",
+              "timer": "5m", /* multi-line
+                               block comment */
+            },
+          ],
+        }
+        """
+    )
+
+    config = BansuriConfig.load_from_file(str(config_path))
+
+    assert config.scripts[0].command == 'echo "a, ]" // not a comment'
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        pytest.param('{"a": 1, // c\n "b": 2}', '{"a": 1, \n "b": 2}', id="line-comment"),
+        pytest.param('[1, /* a\n b */ 2]', "[1, \n 2]", id="block-comment-keeps-newlines"),
+        pytest.param("[1, 2, ]", "[1, 2 ]", id="trailing-comma-array"),
+        pytest.param('{"a": 1, /* x */ }', '{"a": 1  }', id="trailing-comma-before-comment"),
+        pytest.param('{"u": "http://x/*y*/"}', '{"u": "http://x/*y*/"}', id="string-untouched"),
+    ],
+)
+def test_strip_json_comments_handles_jsonc_tokens(text, expected):
+    assert BansuriConfig._strip_json_comments(text) == expected
+
+
 def test_load_from_file_raises_for_missing_file():
     with pytest.raises(FileNotFoundError, match="Configuration file not found"):
         BansuriConfig.load_from_file("does-not-exist.json")
@@ -273,6 +329,16 @@ def test_load_from_file_wraps_validation_errors_with_script_name(write_config):
             "command notify handler requires string handler-config. Notifications disabled.",
             id="non-string-command-config",
         ),
+        pytest.param(
+            {"enabled": True, "handler": "webhook", "handler-config": ["http://hook"]},
+            "webhook notify handler requires a URL or an object handler-config.",
+            id="invalid-webhook-config",
+        ),
+        pytest.param(
+            {"enabled": True, "handler": "mail", "handler-config": "ops@example.com"},
+            "mail notify handler requires an object handler-config.",
+            id="invalid-mail-config",
+        ),
     ],
 )
 def test_load_from_file_disables_invalid_notify_config_and_logs_warning(
@@ -297,10 +363,63 @@ def test_load_from_file_disables_invalid_notify_config_and_logs_warning(
     assert script.notify == "none"
     assert script.notify_command is None
 
+    default_logger().flush()
     captured = capsys.readouterr()
     assert expected_message in captured.out
 
 
+@pytest.mark.parametrize(
+    ("handler_config", "expected"),
+    [
+        ("http://alerts.local/hook", {"url": "http://alerts.local/hook"}),
+        ({"url": "http://alerts.local/hook", "retries": 1}, {"url": "http://alerts.local/hook", "retries": 1}),
+    ],
+)
+def test_load_from_file_accepts_webhook_notify_handler(write_config, handler_config, expected):
+    config_path = write_config(
+        {
+            "scripts": [
+                {
+                    "general": {"name": "notify-task", "command": "echo 1"},
+                    "scheduling": {"scheduler": "timer", "params": "5m"},
+                    "failure-control": {
+                        "notify": {"enabled": True, "handler": "webhook", "handler-config": handler_config}
+                    },
+                    "logging": {},
+                }
+            ]
+        }
+    )
+
+    script = BansuriConfig.load_from_file(str(config_path)).scripts[0]
+
+    assert script.notify == "webhook"
+    assert script.notify_options == expected
+
+
+def test_load_from_file_accepts_mail_notify_handler(write_config):
+    handler_config = {"host": "smtp.local", "to": ["ops@example.com"], "starttls": True}
+    config_path = write_config(
+        {
+            "scripts": [
+                {
+                    "general": {"name": "notify-task", "command": "echo 1"},
+                    "scheduling": {"scheduler": "timer", "params": "5m"},
+                    "failure-control": {
+                        "notify": {"enabled": True, "handler": "mail", "handler-config": handler_config}
+                    },
+                    "logging": {},
+                }
+            ]
+        }
+    )
+
+    script = BansuriConfig.load_from_file(str(config_path)).scripts[0]
+
+    assert script.notify == "mail"
+    assert script.notify_options == handler_config
+
+
 def test_merge_dicts_recursively_merges_nested_values():
     merged = BansuriConfig._merge_dicts(
         {
@@ -322,3 +441,77 @@ def test_merge_dicts_recursively_merges_nested_values():
         "timeout": "5m",
         "timer": "10m",
     }
+
+
+def test_load_from_file_parses_startup_ramp_settings(write_config):
+    config_path = write_config(
+        {
+            "startup": {"rate": "20", "services-first": "true"},
+            "scripts": [{"name": "a", "command": "echo 1", "timer": "1m"}],
+        }
+    )
+
+    config = BansuriConfig.load_from_file(str(config_path))
+
+    assert config.startup.rate == 20.0
+    assert config.startup.services_first is True
+
+
+@pytest.mark.parametrize("startup", [{"rate": -1}, {"rate": "fast"}, "10/s"])
+def test_load_from_file_rejects_invalid_startup_settings(write_config, startup):
+    config_path = write_config({"startup": startup, "scripts": []})
+
+    with pytest.raises(ValueError):
+        BansuriConfig.load_from_file(str(config_path))
+
+
+def test_load_from_file_parses_notification_settings(write_config):
+    config_path = write_config(
+        {
+            "notifications": {"window": "30", "digest": "false", "rate-limit": 2},
+            "scripts": [],
+        }
+    )
+
+    config = BansuriConfig.load_from_file(str(config_path))
+
+    assert config.notifications.window == 30.0
+    assert config.notifications.digest is False
+    assert config.notifications.rate_limit == 2
+    assert config.notifications.rate_period == 60
+
+
+@pytest.mark.parametrize(
+    "notifications", [{"window": -1}, {"rate-limit": "many"}, {"rate-period": 0}, []]
+)
+def test_load_from_file_rejects_invalid_notification_settings(write_config, notifications):
+    config_path = write_config({"notifications": notifications, "scripts": []})
+
+    with pytest.raises(ValueError):
+        BansuriConfig.load_from_file(str(config_path))
+
+
+def test_load_from_file_parses_task_tags(write_config):
+    config_path = write_config(
+        {
+            "scripts": [
+                {"general": {"name": "a", "command": "echo 1", "tags": ["web", "prod"]},
+                 "scheduling": {"scheduler": "timer", "params": "1m"}},
+                {"name": "b", "command": "echo 2", "timer": "1m", "tags": "batch, prod"},
+                {"name": "c", "command": "echo 3", "timer": "1m"},
+            ]
+        }
+    )
+
+    config = BansuriConfig.load_from_file(str(config_path))
+
+    assert [script.tags for script in config.scripts] == [["web", "prod"], ["batch", "prod"], []]
+
+
+def test_load_from_file_rejects_invalid_tags(write_config):
+    config_path = write_config(
+        {"scripts": [{"name": "a", "command": "echo 1", "timer": "1m", "tags": [1, 2]}]}
+    )
+
+    with pytest.raises(ValueError, match="tags"):
+        BansuriConfig.load_from_file(str(config_path))
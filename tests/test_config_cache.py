@@ -0,0 +1,136 @@
+import json
+from dataclasses import field, fields, make_dataclass
+from unittest.mock import patch
+
+import pytest
+
+from bansuri.base.config_loader import ConfigLoader
+from bansuri.base.config_manager import BansuriConfig, NotificationsConfig, ScriptConfig
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "scripts.json"
+
+    def _write(description="first"):
+        path.write_text(
+            json.dumps(
+                {
+                    "version": "1.0",
+                    "scripts": [
+                        {
+                            "name": "task",
+                            "command": "echo 1",
+                            "timer": "5m",
+                            "description": description,
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+        return path
+
+    return _write
+
+
+def test_first_load_of_a_new_process_is_served_from_the_snapshot(tmp_path, config_file):
+    path = config_file()
+    cache_path = str(tmp_path / "compiled.cache")
+    expected = ConfigLoader(str(path), cache_path=cache_path).load()
+
+    loader = ConfigLoader(str(path), cache_path=cache_path)
+    with patch.object(BansuriConfig, "load_from_file") as mock_load:
+        config = loader.load()
+
+    mock_load.assert_not_called()
+    assert loader.cache_hit is True
+    assert config == expected
+
+
+def test_snapshot_hit_skips_validation(tmp_path, config_file):
+    path = config_file()
+    cache_path = str(tmp_path / "compiled.cache")
+    ConfigLoader(str(path), cache_path=cache_path).load()
+
+    loader = ConfigLoader(str(path), cache_path=cache_path)
+    with patch.object(ScriptConfig, "validate") as validate:
+        loader.load()
+
+    assert loader.cache_hit is True
+    validate.assert_not_called()
+
+
+def test_snapshot_is_ignored_when_the_source_changes(tmp_path, config_file):
+    path = config_file()
+    cache_path = str(tmp_path / "compiled.cache")
+    ConfigLoader(str(path), cache_path=cache_path).load()
+
+    config_file(description="second")
+    loader = ConfigLoader(str(path), cache_path=cache_path)
+    config = loader.load()
+
+    assert loader.cache_hit is False
+    assert config.scripts[0].description == "second"
+
+
+def test_snapshot_is_ignored_after_a_bansuri_upgrade(tmp_path, config_file):
+    path = config_file()
+    cache_path = str(tmp_path / "compiled.cache")
+    ConfigLoader(str(path), cache_path=cache_path).load()
+
+    loader = ConfigLoader(str(path), cache_path=cache_path)
+    with patch("bansuri.__version__", "999.0"):
+        loader.load()
+
+    assert loader.cache_hit is False
+
+
+def test_snapshot_is_ignored_when_a_settings_block_gains_a_field(tmp_path, config_file):
+    path = config_file()
+    cache_path = str(tmp_path / "compiled.cache")
+    ConfigLoader(str(path), cache_path=cache_path).load()
+    changed = make_dataclass(
+        "NotificationsConfig",
+        [(f.name, f.type, field(default=f.default)) for f in fields(NotificationsConfig)]
+        + [("burst", int, field(default=0))],
+    )
+
+    loader = ConfigLoader(str(path), cache_path=cache_path)
+    with patch.dict("bansuri.base.config_cache._BLOCKS", notifications=changed):
+        config = loader.load()
+
+    assert loader.cache_hit is False
+    assert config.notifications == NotificationsConfig()
+
+
+def test_reload_of_unchanged_sources_neither_hashes_nor_stores(tmp_path, config_file):
+    path = config_file()
+    loader = ConfigLoader(str(path), cache_path=str(tmp_path / "compiled.cache"))
+    loader.load()
+
+    with patch.object(loader.cache, "store") as store, patch(
+        "bansuri.base.config_cache.file_digest"
+    ) as digest:
+        config = loader.load()
+    store.assert_not_called()
+    digest.assert_not_called()
+    assert config.scripts[0].description == "first"
+
+    config_file(description="second")
+    with patch.object(loader.cache, "store") as store:
+        assert loader.load().scripts[0].description == "second"
+    store.assert_called_once()
+
+
+def test_corrupt_snapshot_falls_back_to_a_full_parse(tmp_path, config_file):
+    path = config_file()
+    cache_path = tmp_path / "compiled.cache"
+    cache_path.write_bytes(b"garbage")
+
+    loader = ConfigLoader(str(path), cache_path=str(cache_path))
+    config = loader.load()
+
+    assert loader.cache_hit is False
+    assert config.scripts[0].name == "task"
+    assert cache_path.read_bytes().startswith(b"BANSURI-COMPILED-CONFIG")
@@ -0,0 +1,70 @@
+import pytest
+
+from bansuri.base.config_diff import ReloadReport, diff_script_configs
+from bansuri.base.config_manager import ScriptConfig
+
+
+def _task(**overrides):
+    values = {"name": "svc", "command": "run-service", "timer": "0"}
+    values.update(overrides)
+    return ScriptConfig(**values)
+
+
+def test_identical_configs_produce_an_empty_change():
+    change = diff_script_configs(_task(), _task())
+
+    assert not change
+    assert change.requires_restart is False
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        pytest.param({"description": "new"}, id="description"),
+        pytest.param({"notify_command": "send-alert"}, id="notify-command"),
+        pytest.param({"max_attempts": 5}, id="max-attempts"),
+        pytest.param({"stdout": "/tmp/out.log"}, id="log-path"),
+    ],
+)
+def test_non_disruptive_fields_are_hot_applicable(overrides):
+    change = diff_script_configs(_task(), _task(**overrides))
+
+    assert change.requires_restart is False
+    assert change.hot_fields == list(overrides)
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        pytest.param({"command": "run-other"}, id="command"),
+        pytest.param({"working_directory": "/srv"}, id="cwd"),
+        pytest.param({"environment_file": ".env"}, id="env"),
+    ],
+)
+def test_spawn_fields_require_restart(overrides):
+    change = diff_script_configs(_task(), _task(**overrides))
+
+    assert change.requires_restart is True
+    assert change.restart_fields == list(overrides)
+
+
+def test_timer_period_change_is_hot_but_mode_switch_restarts():
+    period_change = diff_script_configs(_task(timer="5m"), _task(timer="10m"))
+    mode_change = diff_script_configs(_task(timer="0"), _task(timer="10m"))
+
+    assert period_change.hot_fields == ["timer"]
+    assert mode_change.restart_fields == ["timer"]
+
+
+def test_reload_report_lists_changes_per_task():
+    report = ReloadReport(
+        added=["new"],
+        restarted={"svc": ["command"]},
+        hot_applied={"job": ["description", "max_attempts"]},
+    )
+
+    lines = report.summary_lines()
+
+    assert "1 added, 0 removed, 1 restarted, 1 hot-applied" in lines[0]
+    assert "  restarted 'svc': command" in lines
+    assert "  hot-applied to 'job': description, max_attempts" in lines
@@ -0,0 +1,119 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from bansuri.base.config_loader import ConfigLoader, resolve_config_files
+from bansuri.base.config_manager import BansuriConfig
+
+
+def _task(name, **general):
+    return {
+        "general": {"name": name, "command": f"echo {name}", **general},
+        "scheduling": {"scheduler": "timer", "params": "5m"},
+    }
+
+
+@pytest.fixture
+def conf_d(tmp_path):
+    directory = tmp_path / "conf.d"
+    directory.mkdir()
+
+    def _write(name, payload):
+        path = directory / name
+        path.write_text(json.dumps(payload) if not isinstance(payload, str) else payload)
+        return path
+
+    return directory, _write
+
+
+def test_resolve_config_files_lists_fragments_in_name_order(conf_d):
+    directory, write = conf_d
+    write("20-web.json", {"scripts": []})
+    write("10-db.jsonc", {"scripts": []})
+    write("notes.txt", "ignored")
+    write(".hidden.json", {"scripts": []})
+
+    files = resolve_config_files(str(directory))
+
+    assert [path.rsplit("/", 1)[1] for path in files] == ["10-db.jsonc", "20-web.json"]
+
+
+def test_load_merges_fragments_with_shared_defaults(conf_d):
+    directory, write = conf_d
+    write(
+        "00-defaults.json",
+        {"version": "2.0", "defaults": {"failure-control": {"on-fail": "restart"}}},
+    )
+    write("10-db.json", {"scripts": [_task("db")]})
+    write("20-web.jsonc", '{"scripts": [/* web team */ %s,]}' % json.dumps(_task("web")))
+
+    config = ConfigLoader(str(directory)).load()
+
+    assert config.version == "2.0"
+    assert [script.name for script in config.scripts] == ["db", "web"]
+    assert all(script.on_fail == "restart" for script in config.scripts)
+
+
+def test_load_accepts_glob_patterns(conf_d):
+    directory, write = conf_d
+    write("db.json", {"scripts": [_task("db")]})
+    write("web.json", {"scripts": [_task("web")]})
+
+    config = ConfigLoader(str(directory / "d*.json")).load()
+
+    assert [script.name for script in config.scripts] == ["db"]
+
+
+def test_load_only_reparses_changed_fragments(conf_d):
+    directory, write = conf_d
+    write("10-db.json", {"scripts": [_task("db")]})
+    write("20-web.json", {"scripts": [_task("web")]})
+    loader = ConfigLoader(str(directory), max_workers=1)
+    first = loader.load()
+
+    write("20-web.json", {"scripts": [_task("web", description="changed")]})
+    with patch.object(BansuriConfig, "parse_scripts", wraps=BansuriConfig.parse_scripts) as spy:
+        second = loader.load()
+
+    assert spy.call_count == 1
+    assert spy.call_args.args[0][0]["general"]["name"] == "web"
+    assert second.scripts[0] is first.scripts[0]
+    assert second.scripts[1].description == "changed"
+
+
+def test_load_reparses_everything_when_shared_defaults_change(conf_d):
+    directory, write = conf_d
+    write("00-defaults.json", {"defaults": {}})
+    write("10-db.json", {"scripts": [_task("db")]})
+    loader = ConfigLoader(str(directory))
+    loader.load()
+
+    write("00-defaults.json", {"defaults": {"failure-control": {"max-attempts": 3}}})
+    config = loader.load()
+
+    assert config.scripts[0].max_attempts == 3
+
+
+def test_load_rejects_task_defined_in_two_fragments(conf_d):
+    directory, write = conf_d
+    write("10-db.json", {"scripts": [_task("shared")]})
+    write("20-web.json", {"scripts": [_task("shared")]})
+
+    with pytest.raises(ValueError, match="Duplicate task name 'shared'"):
+        ConfigLoader(str(directory)).load()
+
+
+def test_load_reports_the_fragment_with_invalid_scripts(conf_d):
+    directory, write = conf_d
+    write("10-db.json", {"scripts": [{"general": {"name": "db", "command": "x"}}]})
+
+    with pytest.raises(ValueError, match="10-db.json: Validation error in 'db'"):
+        ConfigLoader(str(directory)).load()
+
+
+def test_load_raises_when_directory_has_no_fragments(conf_d):
+    directory, _ = conf_d
+
+    with pytest.raises(FileNotFoundError, match="No configuration fragments"):
+        ConfigLoader(str(directory)).load()
@@ -0,0 +1,106 @@
+import os
+import threading
+
+import pytest
+
+from bansuri.base.config_watcher import ConfigWatcher
+from bansuri.base.misc.inotify import inotify_available
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "scripts.json"
+    path.write_text('{"scripts": []}', encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def make_watcher():
+    watchers = []
+
+    def _make(path, **kwargs):
+        kwargs.setdefault("debounce", 0.05)
+        watcher = ConfigWatcher(str(path), **kwargs)
+        watchers.append(watcher)
+        return watcher
+
+    yield _make
+
+    for watcher in watchers:
+        watcher.close()
+
+
+def _bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_polling_backend_detects_content_change(config_path, make_watcher):
+    watcher = make_watcher(config_path, poll_interval=0.01, use_inotify=False)
+
+    assert watcher.backend == "polling"
+    assert watcher.wait_for_change(timeout=0.05) is False
+
+    config_path.write_text('{"scripts": [], "version": "2"}', encoding="utf-8")
+
+    assert watcher.wait_for_change(timeout=1) is True
+
+
+def test_polling_backend_ignores_touch_without_content_change(config_path, make_watcher):
+    watcher = make_watcher(config_path, poll_interval=0.01, use_inotify=False)
+
+    _bump_mtime(config_path)
+
+    assert watcher.wait_for_change(timeout=0.05) is False
+
+
+def test_request_reload_wakes_a_blocked_wait(config_path, make_watcher):
+    watcher = make_watcher(config_path, poll_interval=60, use_inotify=False)
+    threading.Timer(0.05, watcher.request_reload).start()
+
+    assert watcher.wait_for_change(timeout=5) is True
+
+
+@pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+def test_inotify_backend_debounces_multi_step_writes(config_path, make_watcher, tmp_path):
+    watcher = make_watcher(config_path)
+    assert watcher.backend == "inotify"
+
+    # Editors commonly write a temporary file and rename it over the original
+    tmp_file = tmp_path / "scripts.json.swp"
+    tmp_file.write_text('{"scripts": [], "version": "3"}', encoding="utf-8")
+    os.replace(tmp_file, config_path)
+
+    assert watcher.wait_for_change(timeout=2) is True
+    assert watcher.wait_for_change(timeout=0.1) is False
+
+
+@pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+def test_inotify_backend_ignores_unrelated_files(config_path, make_watcher, tmp_path):
+    watcher = make_watcher(config_path)
+
+    (tmp_path / "other.txt").write_text("noise", encoding="utf-8")
+
+    assert watcher.wait_for_change(timeout=0.2) is False
+
+
+def test_polling_backend_watches_conf_d_fragments(tmp_path, make_watcher):
+    directory = tmp_path / "conf.d"
+    directory.mkdir()
+    (directory / "10-db.json").write_text('{"scripts": []}', encoding="utf-8")
+    watcher = make_watcher(directory, poll_interval=0.01, use_inotify=False)
+
+    (directory / "20-web.json").write_text('{"scripts": []}', encoding="utf-8")
+
+    assert watcher.wait_for_change(timeout=1) is True
+
+
+@pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+def test_inotify_backend_filters_glob_matches(tmp_path, make_watcher):
+    watcher = make_watcher(tmp_path / "*.json")
+
+    (tmp_path / "notes.txt").write_text("noise", encoding="utf-8")
+    assert watcher.wait_for_change(timeout=0.2) is False
+
+    (tmp_path / "web.json").write_text('{"scripts": []}', encoding="utf-8")
+    assert watcher.wait_for_change(timeout=2) is True
@@ -0,0 +1,132 @@
+import io
+import json
+import threading
+
+import pytest
+
+from bansuri.base.logger import DEBUG, INFO, WARNING, Logger, parse_level
+
+
+class SlowStream(io.StringIO):
+    """Blocks the first write until released, counts the flushes"""
+
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(text)
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+def test_lines_keep_the_text_format():
+    stream = io.StringIO()
+    logger = Logger(stream)
+
+    logger.info("MASTER", "Orchestrator initialized")
+    logger.warning("task-a", "Restarting in %.1fs...", 5)
+    assert logger.flush()
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0].endswith("] [MASTER] Orchestrator initialized")
+    assert lines[1].endswith("] [task-a] Restarting in 5.0s...")
+    assert lines[0].startswith("[") and len(lines[0].split("]")[0]) == 20
+
+
+def test_json_lines_carry_the_level_and_source():
+    stream = io.StringIO()
+    logger = Logger(stream, json_lines=True)
+
+    logger.warning("task-a", "WARNING: queue is full")
+    logger.flush()
+
+    record = json.loads(stream.getvalue())
+    assert record["level"] == "warning"
+    assert record["source"] == "task-a"
+    assert record["message"] == "WARNING: queue is full"
+    assert "T" in record["time"]
+
+
+def test_disabled_levels_are_neither_queued_nor_formatted():
+    stream = io.StringIO()
+    logger = Logger(stream, level=INFO)
+
+    class Expensive:
+        def __str__(self):
+            raise AssertionError("formatted a disabled record")
+
+    logger.debug("task-a", "Executing shell command: %s", Expensive())
+    logger.flush()
+
+    assert logger.enabled_for(WARNING) and not logger.enabled_for(DEBUG)
+    assert stream.getvalue() == ""
+    assert logger._thread is None
+
+
+def test_records_from_many_threads_are_written_in_batches():
+    stream = SlowStream()
+    logger = Logger(stream)
+
+    # The writer is stuck on the first line while the threads log
+    logger.info("MASTER", "first")
+    assert stream.writing.wait(5)
+
+    def producer(n):
+        for i in range(200):
+            logger.info(f"task-{n}", "line %d", i)
+
+    threads = [threading.Thread(target=producer, args=(n,)) for n in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stream.release.set()
+    assert logger.flush()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1001
+    assert sum(line.endswith("] [task-4] line 199") for line in lines) == 1
+    # 1000 records in batches of at most 512
+    assert stream.flushes == 3
+
+
+def test_close_writes_pending_records_and_later_ones_directly():
+    stream = io.StringIO()
+    logger = Logger(stream)
+    logger.info("MASTER", "before")
+
+    logger.close()
+    logger.info("MASTER", "after")
+
+    assert [line.split("] ", 2)[2] for line in stream.getvalue().splitlines()] == [
+        "before",
+        "after",
+    ]
+    assert logger.flush()
+
+
+def test_bad_format_arguments_do_not_lose_the_record():
+    stream = io.StringIO()
+    logger = Logger(stream)
+
+    logger.info("MASTER", "%d tasks", "many")
+    logger.flush()
+
+    assert "%d tasks ('many',)" in stream.getvalue()
+
+
+@pytest.mark.parametrize(("value", "expected"), [("debug", DEBUG), (" Warning ", WARNING), (20, INFO)])
+def test_parse_level(value, expected):
+    assert parse_level(value) == expected
+
+
+def test_parse_level_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        parse_level("verbose")